@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+from typing import (
+    Any, Dict, List, Tuple
+)
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from benchmarks.fake_qtumd import FakeQtumd
+from benchmarks.run import git_revision
+from src.rpc import (
+    JSONCodec, OrjsonCodec, orjson
+)
+from src.stream import StreamingResponse
+from src.transactions import TxClassifier
+
+# Name -> (method, params), responses come from the fake qtumd sized like a busy mainnet node
+CASES: Dict[str, Tuple[str, list]] = {
+    "getblockchaininfo": ("getblockchaininfo", [ ]),
+    "getblockstats": ("getblockstats", [2_000_000]),
+    "getnetworkinfo": ("getnetworkinfo", [ ]),
+    "listbanned": ("listbanned", [ ]),
+    "getrawmempool": ("getrawmempool", [False]),
+    "getrawmempool_verbose": ("getrawmempool", [True]),
+    "getblock_verbosity_2": ("getblock", [FakeQtumd.block_hash(2_000_000), 2])
+}
+
+
+def encode_responses(fake: FakeQtumd) -> Dict[str, bytes]:
+    contents: Dict[str, bytes] = {
+        name: json.dumps(fake.handle({"id": 1, "method": method, "params": params}), separators=(",", ":")).encode()
+        for name, (method, params) in CASES.items()
+    }
+    # A typical collect round, decoded with loads_batch
+    contents["batch"] = json.dumps(fake.handle([
+        {"id": index, "method": method, "params": params}
+        for index, (method, params) in enumerate(value for name, value in CASES.items() if name in (
+            "getblockchaininfo", "getblockstats", "getnetworkinfo"
+        ))
+    ] + [
+        {"id": 100 + index, "method": "getmempoolentry", "params": [f"{index:064x}"]} for index in range(500)
+    ]), separators=(",", ":")).encode()
+    return contents
+
+
+def stream_block(content: bytes) -> dict:
+    # The streamed get_block path, fed 64 KiB at a time as the response would arrive
+    classifier: TxClassifier = TxClassifier()
+    parser: StreamingResponse = StreamingResponse(path=("result",) + classifier.path, on_item=classifier.add)
+    for start in range(0, len(content), 65536):
+        parser.feed(content[start:start + 65536])
+    return classifier.finish(parser.close()["result"])
+
+
+def peak_memory(decode: Any, content: bytes) -> int:
+    # Bytes allocated at the peak of one decode, on top of the response itself
+    tracemalloc.start()
+    decode(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def time_decode(decode: Any, content: bytes, repeat: int) -> float:
+    # Best of five runs, in microseconds per decode
+    best: float = float("inf")
+    for _ in range(5):
+        start: float = time.perf_counter()
+        for _ in range(repeat):
+            decode(content)
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare JSON codec decode cost per RPC method.")
+    parser.add_argument("--bans", type=int, default=5000)
+    parser.add_argument("--mempool", type=int, default=5000)
+    parser.add_argument("--block-txs", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    codecs: List[JSONCodec] = [JSONCodec()] + ([OrjsonCodec()] if orjson is not None else [ ])
+    contents: Dict[str, bytes] = encode_responses(FakeQtumd(
+        latency={ }, bans=args.bans, mempool=args.mempool, block_txs=args.block_txs
+    ))
+
+    methods: Dict[str, dict] = { }
+    for name, content in contents.items():
+        methods[name] = {"bytes": len(content)}
+        decoders: Dict[str, Any] = {
+            codec.name: codec.loads_batch if name == "batch" else codec.loads for codec in codecs
+        }
+        if name == "getblock_verbosity_2":
+            decoders["stream"] = stream_block
+        for decoder, decode in decoders.items():
+            methods[name][f"{decoder}_us"] = time_decode(decode, content, repeat=args.repeat)
+            methods[name][f"{decoder}_peak_bytes"] = peak_memory(decode, content)
+        print(f"{name}: " + ", ".join(
+            f"{decoder} {methods[name][f'{decoder}_us']:.0f} us {methods[name][f'{decoder}_peak_bytes'] / 1e6:.1f} MB"
+            for decoder in decoders
+        ), file=sys.stderr)
+
+    report: str = json.dumps({
+        "revision": git_revision(), "python": platform.python_version(),
+        "codecs": [codec.name for codec in codecs], "methods": methods
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+    else:
+        print(report)
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+
+from http.server import (
+    BaseHTTPRequestHandler, ThreadingHTTPServer
+)
+from threading import (
+    Lock, Thread
+)
+from typing import (
+    Any, Callable, Dict, List, Optional
+)
+
+import argparse
+import hashlib
+import json
+import struct
+import time
+
+# Methods that need a loaded wallet
+WALLET_METHODS: List[str] = ["getstakinginfo", "getwalletinfo"]
+
+
+class FakeQtumd:
+    __slots__ = (
+        "_latency", "_bans", "_mempool", "_block_txs", "_peers", "_block_interval", "_contracts", "_start", "_start_height", "_requests",
+        "_calls", "_wallet", "_lock"
+    )
+
+    def __init__(
+        self, latency: Dict[str, float], bans: int = 10, mempool: int = 120, block_txs: int = 4, peers: int = 16,
+        block_interval: float = 0.0, contracts: int = 20, start_height: int = 2_000_000, wallet: bool = True
+    ) -> None:
+        # Per-method latency in seconds, "*" applies to every method without its own entry
+        self._latency: Dict[str, float] = latency
+        self._bans: int = bans
+        self._mempool: int = mempool
+        self._block_txs: int = block_txs
+        self._peers: int = peers
+        self._block_interval: float = block_interval
+        self._contracts: int = contracts
+        self._start: float = time.monotonic()
+        self._start_height: int = start_height
+        self._requests: int = 0
+        self._calls: int = 0
+        # Without a wallet, wallet methods are not found, as with qtumd -disablewallet
+        self._wallet: bool = wallet
+        self._lock: Lock = Lock()
+
+    def height(self) -> int:
+        if self._block_interval <= 0:
+            return self._start_height
+        return self._start_height + int((time.monotonic() - self._start) / self._block_interval)
+
+    @staticmethod
+    def block_hash(height: int) -> str:
+        return hashlib.sha256(str(height).encode()).hexdigest()
+
+    def stats(self, reset: bool = False) -> dict:
+        with self._lock:
+            stats: dict = {"requests": self._requests, "calls": self._calls}
+            if reset:
+                self._requests, self._calls = 0, 0
+        return stats
+
+    def handle(self, payload: Any) -> Any:
+        with self._lock:
+            self._requests += 1
+            self._calls += len(payload) if isinstance(payload, list) else 1
+        if isinstance(payload, list):
+            return [self._handle_call(request) for request in payload]
+        return self._handle_call(payload)
+
+    def _handle_call(self, request: dict) -> dict:
+        method: str = request.get("method", "")
+        handler: Optional[Callable[[list], Any]] = getattr(self, f"_method_{method}", None)
+        if handler is None or (not self._wallet and method in WALLET_METHODS):
+            return {
+                "result": None, "error": {"code": -32601, "message": "Method not found"}, "id": request.get("id")
+            }
+        time.sleep(self._latency.get(method, self._latency.get("*", 0.0)))
+        return {
+            "result": handler(request.get("params") or [ ]), "error": None, "id": request.get("id")
+        }
+
+    # Benchmark control, not part of the qtumd API
+    def _method_benchmark_stats(self, params: list) -> dict:
+        return self.stats(reset=bool(params and params[0]))
+
+    def _method_getmemoryinfo(self, params: list) -> dict:
+        return {
+            "locked": {"used": 65536, "free": 196608, "total": 262144, "locked": 262144, "chunks_used": 2048, "chunks_free": 3}
+        }
+
+    def _method_getmempoolinfo(self, params: list) -> dict:
+        return {
+            "loaded": True, "size": 120, "bytes": 48000, "usage": 190000, "maxmempool": 300000000,
+            "mempoolminfee": 0.004, "minrelaytxfee": 0.004, "unbroadcastcount": 0
+        }
+
+    def _mempool_txids(self) -> List[str]:
+        # Half the mempool is replaced on every new block
+        height: int = self.height()
+        return [
+            hashlib.sha256(f"{height - index % 2}-{index}".encode()).hexdigest() for index in range(self._mempool)
+        ]
+
+    def _method_getrawmempool(self, params: list) -> Any:
+        txids: List[str] = self._mempool_txids()
+        if params and params[0]:
+            return {txid: self._method_getmempoolentry([txid]) for txid in txids}
+        return txids
+
+    def _method_getmempoolentry(self, params: list) -> dict:
+        seed: int = int(params[0][:8], 16)
+        vsize: int = 200 + seed % 1800
+        return {
+            "vsize": vsize, "weight": vsize * 4, "time": 1700000000 + seed % 3600, "height": self.height(),
+            "fees": {"base": round(vsize * (400 + seed % 4000) / 1e8, 8)}, "depends": [], "spentby": []
+        }
+
+    def _method_getmininginfo(self, params: list) -> dict:
+        return {
+            "blocks": self.height(), "currentblockweight": 4000, "currentblocktx": 2, "difficulty": {
+                "proof-of-work": 1.52e-05, "proof-of-stake": 2.1e+06
+            }, "networkhashps": 0, "netstakeweight": 1_350_000_000_000_000, "pooledtx": 120, "chain": "main",
+            "warnings": ""
+        }
+
+    def _method_getstakinginfo(self, params: list) -> dict:
+        return {
+            "enabled": True, "staking": True, "errors": "", "currentblocktx": 2, "pooledtx": 120,
+            "difficulty": 2.1e+06, "search-interval": 16, "weight": 250_000_000_000, "netstakeweight": 1_350_000_000_000_000,
+            "expectedtime": 345600
+        }
+
+    def _method_getwalletinfo(self, params: list) -> dict:
+        return {
+            "walletname": "", "walletversion": 169900, "format": "bdb", "balance": 2480.1234, "stake": 20.5,
+            "unconfirmed_balance": 0.0, "immature_balance": 0.0, "txcount": 1843, "keypoololdest": 1600000000,
+            "keypoolsize": 1000, "unlocked_until": 0, "paytxfee": 0.0, "private_keys_enabled": True
+        }
+
+    def _method_getnetworkinfo(self, params: list) -> dict:
+        return {
+            "version": 220100, "subversion": "/Satoshi:22.1.0/", "protocolversion": 70017, "localrelay": True,
+            "timeoffset": 0, "networkactive": True, "connections": 24, "connections_in": 16, "connections_out": 8,
+            "relayfee": 0.004, "incrementalfee": 0.0001, "warnings": ""
+        }
+
+    def _method_getblockchaininfo(self, params: list) -> dict:
+        height: int = self.height()
+        return {
+            "chain": "main", "blocks": height, "headers": height, "bestblockhash": self.block_hash(height),
+            "difficulty": 2.1e+06, "mediantime": 1700000000, "verificationprogress": 0.9999999,
+            "initialblockdownload": False, "chainwork": "00" * 32, "size_on_disk": 18000000000, "pruned": False
+        }
+
+    def _method_getpeerinfo(self, params: list) -> list:
+        # Byte counters grow with time at a different pace for every peer
+        elapsed: float = time.monotonic() - self._start
+        return [
+            {
+                "id": index, "addr": f"198.51.100.{index % 250}:3888", "inbound": index % 3 == 0,
+                "bytessent": int(elapsed * 1000 * (index + 1)), "bytesrecv": int(elapsed * 2000 * (index + 1)),
+                "bytessent_per_msg": {"inv": int(elapsed * 600 * (index + 1)), "ping": int(elapsed * 400 * (index + 1))},
+                "bytesrecv_per_msg": {"block": int(elapsed * 1500 * (index + 1)), "tx": int(elapsed * 500 * (index + 1))},
+                "pingtime": 0.02 + index % 10 * 0.03, "synced_blocks": self.height() - index % 4,
+                "synced_headers": self.height()
+            }
+            for index in range(self._peers)
+        ]
+
+    def _method_getconnectioncount(self, params: list) -> int:
+        return 24
+
+    def _method_getchaintxstats(self, params: list) -> dict:
+        return {
+            "time": 1700000000, "txcount": 9000000 + self.height(), "window_final_block_hash": self.block_hash(self.height()),
+            "window_block_count": 21600, "window_tx_count": 60000, "window_interval": 691200, "txrate": 0.086
+        }
+
+    def _method_getchaintips(self, params: list) -> list:
+        return [
+            {"height": self.height(), "hash": self.block_hash(self.height()), "branchlen": 0, "status": "active"},
+            {"height": self.height() - 100, "hash": "ab" * 32, "branchlen": 1, "status": "valid-fork"}
+        ]
+
+    def _method_getdifficulty(self, params: list) -> dict:
+        return {"proof-of-work": 1.52e-05, "proof-of-stake": 2.1e+06}
+
+    def _method_getbestblockhash(self, params: list) -> str:
+        return self.block_hash(self.height())
+
+    def _method_getblockhash(self, params: list) -> str:
+        return self.block_hash(int(params[0]))
+
+    def _method_getblockcount(self, params: list) -> int:
+        return self.height()
+
+    def _method_getblockheader(self, params: list) -> dict:
+        return {
+            "hash": params[0], "confirmations": 1, "height": self.height(), "version": 536870912,
+            "time": 1700000000, "mediantime": 1700000000, "nonce": 0, "bits": "1a0b5f3c", "difficulty": 2.1e+06,
+            "nTx": 4, "previousblockhash": self.block_hash(self.height() - 1)
+        }
+
+    def _method_getblockstats(self, params: list) -> dict:
+        # By height, or the tip for a block hash
+        height: int = params[0] if isinstance(params[0], int) else self.height()
+        stats: dict = {
+            "height": height, "total_size": 9133 + height % 7 * 1000, "total_weight": 35068, "totalfee": 1280000,
+            "txs": 4 + height % 5, "ins": 7, "outs": 12, "total_out": 410012800000, "avgfee": 320000,
+            "avgfeerate": 3000, "time": 1700000000 + height * 32 + height % 3 * 8, "blockhash": self.block_hash(height)
+        }
+        keys: Optional[list] = params[1] if len(params) > 1 else None
+        return {key: stats[key] for key in keys if key in stats} if keys else stats
+
+    def _method_getnettotals(self, params: list) -> dict:
+        return {"totalbytesrecv": 123456789, "totalbytessent": 987654321, "timemillis": int(time.time() * 1000)}
+
+    def _method_listbanned(self, params: list) -> list:
+        return [
+            {
+                "address": f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}/32",
+                "ban_created": 1700000000 + index, "banned_until": 1700086400 + index,
+                "ban_duration": 86400, "time_remaining": 86400, "ban_reason": "node misbehaving"
+            } for index in range(self._bans)
+        ]
+
+    def _method_getblock(self, params: list) -> dict:
+        txids: List[str] = [
+            hashlib.sha256(f"{params[0]}{index}".encode()).hexdigest() for index in range(self._block_txs)
+        ]
+        return {
+            "hash": params[0], "confirmations": 1, "height": self.height(), "size": 9133, "weight": 35068,
+            # Verbosity 2 expands every transaction
+            "tx": [
+                self._block_transaction(txid, index) for index, txid in enumerate(txids)
+            ] if len(params) > 1 and params[1] == 2 else txids,
+            "time": 1700000000, "nTx": self._block_txs
+        }
+
+    def _block_transaction(self, txid: str, index: int) -> dict:
+        # Coinbase and coinstake first, like a proof-of-stake block, then a mix of payments and contract calls
+        transaction: dict = self._transaction(txid)
+        if index == 0:
+            transaction["vin"] = [{"coinbase": "03" + txid[:8], "sequence": 4294967295}]
+            transaction["vout"][0]["value"] = 0.0
+            del transaction["fee"]
+        elif index == 1:
+            transaction["vout"].insert(0, {
+                "value": 0.0, "n": 0, "scriptPubKey": {"asm": "", "hex": "", "type": "nonstandard"}
+            })
+        elif index % 5 == 0:
+            transaction["vout"][0]["scriptPubKey"] = {
+                "asm": "4 250000 40 a9059cbb OP_CALL", "hex": "540390d003012804a9059cbbc2", "type": "call"
+            }
+        elif index % 7 == 0:
+            transaction["vout"][0]["scriptPubKey"] = {
+                "asm": "OP_HASH160 " + txid[:40] + " OP_EQUAL", "hex": "a914" + txid[:40] + "87", "type": "scripthash"
+            }
+        return transaction
+
+    @staticmethod
+    def _transaction(txid: str) -> dict:
+        seed: int = int(txid[:8], 16)
+        return {
+            "txid": txid, "hash": txid, "version": 2, "size": 225, "vsize": 225, "weight": 900, "locktime": 0,
+            "vin": [{
+                "txid": hashlib.sha256(txid.encode()).hexdigest(), "vout": seed % 4,
+                "scriptSig": {"asm": "", "hex": ""}, "sequence": 4294967295
+            }],
+            "vout": [{
+                "value": round(seed % 100000 / 1e4, 8), "n": 0,
+                "scriptPubKey": {
+                    "asm": "OP_DUP OP_HASH160 " + txid[:40] + " OP_EQUALVERIFY OP_CHECKSIG",
+                    "hex": "76a914" + txid[:40] + "88ac", "type": "pubkeyhash"
+                }
+            }],
+            "fee": round(seed % 1000 / 1e6, 8)
+        }
+
+    def _method_searchlogs(self, params: list) -> list:
+        # A few contract calls per block, half of them moving one of the fake tokens
+        receipts: List[dict] = [ ]
+        for height in range(int(params[0]), min(int(params[1]), self.height()) + 1):
+            for index in range(height % 4):
+                txid: str = hashlib.sha256(f"contract-{height}-{index}".encode()).hexdigest()
+                contract: str = hashlib.sha256(f"contract-{(height * 7 + index) % self._contracts}".encode()).hexdigest()[:40]
+                token: str = hashlib.sha256(f"contract-{index % 3}".encode()).hexdigest()[:40]
+                receipts.append({
+                    "blockHash": self.block_hash(height), "blockNumber": height, "transactionHash": txid,
+                    "transactionIndex": index + 1, "outputIndex": 0, "from": txid[:40], "to": contract,
+                    "cumulativeGasUsed": 30000 * (index + 1), "gasUsed": 21000 + height % 9000,
+                    "contractAddress": contract, "excepted": "None",
+                    "log": [
+                        {"address": contract, "topics": ["8c5be1e5" + "00" * 28], "data": "00" * 32}
+                    ] + ([
+                        {"address": token, "topics": [
+                            "ddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef", "00" * 32, "00" * 32
+                        ], "data": "00" * 32}
+                    ] if index % 2 == 0 else [ ])
+                })
+        return receipts
+
+    def _method_estimatesmartfee(self, params: list) -> dict:
+        return {"feerate": 0.004, "blocks": params[0]}
+
+    def _method_getrawtransaction(self, params: list) -> dict:
+        return self._transaction(params[0])
+
+    def _method_getnetworkhashps(self, params: list) -> float:
+        return 1.2e+16
+
+    def _method_uptime(self, params: list) -> int:
+        return int(time.monotonic() - self._start) + 86400
+
+
+def make_handler(qtumd: FakeQtumd) -> type:
+
+    class FakeQtumdHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes, avoid Nagle delays on keep-alive
+        disable_nagle_algorithm = True
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+        def do_POST(self) -> None:
+            payload: Any = json.loads(self.rfile.read(int(self.headers["content-length"])))
+            body: bytes = json.dumps(qtumd.handle(payload)).encode()
+            self.send_response(200)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return FakeQtumdHandler
+
+
+def publish_notifications(qtumd: FakeQtumd, endpoint: str, tx_rate: float) -> None:
+    # Stand-in for qtumd's zmqpubhashblock and zmqpubrawtx on one endpoint, needs pyzmq
+    import zmq
+
+    socket: zmq.Socket = zmq.Context.instance().socket(zmq.PUB)
+    socket.bind(endpoint)
+    sequences: Dict[bytes, int] = {b"hashblock": 0, b"rawtx": 0}
+
+    def send(topic: bytes, body: bytes) -> None:
+        socket.send_multipart([topic, body, struct.pack("<I", sequences[topic])])
+        sequences[topic] += 1
+
+    height: int = qtumd.height()
+    transactions: int = 0
+    while True:
+        time.sleep(1 / tx_rate if tx_rate > 0 else 0.1)
+        if qtumd.height() != height:
+            height = qtumd.height()
+            send(b"hashblock", bytes.fromhex(qtumd.block_hash(height)))
+        if tx_rate > 0:
+            transactions += 1
+            send(b"rawtx", hashlib.sha256(str(transactions).encode()).digest() * 8)
+
+
+def parse_latency(values: List[str]) -> Dict[str, float]:
+    # "0.05" applies to every method, "getblockstats=0.5" to one method
+    latency: Dict[str, float] = { }
+    for value in values:
+        method, _, seconds = value.rpartition("=")
+        latency[method or "*"] = float(seconds)
+    return latency
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for qtumd JSON-RPC, for benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=13889)
+    parser.add_argument("--latency", action="append", default=[], help="SECONDS or METHOD=SECONDS")
+    parser.add_argument("--bans", type=int, default=10)
+    parser.add_argument("--mempool", type=int, default=120, help="Number of transactions in the fake mempool")
+    parser.add_argument("--block-txs", type=int, default=4, help="Number of transactions in every fake block")
+    parser.add_argument("--peers", type=int, default=16, help="Number of connected fake peers")
+    parser.add_argument("--block-interval", type=float, default=0.0, help="Seconds between fake blocks, 0 freezes the tip")
+    parser.add_argument("--contracts", type=int, default=20, help="Number of fake contracts called by searchlogs receipts")
+    parser.add_argument("--no-wallet", action="store_true", help="Answer wallet methods as qtumd -disablewallet")
+    parser.add_argument("--zmq", default="", help="Publish hashblock and rawtx notifications on this endpoint")
+    parser.add_argument("--zmq-tx-rate", type=float, default=10, help="Fake rawtx notifications per second")
+    args = parser.parse_args()
+
+    qtumd: FakeQtumd = FakeQtumd(
+        latency=parse_latency(args.latency), bans=args.bans, mempool=args.mempool, block_txs=args.block_txs,
+        peers=args.peers, block_interval=args.block_interval, contracts=args.contracts, wallet=not args.no_wallet
+    )
+    if args.zmq:
+        Thread(target=publish_notifications, args=(qtumd, args.zmq, args.zmq_tx_rate), daemon=True).start()
+    server: ThreadingHTTPServer = ThreadingHTTPServer((args.host, args.port), make_handler(qtumd))
+    server.daemon_threads = True
+    # Tells the parent process the server is ready
+    print(f"listening {server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
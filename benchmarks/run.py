@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+
+from typing import (
+    Any, Callable, Dict, List, Optional
+)
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+SCENARIOS: Dict[str, dict] = {
+    "baseline": {
+        "env": { }, "fake": [ ]
+    },
+    "per_call": {
+        "env": {"RPC_BATCH": "false"}, "fake": [ ]
+    },
+    "async": {
+        "env": {"ASYNC_COLLECTOR": "true"}, "fake": [ ]
+    },
+    "slow_node": {
+        "env": { }, "fake": ["--latency", "0.02", "--latency", "getblockstats=0.3", "--latency", "estimatesmartfee=0.1"]
+    },
+    "slow_node_async": {
+        "env": {"ASYNC_COLLECTOR": "true"},
+        "fake": ["--latency", "0.02", "--latency", "getblockstats=0.3", "--latency", "estimatesmartfee=0.1"]
+    },
+    "many_bans": {
+        "env": { }, "fake": ["--bans", "5000"]
+    },
+    "many_targets": {
+        "env": {
+            "HASH_PS_BLOCKS": ",".join(str(block) for block in [-1] + list(range(1, 240, 12))),
+            "SMART_FEE_BLOCKS": ",".join(str(block) for block in range(1, 26))
+        },
+        "fake": [ ]
+    },
+    "large_mempool": {
+        "env": { }, "fake": ["--mempool", "20000", "--block-interval", "0.5"]
+    },
+    "new_block_every_cycle": {
+        "env": { }, "fake": ["--block-interval", "0.001"]
+    }
+}
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    ordered: List[float] = sorted(values)
+
+    def percentile(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+    return {
+        "mean": statistics.fmean(ordered), "p50": percentile(0.50), "p90": percentile(0.90),
+        "p99": percentile(0.99), "max": ordered[-1]
+    }
+
+
+def start_fake_qtumd(arguments: List[str]) -> (subprocess.Popen, int):
+    process: subprocess.Popen = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_qtumd", "--port", "0", *arguments],
+        stdout=subprocess.PIPE, text=True
+    )
+    # The fake prints "listening <port>" once it accepts connections
+    port: int = int(process.stdout.readline().split()[1])
+    return process, port
+
+
+def run_scenario(name: str, cycles: int, scrapes: int) -> dict:
+    # Imported here so the scenario's environment is applied before Config is read
+    from src.collector import (
+        collect_node, collect_node_async
+    )
+    from src.config import Config
+    from src.exposition import (
+        ExpositionCache, start_exposition_server
+    )
+    from src.metrics import SNAPSHOT
+    from src.node import Node
+    from src.rpc import (
+        AsyncRPC, RPC
+    )
+
+    process, port = start_fake_qtumd(SCENARIOS[name]["fake"])
+    try:
+        node: Node = Node(name=name, host="127.0.0.1", port=port, rpc_user="qtum", rpc_password="qtum")
+        rpc: RPC = RPC(url=node.url, rpc_user=node.rpc_user, rpc_password=node.rpc_password, node=node.name)
+        if Config.ASYNC_COLLECTOR:
+            loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+            async_rpc: AsyncRPC = AsyncRPC(
+                url=node.url, rpc_user=node.rpc_user, rpc_password=node.rpc_password, node=node.name
+            )
+            cycle: Callable[[], None] = lambda: loop.run_until_complete(collect_node_async(rpc=async_rpc, node=node))
+        else:
+            cycle: Callable[[], None] = lambda: collect_node(rpc=rpc, node=node)
+
+        # Warm up connections and caches, then count only measured cycles
+        cycle()
+        rpc.call("benchmark_stats", [True])
+
+        wall: List[float] = [ ]
+        cpu: List[float] = [ ]
+        for _ in range(cycles):
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            cycle()
+            wall.append(time.perf_counter() - wall_start)
+            cpu.append(time.process_time() - cpu_start)
+        # The stats call counts itself
+        stats: dict = rpc.call("benchmark_stats", [True])
+
+        httpd, _ = start_exposition_server(port=0, addr="127.0.0.1", cache=ExpositionCache(snapshot=SNAPSHOT))
+        scrape_latency: Dict[str, List[float]] = {"plain": [ ], "gzip": [ ]}
+        for encoding, headers in (("plain", { }), ("gzip", {"Accept-Encoding": "gzip"})):
+            for _ in range(scrapes):
+                scrape_start: float = time.perf_counter()
+                with urllib.request.urlopen(urllib.request.Request(
+                    f"http://127.0.0.1:{httpd.server_port}/metrics", headers=headers
+                )) as response:
+                    response.read()
+                scrape_latency[encoding].append(time.perf_counter() - scrape_start)
+        httpd.shutdown()
+
+        return {
+            "scenario": name,
+            "cycles": cycles,
+            "collect_wall_seconds": percentiles(wall),
+            "cpu_seconds_per_cycle": statistics.fmean(cpu),
+            "rpc_requests_per_cycle": (stats["requests"] - 1) / cycles,
+            "rpc_calls_per_cycle": (stats["calls"] - 1) / cycles,
+            "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+            "scrape_latency_seconds": {
+                encoding: percentiles(latency) for encoding, latency in scrape_latency.items()
+            }
+        }
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark qtum-exporter against a local fake qtumd.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Defaults to every scenario")
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--scrapes", type=int, default=200)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Each scenario runs in its own process so Config and peak RSS are isolated
+    if args.child:
+        print(json.dumps(run_scenario(args.scenario[0], cycles=args.cycles, scrapes=args.scrapes)))
+        sys.exit(0)
+
+    results: List[Any] = [ ]
+    for scenario in args.scenario or list(SCENARIOS):
+        child: subprocess.CompletedProcess = subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.run", "--child", "--scenario", scenario,
+                "--cycles", str(args.cycles), "--scrapes", str(args.scrapes)
+            ],
+            env={**os.environ, "LOGGING_LEVEL": "CRITICAL", **SCENARIOS[scenario]["env"]},
+            capture_output=True, text=True, check=True
+        )
+        results.append(json.loads(child.stdout.strip().splitlines()[-1]))
+        print(f"{scenario}: {results[-1]['collect_wall_seconds']['p50'] * 1000:.2f} ms p50 collect", file=sys.stderr)
+
+    report: str = json.dumps({
+        "revision": git_revision(), "python": platform.python_version(), "scenarios": results
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+    else:
+        print(report)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+from typing import (
+    List, Tuple
+)
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks.run import (
+    git_revision, percentiles, start_fake_qtumd
+)
+
+
+def serve() -> None:
+    # Child process: one collection against the fake, then the metrics server until stdin closes
+    from src.collector import collect_node
+    from src.exposition import (
+        ExpositionCache, start_exposition_server
+    )
+    from src.metrics import SNAPSHOT
+    from src.node import Node
+    from src.rpc import RPC
+
+    process, port = start_fake_qtumd(["--bans", "500", "--peers", "64"])
+    try:
+        node: Node = Node(name="load", host="127.0.0.1", port=port, rpc_user="qtum", rpc_password="qtum")
+        with RPC(url=node.url, rpc_user=node.rpc_user, rpc_password=node.rpc_password, node=node.name) as rpc:
+            collect_node(rpc=rpc, node=node)
+        server, _ = start_exposition_server(port=0, addr="127.0.0.1", cache=ExpositionCache(snapshot=SNAPSHOT))
+        print(f"listening {server.server_port}", flush=True)
+        sys.stdin.read()
+        server.shutdown()
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def scrape(port: int, deadline: float, headers: str, latencies: List[float]) -> int:
+    # One keep-alive connection scraping back to back, returns the number of failed scrapes
+    errors: int = 0
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request: bytes = f"GET /metrics HTTP/1.1\r\nHost: 127.0.0.1\r\n{headers}\r\n".encode("latin-1")
+    try:
+        while time.perf_counter() < deadline:
+            start: float = time.perf_counter()
+            writer.write(request)
+            status: bytes = await reader.readline()
+            length: int = 0
+            while True:
+                line: bytes = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            if not status.startswith(b"HTTP/1.1 200"):
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+    except (ConnectionError, asyncio.IncompleteReadError):
+        errors += 1
+    finally:
+        writer.close()
+    return errors
+
+
+async def load(port: int, connections: int, idle: int, seconds: float, gzipped: bool) -> dict:
+    # Idle connections never send a request, they must not hold up the scrapers
+    idlers: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = [
+        await asyncio.open_connection("127.0.0.1", port) for _ in range(idle)
+    ]
+    latencies: List[float] = [ ]
+    deadline: float = time.perf_counter() + seconds
+    errors: List[int] = await asyncio.gather(*(
+        scrape(port, deadline, "Accept-Encoding: gzip\r\n" if gzipped else "", latencies) for _ in range(connections)
+    ))
+    for _, writer in idlers:
+        writer.close()
+    return {
+        "connections": connections, "idle_connections": idle, "gzip": gzipped, "scrapes": len(latencies),
+        "errors": sum(errors), "scrapes_per_second": len(latencies) / seconds, "latency_seconds": percentiles(latencies)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the /metrics server with many concurrent scrapers.")
+    parser.add_argument("--connections", type=int, action="append", help="Defaults to 1, 50, 200 and 500")
+    parser.add_argument("--idle", type=int, default=50, help="Connections held open without sending a request")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve()
+        sys.exit(0)
+
+    # The server runs in its own process so the load generator does not compete with it for the GIL
+    child: subprocess.Popen = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.scrape_load", "--serve"], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        env={**os.environ, "LOGGING_LEVEL": "CRITICAL"}, text=True
+    )
+    try:
+        server_port: int = int(child.stdout.readline().split()[1])
+        results: List[dict] = [ ]
+        for connections in args.connections or [1, 50, 200, 500]:
+            results.append(asyncio.run(load(server_port, connections, args.idle, args.seconds, args.gzip)))
+            print(
+                f"{connections} connections: {results[-1]['scrapes_per_second']:.0f} scrapes/s, "
+                f"{results[-1]['latency_seconds']['p99'] * 1000:.1f} ms p99, {results[-1]['errors']} errors",
+                file=sys.stderr
+            )
+    finally:
+        child.stdin.close()
+        child.wait()
+
+    report: str = json.dumps({
+        "revision": git_revision(), "python": platform.python_version(), "runs": results
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+    else:
+        print(report)
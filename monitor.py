@@ -1,35 +1,77 @@
 #!/usr/bin/env python3
 
-from datetime import (
-    datetime, timedelta
-)
-from prometheus_client import start_wsgi_server
 from logging import (
     Logger, Formatter, StreamHandler
 )
 from signal import (
     signal, SIGTERM
 )
+from concurrent.futures import (
+    Future, ThreadPoolExecutor
+)
+from functools import partial
+from threading import (
+    Event, Thread
+)
+from typing import (
+    Any, Callable, Dict, List, Optional
+)
 
+import asyncio
 import logging
+import os
 import sys
 
 from src.config import Config
-from src.collector import collect
-from src.metrics import (
-    EXPORTER_ERRORS, PROCESS_TIME
+from src.checkpoint import (
+    Checkpoint, checkpoint_path, save_checkpoints
+)
+from src.collector import (
+    CollectorGroup, GROUPS, collect_node, collect_node_async, exception_count, collect_jobs, polled_groups
+)
+from src.node import (
+    Node, load_nodes
+)
+from src.rpc import (
+    AsyncRPC, RPC
+)
+from src.pipeline import (
+    CollectionPipeline, ScrapeTrigger
 )
+from src.scheduler import Scheduler
+from src.instrumentation import SLOW_CALLS
+from src.diagnostics import (
+    Diagnostics, PROFILER, enable_process_metrics
+)
+from src.exposition import (
+    ExpositionCache, start_exposition_server
+)
+from src.metrics import SNAPSHOT
+from src.notifications import (
+    ZmqSubscriber, start_subscriber
+)
+
+# Set when the monitor should stop after the current refresh.
+stop_event: Event = Event()
 
 
 def sigterm_handler(*args) -> None:
     logger.critical("Received SIGTERM. Exiting Qtum (qtumd) monitor.")
-    sys.exit(0)
+    stop_event.set()
+
+
+def refresh(dispatch: Callable[[], None]) -> None:
+    # Only hands the work to the collector workers, their timing is logged as each node finishes
+    try:
+        dispatch()
+    except Exception as exception:
+        logger.error(f"Exception: {str(exception)}", exc_info=True)
+        # Not tied to a single node, node failures are counted by the collector
+        exception_count(exception, node="")
 
 
-def exception_count(exception: Exception) -> None:
-    err_type = type(exception)
-    exception_name = err_type.__module__ + "." + err_type.__name__
-    EXPORTER_ERRORS.labels(**{"type": exception_name}).inc()
+async def call(function: Callable[[], Any]) -> Any:
+    return function()
 
 
 if __name__ == "__main__":
@@ -47,30 +89,145 @@ if __name__ == "__main__":
     signal(SIGTERM, sigterm_handler)
     logger.info("Started Qtum (qtumd) monitor.")
 
-    start_wsgi_server(
-        port=Config.METRICS_PORT, addr=Config.METRICS_ADDRESS
+    nodes: List[Node] = load_nodes()
+    logger.info(f"Scraping nodes: {', '.join(node.name for node in nodes)}")
+
+    # Derived state resumes from the last checkpoint, the first collection checks it against the node's chain.
+    checkpoints: List[Checkpoint] = [ ]
+    if Config.CHECKPOINT_DIR:
+        checkpoints = [
+            Checkpoint(path=checkpoint_path(directory=Config.CHECKPOINT_DIR, node=node.name), node=node)
+            for node in nodes
+        ]
+        for checkpoint in checkpoints:
+            checkpoint.load()
+
+    # One RPC client (and its connection pool) per node lives for the whole process, collections
+    # run off the main thread so neither the scheduler nor a scrape ever waits on a stalled node.
+    if Config.ASYNC_COLLECTOR:
+        loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        loop_thread: Thread = Thread(target=loop.run_forever, name="qtum-exporter-collector", daemon=True)
+        loop_thread.start()
+        clients: Dict[Node, AsyncRPC] = {
+            node: AsyncRPC(url=node.url, rpc_user=node.rpc_user, rpc_password=node.rpc_password, node=node.name)
+            for node in nodes
+        }
+        pipeline: CollectionPipeline = CollectionPipeline(nodes=nodes, submit=lambda node, groups: (
+            asyncio.run_coroutine_threadsafe(collect_node_async(rpc=clients[node], node=node, groups=groups), loop)
+        ))
+        run_on_node: Callable[[Node, Callable[[], Any]], Future] = (
+            lambda node, function: asyncio.run_coroutine_threadsafe(call(function), loop)
+        )
+    else:
+        # One worker per node, so a node's collections never overlap and share its state safely
+        executors: Dict[Node, ThreadPoolExecutor] = {
+            node: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"qtum-exporter-node-{index}")
+            for index, node in enumerate(nodes)
+        }
+        clients: Dict[Node, RPC] = {
+            node: RPC(url=node.url, rpc_user=node.rpc_user, rpc_password=node.rpc_password, node=node.name)
+            for node in nodes
+        }
+        # Wallet-only groups touch no shared node state, so a second worker per node keeps a wallet call
+        # waiting on WALLET_TIMEOUT from holding up the node's other jobs. Its own client shares the breaker,
+        # a reconnect after a transport error never closes the pool under the other worker.
+        wallet_executors: Dict[Node, ThreadPoolExecutor] = {
+            node: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"qtum-exporter-wallet-{index}")
+            for index, node in enumerate(nodes)
+        }
+        wallet_clients: Dict[Node, RPC] = {
+            node: RPC(
+                url=node.url, rpc_user=node.rpc_user, rpc_password=node.rpc_password, node=node.name,
+                breaker=clients[node].breaker
+            ) for node in nodes
+        }
+        pipeline: CollectionPipeline = CollectionPipeline(nodes=nodes, submit=lambda node, groups: (
+            wallet_executors[node].submit(collect_node, rpc=wallet_clients[node], node=node, groups=groups)
+            if all(group.wallet for group in groups) else
+            executors[node].submit(collect_node, rpc=clients[node], node=node, groups=groups)
+        ))
+        run_on_node: Callable[[Node, Callable[[], Any]], Future] = (
+            lambda node, function: executors[node].submit(function)
+        )
+
+    # Off by default, GC pauses are timed and /debug/* profiles and traces only once enabled
+    if Config.PROCESS_METRICS:
+        enable_process_metrics()
+
+    # Scrapes are served from a render cached until the next snapshot is published or it is EXPOSITION_MAX_AGE old,
+    # in collect-on-scrape mode a scrape first waits (up to TIMEOUT) for a collection started at most
+    # SCRAPE_MIN_INTERVAL ago.
+    # /ready waits for the first scheduled collection, scrapes start it themselves in collect-on-scrape mode.
+    on_scrape: Optional[ScrapeTrigger] = (
+        ScrapeTrigger(pipeline=pipeline, groups=GROUPS) if Config.COLLECT_ON_SCRAPE else None
+    )
+    exposition_server, _ = start_exposition_server(
+        port=Config.METRICS_PORT, addr=Config.METRICS_ADDRESS, cache=ExpositionCache(snapshot=SNAPSHOT),
+        slow_calls=SLOW_CALLS, on_scrape=on_scrape, ready=None if Config.COLLECT_ON_SCRAPE else pipeline.ready,
+        diagnostics=Diagnostics(profiler=PROFILER) if Config.DEBUG_ENDPOINTS else None
     )
 
-    try:
-        last_refresh: datetime = (
-            datetime.now() - timedelta(seconds=Config.REFRESH_SECONDS)
+    # A ZMQ block notification collects the block-derived groups of its node right away, polls
+    # skip them while the node's block socket is live and take over again once it goes quiet.
+    nodes_by_name: Dict[str, Node] = {node.name: node for node in nodes}
+    block_groups: List[CollectorGroup] = [group for group in GROUPS if group.on_block]
+    subscriber: Optional[ZmqSubscriber] = start_subscriber(
+        notifications=[node.notifications for node in nodes],
+        on_block=None if Config.COLLECT_ON_SCRAPE else lambda name: refresh(
+            partial(pipeline.dispatch, "block", block_groups, nodes=[nodes_by_name[name]])
+        )
+    )
+
+    # One scheduler drives every group, each interval on its own fixed cadence.
+    scheduler: Scheduler = Scheduler(stop_event=stop_event)
+    if not Config.COLLECT_ON_SCRAPE:
+        for name, (interval, groups) in collect_jobs().items():
+            scheduler.add_job(
+                name=name, interval=interval,
+                function=partial(refresh, partial(pipeline.dispatch, name, groups, select=polled_groups))
+            )
+    if checkpoints:
+        # Saved on the node's own worker, between its collections, so the state is never read mid-update
+        scheduler.add_job(
+            name="checkpoint", interval=Config.CHECKPOINT_SECONDS, function=partial(refresh, lambda: [
+                run_on_node(checkpoint.node, partial(save_checkpoints, [checkpoint])) for checkpoint in checkpoints
+            ])
         )
-        while True:
-            process_start: datetime = datetime.now()
-            # Only refresh every REFRESH_SECONDS seconds.
-            if (process_start - last_refresh).total_seconds() < Config.REFRESH_SECONDS:
-                continue
-
-            try:
-                collect()
-            except Exception as exception:
-                logger.error(f"Exception: {str(exception)}", exc_info=True)
-                exception_count(exception)
-
-            duration = datetime.now() - process_start
-            PROCESS_TIME.inc(duration.total_seconds())
-            logger.info("Refresh took %s seconds", duration.total_seconds())
-            last_refresh = process_start
+
+    try:
+        if scheduler.jobs:
+            scheduler.run()
+        else:
+            # Collect-on-scrape without checkpoints leaves nothing to schedule
+            stop_event.wait()
     except KeyboardInterrupt:
         logger.critical("Exiting Qtum (qtumd) monitor.")
-        sys.exit(0)
+    finally:
+        exposition_server.shutdown()
+        if subscriber is not None:
+            subscriber.stop()
+        # Queued collections are dropped and closing the clients aborts requests in flight, so a stalled
+        # node cannot hold the exit past the container's grace period
+        pipeline.cancel()
+        if Config.ASYNC_COLLECTOR:
+            for rpc in clients.values():
+                asyncio.run_coroutine_threadsafe(rpc.close(), loop).result(timeout=Config.SHUTDOWN_TIMEOUT)
+        else:
+            for executor in [*executors.values(), *wallet_executors.values()]:
+                executor.shutdown(wait=False, cancel_futures=True)
+            for rpc in [*clients.values(), *wallet_clients.values()]:
+                rpc.close()
+        pipeline.wait(timeout=Config.SHUTDOWN_TIMEOUT)
+        # A node still collecting keeps its last periodic checkpoint instead of one written mid-update
+        save_checkpoints([checkpoint for checkpoint in checkpoints if pipeline.idle(checkpoint.node)])
+        if Config.ASYNC_COLLECTOR:
+            loop.call_soon_threadsafe(loop.stop)
+            loop_thread.join()
+            loop.close()
+    if not all(pipeline.idle(node) for node in nodes):
+        # A request blocked on a stalled node is not interrupted by closing its client, and the worker
+        # threads would otherwise be joined at exit until it times out
+        logger.warning(f"Collections still running after {Config.SHUTDOWN_TIMEOUT} seconds, exiting without them")
+        logging.shutdown()
+        os._exit(0)
+    sys.exit(0)
@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+
+# Satoshis per QTUM
+COIN: int = 100_000_000
+
+
+def to_satoshis(amount: float) -> int:
+    # RPC amounts in QTUM have at most 8 decimals, rounding undoes the binary float error
+    return round(amount * COIN)
+
+
+def to_coins(satoshis: int) -> float:
+    # Integer true division is correctly rounded, unlike going through decimal.Decimal
+    return satoshis / COIN
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+from collections import deque
+from typing import (
+    Deque, Iterator, List, NamedTuple, Optional, Union
+)
+
+import bisect
+import math
+
+from .amounts import COIN
+from .config import Config
+from .metrics import (
+    QTUM_BLOCK_WINDOW_BLOCKS, QTUM_BLOCK_WINDOW_SIZE, QTUM_BLOCK_WINDOW_TXS, QTUM_BLOCK_WINDOW_FEE,
+    QTUM_BLOCK_WINDOW_INTERVAL
+)
+from .snapshot import Samples
+
+BLOCK_STATS_KEYS = ("height", "blockhash", "time", "total_size", "txs", "totalfee")
+
+
+class BlockStats(NamedTuple):
+    height: int
+    block_hash: str
+    time: int
+    size: int
+    txs: int
+    fee: int
+    # Seconds since the previous block, None when it is not in the window
+    interval: Optional[int]
+
+
+class RollingWindow:
+    __slots__ = (
+        "_sum", "_sorted"
+    )
+
+    def __init__(self) -> None:
+        # Updated on every add and remove instead of being recomputed each cycle
+        self._sum: Union[int, float] = 0
+        self._sorted: List[Union[int, float]] = [ ]
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def add(self, value: Union[int, float]) -> None:
+        self._sum += value
+        bisect.insort(self._sorted, value)
+
+    def remove(self, value: Union[int, float]) -> None:
+        self._sum -= value
+        del self._sorted[bisect.bisect_left(self._sorted, value)]
+
+    def clear(self) -> None:
+        self._sum = 0
+        self._sorted.clear()
+
+    @property
+    def average(self) -> float:
+        return self._sum / len(self._sorted) if self._sorted else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        # Nearest-rank percentile
+        if not self._sorted:
+            return 0.0
+        return self._sorted[max(math.ceil(fraction * len(self._sorted)) - 1, 0)]
+
+
+class BlockTracker:
+    __slots__ = (
+        "_blocks", "_size", "_txs", "_fee", "_interval"
+    )
+
+    def __init__(self, window: int = Config.BLOCK_WINDOW) -> None:
+        # Ring buffer of the last window blocks, consecutive by height
+        self._blocks: Deque[BlockStats] = deque(maxlen=window)
+        self._size: RollingWindow = RollingWindow()
+        self._txs: RollingWindow = RollingWindow()
+        self._fee: RollingWindow = RollingWindow()
+        self._interval: RollingWindow = RollingWindow()
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def __iter__(self) -> Iterator[BlockStats]:
+        return iter(self._blocks)
+
+    @property
+    def window(self) -> int:
+        return self._blocks.maxlen
+
+    @property
+    def last(self) -> Optional[BlockStats]:
+        return self._blocks[-1] if self._blocks else None
+
+    def missing(self, tip_height: int) -> List[int]:
+        # Heights after the last tracked block, never further back than the window reaches
+        first_height: int = tip_height - self._blocks.maxlen + 1
+        if self._blocks:
+            first_height = max(first_height, self._blocks[-1].height + 1)
+        return list(range(max(first_height, 0), tip_height + 1))
+
+    def _track(self, block: BlockStats, sign: int) -> None:
+        update = RollingWindow.add if sign > 0 else RollingWindow.remove
+        update(self._size, block.size)
+        update(self._txs, block.txs)
+        update(self._fee, block.fee)
+        if block.interval is not None:
+            update(self._interval, block.interval)
+
+    def append(self, block_stats: dict) -> None:
+        last: Optional[BlockStats] = self.last
+        if last is not None and block_stats["height"] != last.height + 1:
+            last = None
+        self.restore(BlockStats(
+            height=block_stats["height"], block_hash=block_stats["blockhash"], time=block_stats["time"],
+            size=block_stats["total_size"], txs=block_stats["txs"], fee=block_stats["totalfee"],
+            interval=block_stats["time"] - last.time if last is not None else None
+        ))
+
+    def restore(self, block: BlockStats) -> None:
+        if not self._blocks.maxlen:
+            return
+        if self._blocks and block.height != self._blocks[-1].height + 1:
+            # Not contiguous with what is tracked, start over from this block
+            self.clear()
+        if len(self._blocks) == self._blocks.maxlen:
+            self._track(self._blocks[0], sign=-1)
+        self._blocks.append(block)
+        self._track(block, sign=1)
+
+    def pop(self) -> None:
+        self._track(self._blocks.pop(), sign=-1)
+
+    def clear(self) -> None:
+        self._blocks.clear()
+        for window in (self._size, self._txs, self._fee, self._interval):
+            window.clear()
+
+    def export(self, samples: Samples) -> None:
+        samples.set(QTUM_BLOCK_WINDOW_BLOCKS, len(self._blocks))
+        for gauge, window, scale in (
+            (QTUM_BLOCK_WINDOW_SIZE, self._size, 1),
+            (QTUM_BLOCK_WINDOW_TXS, self._txs, 1),
+            (QTUM_BLOCK_WINDOW_FEE, self._fee, COIN),
+            (QTUM_BLOCK_WINDOW_INTERVAL, self._interval, 1)
+        ):
+            if window:
+                samples.set(gauge, window.average / scale, statistic="avg")
+                samples.set(gauge, window.percentile(0.95) / scale, statistic="p95")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+from logging import (
+    Logger, Formatter, StreamHandler
+)
+from threading import Lock
+from typing import Optional
+
+import logging
+import random
+import time
+
+from .config import Config
+from .metrics import (
+    EXPORTER_BREAKER_STATE, EXPORTER_BREAKER_OPENS
+)
+
+logger: Logger = logging.getLogger("qtum-exporter-breaker")
+logger.setLevel(level=Config.LOGGING_LEVEL)
+formatter: Formatter = logging.Formatter(
+    fmt="%(asctime)s %(name)s %(levelname)s %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+)
+stream_handler: StreamHandler = logging.StreamHandler()
+stream_handler.setFormatter(fmt=formatter)
+logger.addHandler(stream_handler)
+
+CLOSED, OPEN, HALF_OPEN = 0, 1, 2
+STATE_NAMES = {CLOSED: "closed", OPEN: "open", HALF_OPEN: "half-open"}
+
+# qtumd answers RPC_IN_WARMUP while loading or reindexing, as good as down for the exporter
+RPC_IN_WARMUP: int = -28
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    __slots__ = (
+        "_name", "_threshold", "_backoff", "_max_backoff", "_state", "_failures", "_opens", "_open_until", "_lock"
+    )
+
+    def __init__(
+        self, name: str, threshold: int = Config.BREAKER_FAILURES, backoff: float = Config.BREAKER_BACKOFF,
+        max_backoff: float = Config.BREAKER_MAX_BACKOFF
+    ) -> None:
+        self._name: str = name
+        # Consecutive failures before the circuit opens, 0 never opens it
+        self._threshold: int = threshold
+        self._backoff: float = backoff
+        self._max_backoff: float = max_backoff
+        self._state: int = CLOSED
+        self._failures: int = 0
+        self._opens: int = 0
+        self._open_until: float = 0.0
+        self._lock: Lock = Lock()
+        EXPORTER_BREAKER_STATE.labels(node=name).set(CLOSED)
+
+    @property
+    def state(self) -> str:
+        return STATE_NAMES[self._state]
+
+    def _set_state(self, state: int) -> None:
+        self._state = state
+        EXPORTER_BREAKER_STATE.labels(node=self._name).set(state)
+
+    def before_request(self) -> bool:
+        # Fails fast while open, returns True when the caller has to send the half-open probe first
+        with self._lock:
+            if self._state == CLOSED:
+                return False
+            retry_in: float = self._open_until - time.monotonic()
+            if self._state == OPEN and retry_in <= 0:
+                self._set_state(HALF_OPEN)
+                return True
+            raise CircuitOpenError(
+                f"Circuit for '{self._name}' is {self.state}"
+                + (f", next probe in {retry_in:.1f} seconds" if retry_in > 0 else "")
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"Circuit for '{self._name}' closed, node is answering again")
+                self._set_state(CLOSED)
+            self._failures, self._opens = 0, 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            # Requests already in flight when the circuit opened must not push the next probe further out
+            if not self._threshold or self._state == OPEN or (
+                self._state == CLOSED and self._failures < self._threshold
+            ):
+                return
+            reason: str = "probe failed" if self._state == HALF_OPEN else f"{self._failures} failures"
+            # Exponential backoff with equal jitter, so many exporters do not probe in lockstep
+            backoff: float = min(self._backoff * 2 ** self._opens, self._max_backoff)
+            backoff = random.uniform(backoff / 2, backoff)
+            self._opens += 1
+            self._open_until = time.monotonic() + backoff
+            self._set_state(OPEN)
+            EXPORTER_BREAKER_OPENS.labels(node=self._name).inc()
+            logger.warning(
+                f"Circuit for '{self._name}' opened after {reason}, next probe in {backoff:.1f} seconds"
+            )
+
+    def record_response(self, error: Optional[dict]) -> None:
+        if error is not None and error.get("code") == RPC_IN_WARMUP:
+            self.record_failure()
+        else:
+            self.record_success()
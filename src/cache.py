@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+from typing import (
+    Any, Dict, List, Optional, Tuple
+)
+
+import json
+
+from .rpc import RPCCall
+from .metrics import (
+    EXPORTER_BLOCK_CACHE_HITS, EXPORTER_BLOCK_CACHE_MISSES
+)
+
+
+class BlockCache:
+    __slots__ = (
+        "_node", "_block_hash", "_results"
+    )
+
+    def __init__(self, node: str) -> None:
+        self._node: str = node
+        self._block_hash: Optional[str] = None
+        self._results: Dict[Tuple[str, str], Any] = { }
+
+    @property
+    def block_hash(self) -> Optional[str]:
+        return self._block_hash
+
+    @staticmethod
+    def _key(rpc_call: RPCCall) -> Tuple[str, str]:
+        return rpc_call.method, json.dumps(rpc_call.params)
+
+    def update(self, block_hash: str) -> bool:
+        # Block-derived results only stay valid while the tip is unchanged
+        if block_hash == self._block_hash:
+            return False
+        self._block_hash = block_hash
+        self._results = { }
+        return True
+
+    def resolve(self, calls: List[RPCCall]) -> List[RPCCall]:
+        misses: List[RPCCall] = [ ]
+        for rpc_call in calls:
+            key: Tuple[str, str] = self._key(rpc_call)
+            if self._block_hash is not None and key in self._results:
+                rpc_call.set_result(self._results[key])
+                EXPORTER_BLOCK_CACHE_HITS.labels(node=self._node, method=rpc_call.method).inc()
+            else:
+                misses.append(rpc_call)
+                EXPORTER_BLOCK_CACHE_MISSES.labels(node=self._node, method=rpc_call.method).inc()
+        return misses
+
+    def store(self, calls: List[RPCCall], block_hash: Optional[str]) -> None:
+        # Skip results fetched for a tip that has since been replaced
+        if block_hash is None or block_hash != self._block_hash:
+            return
+        for rpc_call in calls:
+            try:
+                self._results[self._key(rpc_call)] = rpc_call.result()
+            except Exception:
+                # Errors are never cached, the call is retried next cycle
+                continue
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+
+from logging import (
+    Logger, Formatter, StreamHandler
+)
+from typing import (
+    Dict, List, Optional, Tuple
+)
+
+import json
+import logging
+import os
+import re
+import struct
+import zlib
+
+from prometheus_client import Counter
+
+from .blocks import BlockStats
+from .config import Config
+from .node import Node
+from .metrics import (
+    QTUM_WARNINGS, EXPORTER_CHECKPOINT_LOADS
+)
+
+logger: Logger = logging.getLogger("qtum-exporter-checkpoint")
+logger.setLevel(level=Config.LOGGING_LEVEL)
+formatter: Formatter = logging.Formatter(
+    fmt="%(asctime)s %(name)s %(levelname)s %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+)
+stream_handler: StreamHandler = logging.StreamHandler()
+stream_handler.setFormatter(fmt=formatter)
+logger.addHandler(stream_handler)
+
+# Counters of node state carried over restarts. The exporter's own counters are process-local and reset
+# with it like any other counter, records of them in older files are ignored.
+CHECKPOINT_COUNTERS: Dict[str, Counter] = {
+    counter.describe()[0].name: counter for counter in (QTUM_WARNINGS,)
+}
+
+MAGIC: bytes = b"QTCK\x01"
+# Every record is a type, payload length, payload and a CRC32 of all three
+RECORD_HEADER: struct.Struct = struct.Struct("<BH")
+RECORD_CRC: struct.Struct = struct.Struct("<I")
+RECORD_BLOCK, RECORD_POP, RECORD_CLEAR, RECORD_COUNTER = 1, 2, 3, 4
+# height, block hash, time, size, txs, fee, has interval, interval
+BLOCK_PAYLOAD: struct.Struct = struct.Struct("<q32sqqqq?q")
+COUNTER_PAYLOAD: struct.Struct = struct.Struct("<d")
+
+
+class CheckpointError(Exception):
+    pass
+
+
+def checkpoint_path(directory: str, node: str) -> str:
+    return os.path.join(directory, re.sub(r"[^A-Za-z0-9_.-]", "_", node) + ".checkpoint")
+
+
+def _record(record_type: int, payload: bytes = b"") -> bytes:
+    data: bytes = RECORD_HEADER.pack(record_type, len(payload)) + payload
+    return data + RECORD_CRC.pack(zlib.crc32(data))
+
+
+def _block_record(block: BlockStats) -> bytes:
+    return _record(RECORD_BLOCK, BLOCK_PAYLOAD.pack(
+        block.height, bytes.fromhex(block.block_hash), block.time, block.size, block.txs, block.fee,
+        block.interval is not None, block.interval or 0
+    ))
+
+
+def _counter_record(key: str, value: float) -> bytes:
+    return _record(RECORD_COUNTER, COUNTER_PAYLOAD.pack(value) + key.encode("utf-8"))
+
+
+class Checkpoint:
+    __slots__ = (
+        "_path", "_node", "_written", "_counters", "_records", "_compact"
+    )
+
+    def __init__(self, path: str, node: Node) -> None:
+        self._path: str = path
+        self._node: Node = node
+        # What the file holds, so a save only appends the difference
+        self._written: Dict[int, BlockStats] = { }
+        self._counters: Dict[str, float] = { }
+        self._records: int = 0
+        self._compact: bool = True
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def node(self) -> Node:
+        return self._node
+
+    def _counter_values(self) -> Dict[str, float]:
+        values: Dict[str, float] = { }
+        for name, counter in CHECKPOINT_COUNTERS.items():
+            for sample in counter.collect()[0].samples:
+                if sample.name == f"{name}_total" and sample.labels.get("node") == self._node.name:
+                    values[json.dumps([name, sample.labels], sort_keys=True)] = sample.value
+        return values
+
+    def _read(self) -> Tuple[List[Tuple[int, bytes]], bool]:
+        with open(self._path, "rb") as file:
+            data: bytes = file.read()
+        if not data.startswith(MAGIC):
+            raise CheckpointError("unknown file format")
+
+        records: List[Tuple[int, bytes]] = [ ]
+        offset: int = len(MAGIC)
+        while offset < len(data):
+            end: int = offset + RECORD_HEADER.size
+            if end > len(data):
+                # Torn final append, everything before it is still valid
+                return records, True
+            record_type, length = RECORD_HEADER.unpack_from(data, offset)
+            end += length + RECORD_CRC.size
+            if end > len(data):
+                return records, True
+            (crc,) = RECORD_CRC.unpack_from(data, end - RECORD_CRC.size)
+            if crc != zlib.crc32(data[offset:end - RECORD_CRC.size]):
+                raise CheckpointError(f"checksum mismatch at offset {offset}")
+            records.append((record_type, data[offset + RECORD_HEADER.size:end - RECORD_CRC.size]))
+            offset = end
+        return records, False
+
+    def load(self) -> bool:
+        # Any problem with the file means a cold start, blocks are refetched from the node
+        try:
+            records, torn = self._read()
+            # None stands for a block popped by a reorg
+            blocks: List[Optional[BlockStats]] = [ ]
+            counters: Dict[str, float] = { }
+            for record_type, payload in records:
+                if record_type == RECORD_BLOCK:
+                    height, block_hash, block_time, size, txs, fee, has_interval, interval = BLOCK_PAYLOAD.unpack(payload)
+                    blocks.append(BlockStats(
+                        height=height, block_hash=block_hash.hex(), time=block_time, size=size, txs=txs, fee=fee,
+                        interval=interval if has_interval else None
+                    ))
+                elif record_type == RECORD_POP:
+                    blocks.append(None)
+                elif record_type == RECORD_CLEAR:
+                    blocks.clear()
+                elif record_type == RECORD_COUNTER:
+                    (value,) = COUNTER_PAYLOAD.unpack_from(payload)
+                    counters[payload[COUNTER_PAYLOAD.size:].decode("utf-8")] = value
+                else:
+                    raise CheckpointError(f"unknown record type {record_type}")
+
+            self._node.blocks.clear()
+            for block in blocks:
+                if block is None:
+                    self._node.blocks.pop()
+                else:
+                    self._node.blocks.restore(block)
+        except FileNotFoundError:
+            EXPORTER_CHECKPOINT_LOADS.labels(node=self._node.name, result="missing").inc()
+            return False
+        except (OSError, CheckpointError, struct.error, ValueError, IndexError) as exception:
+            logger.warning(f"Node '{self._node.name}' checkpoint '{self._path}' discarded: {str(exception)}")
+            self._node.blocks.clear()
+            EXPORTER_CHECKPOINT_LOADS.labels(node=self._node.name, result="corrupt").inc()
+            return False
+
+        for key, value in counters.items():
+            name, labels = json.loads(key)
+            if name in CHECKPOINT_COUNTERS and labels.get("node") == self._node.name:
+                CHECKPOINT_COUNTERS[name].labels(**labels).inc(value)
+
+        self._written = {block.height: block for block in self._node.blocks}
+        self._counters = counters
+        self._records = len(records)
+        # Appending after a torn record would misalign everything after it
+        self._compact = torn
+        EXPORTER_CHECKPOINT_LOADS.labels(node=self._node.name, result="loaded").inc()
+        last: Optional[BlockStats] = self._node.blocks.last
+        logger.info(
+            f"Node '{self._node.name}' resumed {len(self._node.blocks)} blocks from checkpoint"
+            + (f" up to height {last.height}" if last is not None else "")
+        )
+        return True
+
+    def _diff(self) -> List[bytes]:
+        # The newest block both sides agree on, everything written after it is popped
+        common: int = -1
+        for block in reversed(list(self._node.blocks)):
+            if self._written.get(block.height) == block:
+                common = block.height
+                break
+        if common < 0 and self._written:
+            records: List[bytes] = [_record(RECORD_CLEAR)]
+        else:
+            records: List[bytes] = [_record(RECORD_POP) for height in self._written if height > common]
+        records.extend(_block_record(block) for block in self._node.blocks if block.height > common)
+        return records
+
+    def save(self) -> None:
+        counters: Dict[str, float] = self._counter_values()
+        if self._compact or self._records > 4 * self._node.blocks.window:
+            # Rewrite the current state only and swap it in atomically
+            records: List[bytes] = [_block_record(block) for block in self._node.blocks]
+            records.extend(_counter_record(key, value) for key, value in counters.items())
+            directory: str = os.path.dirname(self._path) or "."
+            os.makedirs(directory, exist_ok=True)
+            with open(f"{self._path}.tmp", "wb") as file:
+                file.write(MAGIC + b"".join(records))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(f"{self._path}.tmp", self._path)
+            self._records = len(records)
+            self._compact = False
+        else:
+            records: List[bytes] = self._diff()
+            records.extend(
+                _counter_record(key, value) for key, value in counters.items() if self._counters.get(key) != value
+            )
+            if not records:
+                return
+            with open(self._path, "ab") as file:
+                file.write(b"".join(records))
+                file.flush()
+                os.fsync(file.fileno())
+            self._records += len(records)
+        self._written = {block.height: block for block in self._node.blocks}
+        self._counters = counters
+
+
+def save_checkpoints(checkpoints: List[Checkpoint]) -> None:
+    for checkpoint in checkpoints:
+        try:
+            checkpoint.save()
+        except OSError as exception:
+            logger.error(f"Checkpoint '{checkpoint.path}' could not be written: {str(exception)}")
@@ -1,14 +1,34 @@
 #!/usr/bin/env python3
 
-from prometheus_client import Gauge
+from logging import (
+    Logger, Formatter, StreamHandler
+)
+from typing import (
+    Callable, Dict, Generator, List, Optional, Tuple
+)
 
-import decimal
+import asyncio
+import logging
+import time
 
-from .rpc import RPC
+from .amounts import to_coins
+from .rpc import (
+    AsyncRPC, CallFactory, RPC, RPCCall, RPCError, RPCMethods
+)
+from .blocks import BLOCK_STATS_KEYS
+from .breaker import CircuitOpenError
 from .config import Config
+from .diagnostics import PROFILER
+from .node import Node
+from .snapshot import Samples
+from .transactions import (
+    TX_TYPES, TxClassifier
+)
 from .metrics import (
     # Difficulty
     QTUM_DIFFICULTY,
+    # Snapshot
+    SNAPSHOT,
     # Hash per second
     QTUM_HASH_PS_GAUGES, hash_ps_gauge,
     # Memory info
@@ -19,8 +39,9 @@ from .metrics import (
     # Latest block
     QTUM_LATEST_BLOCK_SIZE, QTUM_LATEST_BLOCK_TXS, QTUM_LATEST_BLOCK_HEIGHT, QTUM_LATEST_BLOCK_WEIGHT,
     QTUM_LATEST_BLOCK_INPUTS, QTUM_LATEST_BLOCK_OUTPUTS, QTUM_LATEST_BLOCK_VALUE, QTUM_LATEST_BLOCK_FEE,
+    QTUM_LATEST_BLOCK_TYPE_TXS, QTUM_LATEST_BLOCK_TYPE_VALUE, QTUM_LATEST_BLOCK_TYPE_FEE,
     # List banned metrics
-    QTUM_BAN_CREATED, QTUM_BANNED_UNTIL,
+    QTUM_BAN_CREATED, QTUM_BANNED_UNTIL, QTUM_BANNED,
     # Network info
     QTUM_SERVER_VERSION, QTUM_PROTOCOL_VERSION, QTUM_WARNINGS, 
     QTUM_CONNECTIONS, QTUM_CONNECTIONS_IN, QTUM_CONNECTIONS_OUT,
@@ -34,110 +55,656 @@ from .metrics import (
     QTUM_ESTIMATED_SMART_FEE_GAUGES, estimate_smart_fee_gauge,
     # Network_totals,
     QTUM_TOTAL_BYTES_RECV, QTUM_TOTAL_BYTES_SENT,
+    # Staking and wallet
+    QTUM_NETWORK_STAKE_WEIGHT, QTUM_WALLET_AVAILABLE, QTUM_STAKING_ENABLED, QTUM_STAKING, QTUM_STAKING_WEIGHT,
+    QTUM_STAKING_EXPECTED_TIME, QTUM_WALLET_BALANCE, QTUM_WALLET_STAKE, QTUM_WALLET_UNCONFIRMED_BALANCE,
+    QTUM_WALLET_IMMATURE_BALANCE, QTUM_WALLET_TXS, QTUM_WALLET_KEYPOOL_SIZE, QTUM_WALLET_UNLOCKED_UNTIL,
     # Uptime
-    QTUM_UPTIME
+    QTUM_UPTIME,
+    # Exporter
+    QTUM_UP, EXPORTER_ERRORS, EXPORTER_MEMPOOL_ENTRIES_FETCHED, EXPORTER_BLOCK_STATS_FETCHED,
+    EXPORTER_COLLECT_PHASE_DURATION, EXPORTER_SERIES, EXPORTER_SERIES_CAPPED, EXPORTER_GROUP_LAST_SUCCESS,
+    EXPORTER_CONTRACT_BLOCKS_INDEXED
 )
 
 
-def collect() -> None:
-
-    with RPC(
-        url=f"http://{Config.QTUM_RPC_HOST}:{Config.QTUM_RPC_PORT}",
-        rpc_user=Config.QTUM_RPC_USER,
-        rpc_password=Config.QTUM_RPC_PASSWORD
-    ) as rpc:
-
-        # Set difficulty values
-        difficulty: dict = rpc.get_difficulty()
-        QTUM_DIFFICULTY.set(difficulty["proof-of-stake"])
-
-        # Set hash per second values
-        for hash_ps_block in Config.HASH_PS_BLOCKS:
-            hash_ps: int = rpc.get_network_hash_ps(num_blocks=hash_ps_block)
-            if hash_ps is not None:
-                gauge: Gauge = hash_ps_gauge(num_blocks=hash_ps_block)
-                gauge.set(hash_ps)
-
-        # Set memory info values
-        memory_info: dict = rpc.get_memory_info()
-        QTUM_MEMINFO_USED.set(memory_info["locked"]["used"])
-        QTUM_MEMINFO_FREE.set(memory_info["locked"]["free"])
-        QTUM_MEMINFO_TOTAL.set(memory_info["locked"]["total"])
-        QTUM_MEMINFO_LOCKED.set(memory_info["locked"]["locked"])
-        QTUM_MEMINFO_CHUNKS_USED.set(memory_info["locked"]["chunks_used"])
-        QTUM_MEMINFO_CHUNKS_FREE.set(memory_info["locked"]["chunks_free"])
-        
-        # Set blockchain info values
-        blockchain_info: dict = rpc.get_blockchain_info()
-        QTUM_BLOCKS.set(blockchain_info["blocks"])
-        # QTUM_DIFFICULTY.set(blockchain_info["difficulty"])
-        QTUM_SIZE_ON_DISK.set(blockchain_info["size_on_disk"])
-        QTUM_VERIFICATION_PROGRESS.set(blockchain_info["verificationprogress"])
-        
-        # Set latest block stats values
-        latest_block_stats: dict = rpc.get_block_stats(
-            blockchain_info["bestblockhash"], "total_size", "total_weight", "totalfee", "txs", "height", "ins", "outs", "total_out"
+logger: Logger = logging.getLogger("qtum-exporter-collector")
+logger.setLevel(level=Config.LOGGING_LEVEL)
+formatter: Formatter = logging.Formatter(
+    fmt="%(asctime)s %(name)s %(levelname)s %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+)
+stream_handler: StreamHandler = logging.StreamHandler()
+stream_handler.setFormatter(fmt=formatter)
+logger.addHandler(stream_handler)
+
+# A group yields the calls it needs, is resumed once they have results and may
+# yield again for calls that depend on earlier results.
+GroupGenerator = Generator[List[RPCCall], None, None]
+
+
+def probe_block_tip(rpc: RPCMethods, node: Node) -> GroupGenerator:
+    # A tip pushed over ZMQ is as fresh as a probe and costs no call
+    pushed_block_hash: Optional[str] = node.notifications.take_block_hash()
+    if pushed_block_hash is not None:
+        node.block_cache.update(pushed_block_hash)
+    # Optional cheap change probe, otherwise the tip last seen by blockchain_info is used
+    elif Config.BLOCK_CACHE_PROBE:
+        best_block_hash: RPCCall = rpc.get_best_block_hash()
+        yield [best_block_hash]
+        node.block_cache.update(best_block_hash.result())
+
+
+def fetch_block_derived(node: Node, calls: List[RPCCall]) -> GroupGenerator:
+    # Results of block-derived calls are reused until the best block hash moves
+    if not Config.BLOCK_CACHE:
+        yield calls
+        return
+    block_hash: Optional[str] = node.block_cache.block_hash
+    misses: List[RPCCall] = node.block_cache.resolve(calls)
+    if misses:
+        yield misses
+        node.block_cache.store(misses, block_hash=block_hash)
+
+
+class CollectorGroup:
+    __slots__ = (
+        "_name", "_function", "_interval", "_enabled", "_on_block", "_wallet"
+    )
+
+    def __init__(
+        self, name: str, function: Callable[[RPCMethods, Node, Samples], GroupGenerator], interval: Optional[float] = None,
+        enabled: bool = True, on_block: bool = False, wallet: bool = False
+    ) -> None:
+        self._name: str = name
+        self._function: Callable[[RPCMethods, Node, Samples], GroupGenerator] = function
+        self._interval: Optional[float] = interval
+        self._enabled: bool = enabled
+        # Only changes with the tip, so it is also collected on every ZMQ block notification
+        self._on_block: bool = on_block
+        # Only touches the wallet, no block or mempool state, so it can be collected on a worker of its own
+        self._wallet: bool = wallet
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def on_block(self) -> bool:
+        return self._on_block
+
+    @property
+    def wallet(self) -> bool:
+        return self._wallet
+
+    @property
+    def interval(self) -> float:
+        # GROUP_INTERVALS overrides the declared interval, which defaults to REFRESH_SECONDS
+        return Config.GROUP_INTERVALS.get(
+            self._name, self._interval if self._interval is not None else Config.REFRESH_SECONDS
         )
-        if latest_block_stats is not None:
-            QTUM_LATEST_BLOCK_SIZE.set(latest_block_stats["total_size"])
-            QTUM_LATEST_BLOCK_TXS.set(latest_block_stats["txs"])
-            QTUM_LATEST_BLOCK_HEIGHT.set(latest_block_stats["height"])
-            QTUM_LATEST_BLOCK_WEIGHT.set(latest_block_stats["total_weight"])
-            QTUM_LATEST_BLOCK_INPUTS.set(latest_block_stats["ins"])
-            QTUM_LATEST_BLOCK_OUTPUTS.set(latest_block_stats["outs"])
-            QTUM_LATEST_BLOCK_VALUE.set(latest_block_stats["total_out"] / decimal.Decimal(1e8))
-            QTUM_LATEST_BLOCK_FEE.set(latest_block_stats["totalfee"] / decimal.Decimal(1e8))
-        
-        # Set network info values
-        list_banned: list = rpc.list_banned()
-        for banned in list_banned:
-            QTUM_BAN_CREATED.labels(
-                address=banned["address"], reason=banned.get("ban_reason", "manually added")
-            ).set(banned["ban_created"])
-            QTUM_BANNED_UNTIL.labels(
-                address=banned["address"], reason=banned.get("ban_reason", "manually added")
-            ).set(banned["banned_until"])
-        
-        # Set network info values
-        network_info: dict = rpc.get_network_info()
-        QTUM_SERVER_VERSION.set(network_info["version"])
-        QTUM_PROTOCOL_VERSION.set(network_info["protocolversion"])
-        if network_info["warnings"]:
-            QTUM_WARNINGS.inc()
-        QTUM_CONNECTIONS.set(network_info["connections"])
-        if "connections_in" in network_info:
-            QTUM_CONNECTIONS_IN.set(network_info["connections_in"])
-        if "connections_out" in network_info:
-            QTUM_CONNECTIONS_OUT.set(network_info["connections_out"])
-
-        # Set chain tx stats values
-        chain_tx_stats: dict = rpc.get_chain_tx_stats()
-        QTUM_TX_COUNT.set(chain_tx_stats["txcount"])
-
-        # Set mempool info values
-        mempool_info: dict = rpc.get_mempool_info()
-        QTUM_MEMPOOL_BYTES.set(mempool_info["bytes"])
-        QTUM_MEMPOOL_SIZE.set(mempool_info["size"])
-        QTUM_MEMPOOL_USAGE.set(mempool_info["usage"])
-        if "unbroadcastcount" in mempool_info:
-            QTUM_MEMPOOL_UNBROADCAST.set(mempool_info["unbroadcastcount"])
-
-        # Set chain tips values
-        chain_tips: list = rpc.get_chain_tips()
-        QTUM_NUM_CHAIN_TIPS.set(len(chain_tips))
-
-        # Set estimate smart fee values
-        for smart_fee_block in Config.SMART_FEE_BLOCKS:
-            estimated_smart_fee: dict = rpc.estimate_smart_fee(num_blocks=smart_fee_block)
-            if estimated_smart_fee.get("feerate") is not None:
-                gauge: Gauge = estimate_smart_fee_gauge(num_blocks=smart_fee_block)
-                gauge.set(estimated_smart_fee["feerate"])
-        
-        # Set network totals values
-        network_totals: dict = rpc.get_network_totals()
-        QTUM_TOTAL_BYTES_RECV.set(network_totals["totalbytesrecv"])
-        QTUM_TOTAL_BYTES_SENT.set(network_totals["totalbytessent"])
-
-        # Set uptime values
-        uptime: int = rpc.get_uptime()
-        QTUM_UPTIME.set(uptime)
+
+    def start(self, node: Node, samples: Samples) -> GroupGenerator:
+        return self._function(CallFactory(), node, samples)
+
+
+def within_series_limit(node: Node, metric: str, count: int) -> bool:
+    # Past SERIES_LIMIT a per-item family is left out and only its aggregate is exported
+    capped: bool = count > Config.SERIES_LIMIT
+    EXPORTER_SERIES_CAPPED.labels(node=node.name, metric=metric).set(1 if capped else 0)
+    return not capped
+
+
+def exception_count(exception: Exception, node: str) -> None:
+    err_type = type(exception)
+    exception_name = err_type.__module__ + "." + err_type.__name__
+    EXPORTER_ERRORS.labels(**{"node": node, "type": exception_name}).inc()
+
+
+def collect_difficulty(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    difficulty: RPCCall = rpc.get_difficulty()
+    yield [difficulty]
+
+    # Set difficulty values
+    samples.set(QTUM_DIFFICULTY, difficulty.result()["proof-of-stake"])
+
+
+def collect_hash_ps(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    hash_ps_calls: Dict[int, RPCCall] = {
+        hash_ps_block: rpc.get_network_hash_ps(num_blocks=hash_ps_block)
+        for hash_ps_block in Config.HASH_PS_BLOCKS
+    }
+    yield from probe_block_tip(rpc, node)
+    yield from fetch_block_derived(node, list(hash_ps_calls.values()))
+
+    # Set hash per second values
+    for hash_ps_block, hash_ps_call in hash_ps_calls.items():
+        hash_ps: int = hash_ps_call.result()
+        if hash_ps is not None:
+            samples.set(hash_ps_gauge(num_blocks=hash_ps_block), hash_ps)
+
+
+def collect_memory_info(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    memory_info: RPCCall = rpc.get_memory_info()
+    yield [memory_info]
+
+    # Set memory info values
+    locked_memory_info: dict = memory_info.result()["locked"]
+    samples.set(QTUM_MEMINFO_USED, locked_memory_info["used"])
+    samples.set(QTUM_MEMINFO_FREE, locked_memory_info["free"])
+    samples.set(QTUM_MEMINFO_TOTAL, locked_memory_info["total"])
+    samples.set(QTUM_MEMINFO_LOCKED, locked_memory_info["locked"])
+    samples.set(QTUM_MEMINFO_CHUNKS_USED, locked_memory_info["chunks_used"])
+    samples.set(QTUM_MEMINFO_CHUNKS_FREE, locked_memory_info["chunks_free"])
+
+
+def collect_blockchain_info(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    blockchain_info_call: RPCCall = rpc.get_blockchain_info()
+    yield [blockchain_info_call]
+
+    # Set blockchain info values
+    blockchain_info: dict = blockchain_info_call.result()
+    samples.set(QTUM_BLOCKS, blockchain_info["blocks"])
+    # QTUM_DIFFICULTY.set(blockchain_info["difficulty"])
+    samples.set(QTUM_SIZE_ON_DISK, blockchain_info["size_on_disk"])
+    samples.set(QTUM_VERIFICATION_PROGRESS, blockchain_info["verificationprogress"])
+    node.block_cache.update(blockchain_info["bestblockhash"])
+
+    # Set latest block stats values (depends on the best block hash above)
+    latest_block_stats_call: RPCCall = rpc.get_block_stats(
+        blockchain_info["bestblockhash"], "total_size", "total_weight", "totalfee", "txs", "height", "ins", "outs", "total_out"
+    )
+    yield from fetch_block_derived(node, [latest_block_stats_call])
+
+    latest_block_stats: Optional[dict] = latest_block_stats_call.result()
+    if latest_block_stats is not None:
+        samples.set(QTUM_LATEST_BLOCK_SIZE, latest_block_stats["total_size"])
+        samples.set(QTUM_LATEST_BLOCK_TXS, latest_block_stats["txs"])
+        samples.set(QTUM_LATEST_BLOCK_HEIGHT, latest_block_stats["height"])
+        samples.set(QTUM_LATEST_BLOCK_WEIGHT, latest_block_stats["total_weight"])
+        samples.set(QTUM_LATEST_BLOCK_INPUTS, latest_block_stats["ins"])
+        samples.set(QTUM_LATEST_BLOCK_OUTPUTS, latest_block_stats["outs"])
+        samples.set(QTUM_LATEST_BLOCK_VALUE, to_coins(latest_block_stats["total_out"]))
+        samples.set(QTUM_LATEST_BLOCK_FEE, to_coins(latest_block_stats["totalfee"]))
+
+
+def collect_block_tx_types(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    # A pushed or probed tip costs no extra round trip, the tip is only asked for before any has been seen
+    yield from probe_block_tip(rpc, node)
+    block_hash: Optional[str] = node.block_cache.block_hash
+    if block_hash is None:
+        best_block_hash: RPCCall = rpc.get_best_block_hash()
+        yield [best_block_hash]
+        node.block_cache.update(best_block_hash.result())
+        block_hash = best_block_hash.result()
+
+    # Streamed once per tip, only the per-type sums are kept and cached
+    block: RPCCall = rpc.get_block(block_hash, verbosity=2, stream=TxClassifier())
+    yield from fetch_block_derived(node, [block])
+
+    # Set latest block values by transaction type, every type is set so one absent from this block reads 0
+    summary: dict = block.result()
+    for tx_type in TX_TYPES:
+        samples.set(QTUM_LATEST_BLOCK_TYPE_TXS, summary["counts"].get(tx_type, 0), type=tx_type)
+        samples.set(QTUM_LATEST_BLOCK_TYPE_VALUE, to_coins(summary["values"].get(tx_type, 0)), type=tx_type)
+        samples.set(QTUM_LATEST_BLOCK_TYPE_FEE, to_coins(summary["fees"].get(tx_type, 0)), type=tx_type)
+
+
+def collect_block_window(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    block_count: RPCCall = rpc.get_block_count()
+    last_hash: Optional[RPCCall] = rpc.get_block_hash(node.blocks.last.height) if node.blocks.last else None
+    yield [block_count] if last_hash is None else [block_count, last_hash]
+
+    # Walk back past tracked blocks that are no longer on the best chain
+    while last_hash is not None:
+        try:
+            if last_hash.result() == node.blocks.last.block_hash:
+                break
+        except RPCError:
+            # Above the new tip
+            pass
+        node.blocks.pop()
+        last_hash = rpc.get_block_hash(node.blocks.last.height) if node.blocks.last else None
+        if last_hash is not None:
+            yield [last_hash]
+
+    # Every height since the last tracked block, BLOCK_BACKFILL_BATCH calls at a time
+    heights: List[int] = node.blocks.missing(block_count.result())
+    for start in range(0, len(heights), Config.BLOCK_BACKFILL_BATCH):
+        block_stats_calls: List[RPCCall] = [
+            rpc.get_block_stats(height, *BLOCK_STATS_KEYS) for height in heights[start:start + Config.BLOCK_BACKFILL_BATCH]
+        ]
+        yield block_stats_calls
+
+        EXPORTER_BLOCK_STATS_FETCHED.labels(node=node.name).inc(len(block_stats_calls))
+        for block_stats_call in block_stats_calls:
+            node.blocks.append(block_stats_call.result())
+
+    # Set block window values
+    node.blocks.export(samples)
+
+
+def collect_list_banned(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    list_banned: RPCCall = rpc.list_banned()
+    yield [list_banned]
+
+    # Set list banned values, per address only while under the series limit
+    bans: list = list_banned.result()
+    reasons: Dict[str, int] = { }
+    for banned in bans:
+        reason: str = banned.get("ban_reason", "manually added")
+        reasons[reason] = reasons.get(reason, 0) + 1
+    for reason, count in reasons.items():
+        samples.set(QTUM_BANNED, count, reason=reason)
+    if not within_series_limit(node, metric="qtum_ban_created", count=len(bans)):
+        return
+
+    for banned in bans:
+        samples.set(
+            QTUM_BAN_CREATED, banned["ban_created"],
+            address=banned["address"], reason=banned.get("ban_reason", "manually added")
+        )
+        samples.set(
+            QTUM_BANNED_UNTIL, banned["banned_until"],
+            address=banned["address"], reason=banned.get("ban_reason", "manually added")
+        )
+
+
+def collect_network_version(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    network_info_call: RPCCall = rpc.get_network_info()
+    yield [network_info_call]
+
+    # Set network version values
+    network_info: dict = network_info_call.result()
+    samples.set(QTUM_SERVER_VERSION, network_info["version"])
+    samples.set(QTUM_PROTOCOL_VERSION, network_info["protocolversion"])
+
+
+def collect_network_info(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    network_info_call: RPCCall = rpc.get_network_info()
+    network_totals_call: RPCCall = rpc.get_network_totals()
+    yield [network_info_call, network_totals_call]
+
+    # Set network info values
+    network_info: dict = network_info_call.result()
+    samples.set(QTUM_CONNECTIONS, network_info["connections"])
+    if "connections_in" in network_info:
+        samples.set(QTUM_CONNECTIONS_IN, network_info["connections_in"])
+    if "connections_out" in network_info:
+        samples.set(QTUM_CONNECTIONS_OUT, network_info["connections_out"])
+    # Checked every refresh rather than with the slow version group, qtum_warnings counts refreshes with a warning
+    if network_info["warnings"]:
+        QTUM_WARNINGS.labels(node=node.name).inc()
+
+    # Set network totals values
+    network_totals: dict = network_totals_call.result()
+    samples.set(QTUM_TOTAL_BYTES_RECV, network_totals["totalbytesrecv"])
+    samples.set(QTUM_TOTAL_BYTES_SENT, network_totals["totalbytessent"])
+
+
+def collect_peers(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    peer_info: RPCCall = rpc.get_peer_info()
+    block_count: RPCCall = rpc.get_block_count()
+    yield [peer_info, block_count]
+
+    # Set peer values, rates come from the deltas since the last cycle
+    node.peers.update(peer_info.result(), block_height=block_count.result(), samples=samples)
+
+
+def collect_chain_tx_stats(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    chain_tx_stats: RPCCall = rpc.get_chain_tx_stats()
+    yield from probe_block_tip(rpc, node)
+    yield from fetch_block_derived(node, [chain_tx_stats])
+
+    # Set chain tx stats values
+    samples.set(QTUM_TX_COUNT, chain_tx_stats.result()["txcount"])
+
+
+def collect_mempool_info(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    mempool_info_call: RPCCall = rpc.get_mempool_info()
+    yield [mempool_info_call]
+
+    # Set mempool info values
+    mempool_info: dict = mempool_info_call.result()
+    samples.set(QTUM_MEMPOOL_BYTES, mempool_info["bytes"])
+    samples.set(QTUM_MEMPOOL_SIZE, mempool_info["size"])
+    samples.set(QTUM_MEMPOOL_USAGE, mempool_info["usage"])
+    if "unbroadcastcount" in mempool_info:
+        samples.set(QTUM_MEMPOOL_UNBROADCAST, mempool_info["unbroadcastcount"])
+
+
+def collect_mempool_analytics(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    raw_mempool: RPCCall = rpc.get_raw_mempool()
+    yield [raw_mempool]
+
+    # Only transactions not indexed yet need an entry, fetched in batches
+    new_txids: List[str] = node.mempool.diff(raw_mempool.result())[:Config.MEMPOOL_MAX_NEW_ENTRIES]
+    for start in range(0, len(new_txids), Config.MEMPOOL_ENTRY_BATCH):
+        entry_calls: Dict[str, RPCCall] = {
+            txid: rpc.get_mempool_entry(txid) for txid in new_txids[start:start + Config.MEMPOOL_ENTRY_BATCH]
+        }
+        yield list(entry_calls.values())
+
+        EXPORTER_MEMPOOL_ENTRIES_FETCHED.labels(node=node.name).inc(len(entry_calls))
+        for txid, entry_call in entry_calls.items():
+            try:
+                node.mempool.add(txid, entry_call.result())
+            except RPCError:
+                # Left the mempool since getrawmempool
+                continue
+
+    # Set mempool analytics values
+    node.mempool.export(samples)
+
+
+def collect_contracts(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    block_count: RPCCall = rpc.get_block_count()
+    yield [block_count]
+
+    # Every height is read once, in ranges sent together, then applied in order so a failed
+    # range and those after it are retried next refresh without counting anything twice
+    ranges: List[Tuple[int, int]] = node.contracts.pending(block_count.result())
+    if ranges:
+        search_logs_calls: List[RPCCall] = [rpc.search_logs(from_block, to_block) for from_block, to_block in ranges]
+        yield search_logs_calls
+
+        for (from_block, to_block), search_logs_call in zip(ranges, search_logs_calls):
+            node.contracts.add(search_logs_call.result(), to_block=to_block)
+            EXPORTER_CONTRACT_BLOCKS_INDEXED.labels(node=node.name).inc(to_block - from_block + 1)
+
+    # Set contract activity values
+    node.contracts.export(samples)
+
+
+def collect_chain_tips(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    chain_tips: RPCCall = rpc.get_chain_tips()
+    yield from probe_block_tip(rpc, node)
+    yield from fetch_block_derived(node, [chain_tips])
+
+    # Set chain tips values
+    samples.set(QTUM_NUM_CHAIN_TIPS, len(chain_tips.result()))
+
+
+def collect_smart_fee(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    smart_fee_calls: Dict[int, RPCCall] = {
+        smart_fee_block: rpc.estimate_smart_fee(num_blocks=smart_fee_block)
+        for smart_fee_block in Config.SMART_FEE_BLOCKS
+    }
+    yield list(smart_fee_calls.values())
+
+    # Set estimate smart fee values
+    for smart_fee_block, smart_fee_call in smart_fee_calls.items():
+        estimated_smart_fee: dict = smart_fee_call.result()
+        if estimated_smart_fee.get("feerate") is not None:
+            samples.set(estimate_smart_fee_gauge(num_blocks=smart_fee_block), estimated_smart_fee["feerate"])
+
+
+def collect_staking(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    mining_info: RPCCall = rpc.get_mining_info()
+    # Wallet calls are left out while the node has no wallet to answer them
+    wallet_calls: List[RPCCall] = [rpc.get_staking_info(), rpc.get_wallet_info()] if node.wallet.available else [ ]
+    yield [mining_info, *wallet_calls]
+
+    # Set staking values, getmininginfo answers without a wallet
+    net_stake_weight: Optional[int] = mining_info.result().get("netstakeweight")
+    if net_stake_weight is not None:
+        samples.set(QTUM_NETWORK_STAKE_WEIGHT, to_coins(net_stake_weight))
+    if wallet_calls:
+        try:
+            staking_info, wallet_info = (wallet_call.result() for wallet_call in wallet_calls)
+        except RPCError as error:
+            if not node.wallet.unavailable(error):
+                raise
+        else:
+            node.wallet.answered()
+            samples.set(QTUM_STAKING_ENABLED, 1 if staking_info["enabled"] else 0)
+            samples.set(QTUM_STAKING, 1 if staking_info["staking"] else 0)
+            samples.set(QTUM_STAKING_WEIGHT, to_coins(staking_info["weight"]))
+            samples.set(QTUM_STAKING_EXPECTED_TIME, staking_info["expectedtime"])
+            samples.set(QTUM_WALLET_BALANCE, wallet_info["balance"])
+            samples.set(QTUM_WALLET_STAKE, wallet_info.get("stake", 0))
+            samples.set(QTUM_WALLET_UNCONFIRMED_BALANCE, wallet_info["unconfirmed_balance"])
+            samples.set(QTUM_WALLET_IMMATURE_BALANCE, wallet_info["immature_balance"])
+            samples.set(QTUM_WALLET_TXS, wallet_info["txcount"])
+            samples.set(QTUM_WALLET_KEYPOOL_SIZE, wallet_info["keypoolsize"])
+            # Only encrypted wallets report it
+            if "unlocked_until" in wallet_info:
+                samples.set(QTUM_WALLET_UNLOCKED_UNTIL, wallet_info["unlocked_until"])
+    samples.set(QTUM_WALLET_AVAILABLE, 1 if node.wallet.available else 0)
+
+
+def collect_uptime(rpc: RPCMethods, node: Node, samples: Samples) -> GroupGenerator:
+    uptime: RPCCall = rpc.get_uptime()
+    yield [uptime]
+
+    # Set uptime values
+    samples.set(QTUM_UPTIME, uptime.result())
+
+
+# Groups without an interval refresh every REFRESH_SECONDS seconds, disabled groups are left out
+GROUPS: List[CollectorGroup] = [group for group in (
+    CollectorGroup(name="difficulty", function=collect_difficulty, on_block=True),
+    CollectorGroup(name="hash_ps", function=collect_hash_ps, interval=60, on_block=True),
+    CollectorGroup(name="memory_info", function=collect_memory_info, interval=600),
+    CollectorGroup(name="blockchain_info", function=collect_blockchain_info, on_block=True),
+    CollectorGroup(
+        name="block_tx_types", function=collect_block_tx_types, enabled=Config.BLOCK_TX_TYPES, on_block=True
+    ),
+    CollectorGroup(
+        name="block_window", function=collect_block_window, enabled=Config.BLOCK_WINDOW > 0, on_block=True
+    ),
+    CollectorGroup(name="list_banned", function=collect_list_banned),
+    CollectorGroup(name="network_version", function=collect_network_version, interval=600),
+    CollectorGroup(name="network_info", function=collect_network_info),
+    CollectorGroup(name="peers", function=collect_peers, enabled=Config.PEER_METRICS),
+    CollectorGroup(name="chain_tx_stats", function=collect_chain_tx_stats, on_block=True),
+    CollectorGroup(name="mempool_info", function=collect_mempool_info, interval=2),
+    CollectorGroup(name="mempool_analytics", function=collect_mempool_analytics, enabled=Config.MEMPOOL_ANALYTICS),
+    CollectorGroup(name="contracts", function=collect_contracts, enabled=Config.CONTRACT_METRICS, on_block=True),
+    CollectorGroup(name="chain_tips", function=collect_chain_tips, on_block=True),
+    CollectorGroup(name="smart_fee", function=collect_smart_fee, interval=60),
+    # Its own job and, in sync mode, its own worker, so slow wallet calls never hold up another group
+    CollectorGroup(
+        name="staking", function=collect_staking, interval=120, enabled=Config.STAKING_METRICS, wallet=True
+    ),
+    CollectorGroup(name="uptime", function=collect_uptime)
+) if group.enabled]
+
+
+def collect_jobs(groups: List[CollectorGroup] = GROUPS) -> Dict[str, Tuple[float, List[CollectorGroup]]]:
+    # Groups sharing an interval are collected together, in one batch per round, wallet groups in a job of their own
+    jobs: Dict[str, Tuple[float, List[CollectorGroup]]] = { }
+    for group in sorted(groups, key=lambda group: group.interval):
+        name: str = f"collect_{group.interval:g}s{'_wallet' if group.wallet else ''}"
+        jobs.setdefault(name, (group.interval, [ ]))[1].append(group)
+    return jobs
+
+
+def polled_groups(node: Node, groups: List[CollectorGroup]) -> List[CollectorGroup]:
+    # While ZMQ pushes blocks, block-derived groups only run on notification, a block
+    # whose collection was skipped because the node was busy is picked up by the next poll
+    if not node.notifications.live or node.notifications.pending:
+        return groups
+    return [group for group in groups if not group.on_block]
+
+
+def _group_failed(group: CollectorGroup, node: Node, exception: Exception) -> None:
+    logger.error(f"Node '{node.name}' group '{group.name}' failed: {str(exception)}", exc_info=True)
+    exception_count(exception, node=node.name)
+
+
+def _batch_failed(node: Node, groups: List[CollectorGroup], exception: Exception) -> None:
+    # One failure for the whole batch, however many groups were waiting on it
+    names: List[str] = [group.name for group in groups]
+    if isinstance(exception, CircuitOpenError):
+        logger.debug(f"Node '{node.name}' groups {names} skipped: {str(exception)}")
+        return
+    logger.error(f"Node '{node.name}' batch for groups {names} failed: {str(exception)}", exc_info=True)
+    exception_count(exception, node=node.name)
+
+
+def publish(node: Node, groups: Dict[str, Samples]) -> None:
+    # Swap the whole cycle in at once so a scrape never sees it half-applied, series a group
+    # no longer reports (e.g. lifted bans) are gone with its previous samples
+    with EXPORTER_COLLECT_PHASE_DURATION.labels(node=node.name, phase="publish").time():
+        SNAPSHOT.publish(node=node.name, groups=groups)
+    now: float = time.time()
+    for group, samples in groups.items():
+        EXPORTER_SERIES.labels(node=node.name, group=group).set(samples.series)
+        EXPORTER_GROUP_LAST_SUCCESS.labels(node=node.name, group=group).set(now)
+        node.last_success[group] = now
+
+
+def drop_stale(node: Node, groups: List[CollectorGroup]) -> None:
+    # Samples a group failed to refresh for STALE_INTERVALS of its intervals stop being served as current
+    if not Config.STALE_INTERVALS:
+        return
+    now: float = time.time()
+    stale: Dict[str, Samples] = {
+        group.name: Samples(node=node.name) for group in groups
+        if now - node.last_success.get(group.name, now) > Config.STALE_INTERVALS * group.interval
+    }
+    if not stale:
+        return
+    logger.warning(f"Node '{node.name}' dropped stale groups {sorted(stale)}")
+    SNAPSHOT.publish(node=node.name, groups=stale)
+    for group in stale:
+        EXPORTER_SERIES.labels(node=node.name, group=group).set(0)
+        del node.last_success[group]
+
+
+def collect(rpc: RPC, node: Node, groups: List[CollectorGroup] = GROUPS) -> bool:
+
+    # Start every group, each round of pending calls goes out as one batch
+    pending: Dict[CollectorGroup, List[RPCCall]] = { }
+    generators: Dict[CollectorGroup, GroupGenerator] = { }
+    samples: Dict[CollectorGroup, Samples] = { }
+    succeeded: Dict[str, Samples] = { }
+    with EXPORTER_COLLECT_PHASE_DURATION.labels(node=node.name, phase="groups").time():
+        for group in groups:
+            samples[group] = Samples(node=node.name)
+            generators[group] = group.start(node=node, samples=samples[group])
+            try:
+                pending[group] = next(generators[group])
+            except StopIteration:
+                succeeded[group.name] = samples[group]
+            except Exception as exception:
+                _group_failed(group=group, node=node, exception=exception)
+
+    try:
+        while pending:
+            round_failure: Optional[Exception] = None
+            try:
+                with EXPORTER_COLLECT_PHASE_DURATION.labels(node=node.name, phase="rpc").time(), rpc.batch() as batch:
+                    for calls in pending.values():
+                        batch.extend(calls)
+            except Exception as exception:
+                # Transport error, timeout or open circuit: only groups left waiting on the batch fail,
+                # those already finished are still published
+                round_failure = exception
+                _batch_failed(node=node, groups=[
+                    group for group, calls in pending.items() if not all(call.done for call in calls)
+                ], exception=exception)
+
+            resumed, pending = pending, { }
+            with EXPORTER_COLLECT_PHASE_DURATION.labels(node=node.name, phase="groups").time():
+                for group, calls in resumed.items():
+                    if round_failure is not None and not all(call.done for call in calls):
+                        continue
+                    try:
+                        pending[group] = next(generators[group])
+                    except StopIteration:
+                        succeeded[group.name] = samples[group]
+                    except Exception as exception:
+                        # A failing call only takes its own group down, its last samples stay published
+                        _group_failed(group=group, node=node, exception=exception)
+    finally:
+        for generator in generators.values():
+            generator.close()
+        publish(node=node, groups=succeeded)
+
+    return len(succeeded) > 0 or not groups
+
+
+async def _collect_group_async(rpc: AsyncRPC, node: Node, group: CollectorGroup) -> Optional[Samples]:
+    samples: Samples = Samples(node=node.name)
+    generator: GroupGenerator = group.start(node=node, samples=samples)
+    try:
+        with EXPORTER_COLLECT_PHASE_DURATION.labels(node=node.name, phase="groups").time():
+            calls: List[RPCCall] = next(generator)
+        while True:
+            with EXPORTER_COLLECT_PHASE_DURATION.labels(node=node.name, phase="rpc").time():
+                await rpc.execute(calls)
+            with EXPORTER_COLLECT_PHASE_DURATION.labels(node=node.name, phase="groups").time():
+                calls = next(generator)
+    except StopIteration:
+        return samples
+    except CircuitOpenError as exception:
+        # The breaker already logged why, the group just waits for the node to recover
+        logger.debug(f"Node '{node.name}' group '{group.name}' skipped: {str(exception)}")
+        return None
+    except Exception as exception:
+        _group_failed(group=group, node=node, exception=exception)
+        return None
+    finally:
+        generator.close()
+
+
+async def collect_async(rpc: AsyncRPC, node: Node, groups: List[CollectorGroup] = GROUPS) -> bool:
+
+    # Groups run concurrently, so a slow call only delays its own group
+    succeeded: Dict[str, Samples] = { }
+
+    async def run(group: CollectorGroup) -> None:
+        samples: Optional[Samples] = await _collect_group_async(rpc=rpc, node=node, group=group)
+        if samples is not None:
+            succeeded[group.name] = samples
+
+    try:
+        await asyncio.gather(*(run(group) for group in groups))
+    finally:
+        # Even a cancelled collection publishes the groups that finished
+        publish(node=node, groups=succeeded)
+    return len(succeeded) > 0 or not groups
+
+
+def _node_collected(node: Node, up: bool, groups: List[CollectorGroup]) -> None:
+    samples: Samples = Samples(node=node.name)
+    samples.set(QTUM_UP, 1 if up else 0)
+    SNAPSHOT.publish(node=node.name, groups={"up": samples})
+    drop_stale(node=node, groups=groups)
+
+
+def collect_node(rpc: RPC, node: Node, groups: List[CollectorGroup] = GROUPS) -> None:
+    # Failures stay isolated to the node they happened on
+    try:
+        # Profiled while /debug/profile captures cycles
+        with PROFILER.cycle():
+            up: bool = collect(rpc=rpc, node=node, groups=groups)
+    except CircuitOpenError as exception:
+        logger.debug(f"Node '{node.name}' skipped: {str(exception)}")
+        up = False
+    except Exception as exception:
+        logger.error(f"Node '{node.name}' failed: {str(exception)}", exc_info=True)
+        exception_count(exception, node=node.name)
+        up = False
+    _node_collected(node=node, up=up, groups=groups)
+
+
+async def collect_node_async(rpc: AsyncRPC, node: Node, groups: List[CollectorGroup] = GROUPS) -> None:
+    try:
+        # Other coroutines running meanwhile share the loop thread, so they show up in the profile too
+        with PROFILER.cycle():
+            up: bool = await collect_async(rpc=rpc, node=node, groups=groups)
+    except CircuitOpenError as exception:
+        logger.debug(f"Node '{node.name}' skipped: {str(exception)}")
+        up = False
+    except Exception as exception:
+        logger.error(f"Node '{node.name}' failed: {str(exception)}", exc_info=True)
+        exception_count(exception, node=node.name)
+        up = False
+    _node_collected(node=node, up=up, groups=groups)
+
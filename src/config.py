@@ -11,6 +11,9 @@ class Config(object):
     QTUM_RPC_USER: str = os.environ.get("QTUM_RPC_USER", default="qtum")
     QTUM_RPC_PASSWORD: str = os.environ.get("QTUM_RPC_PASSWORD", default="testpasswd")
 
+    NODE_NAME: str = os.environ.get("NODE_NAME", default="")
+    NODES_FILE: str = os.environ.get("NODES_FILE", default="")
+
     HASH_PS_BLOCKS: typing.List[int] = [
         int(block) for block in os.environ.get("HASH_PS_BLOCKS", default="-1,1,120").split(",") if block != str()
     ]
@@ -20,7 +23,107 @@ class Config(object):
 
     METRICS_ADDRESS: str = os.environ.get("METRICS_ADDRESS", default="0.0.0.0")
     METRICS_PORT: int = int(os.environ.get("METRICS_PORT", default="6363"))
+    EXPOSITION_MAX_CONNECTIONS: int = int(os.environ.get("EXPOSITION_MAX_CONNECTIONS", default=1000))
+    EXPOSITION_IDLE_TIMEOUT: float = float(os.environ.get("EXPOSITION_IDLE_TIMEOUT", default=60))
+    EXPOSITION_REQUEST_TIMEOUT: float = float(os.environ.get("EXPOSITION_REQUEST_TIMEOUT", default=10))
+    EXPOSITION_MAX_AGE: float = float(os.environ.get("EXPOSITION_MAX_AGE", default=5))
+
+    RPC_BATCH: bool = os.environ.get("RPC_BATCH", default="true").lower() in ("1", "true", "yes")
+    RPC_MAX_CONNECTIONS: int = int(os.environ.get("RPC_MAX_CONNECTIONS", default=10))
+    RPC_MAX_KEEPALIVE_CONNECTIONS: int = int(os.environ.get("RPC_MAX_KEEPALIVE_CONNECTIONS", default=5))
+    RPC_KEEPALIVE_EXPIRY: float = float(os.environ.get("RPC_KEEPALIVE_EXPIRY", default=60))
+    RPC_MAX_IN_FLIGHT: int = int(os.environ.get("RPC_MAX_IN_FLIGHT", default=4))
+
+    ASYNC_COLLECTOR: bool = os.environ.get("ASYNC_COLLECTOR", default="false").lower() in ("1", "true", "yes")
+    COLLECT_ON_SCRAPE: bool = os.environ.get("COLLECT_ON_SCRAPE", default="false").lower() in ("1", "true", "yes")
+    SCRAPE_MIN_INTERVAL: float = float(os.environ.get("SCRAPE_MIN_INTERVAL", default=5))
+
+    ZMQ_PUB_HASHBLOCK: str = os.environ.get("ZMQ_PUB_HASHBLOCK", default="")
+    ZMQ_PUB_RAWTX: str = os.environ.get("ZMQ_PUB_RAWTX", default="")
+    ZMQ_QUIET_SECONDS: float = float(os.environ.get("ZMQ_QUIET_SECONDS", default=300))
+
+    BLOCK_CACHE: bool = os.environ.get("BLOCK_CACHE", default="true").lower() in ("1", "true", "yes")
+    # Without it chain_tips, chain_tx_stats and hash_ps are resolved against the tip of the previous collection
+    BLOCK_CACHE_PROBE: bool = os.environ.get("BLOCK_CACHE_PROBE", default="true").lower() in ("1", "true", "yes")
+
+    MEMPOOL_ANALYTICS: bool = os.environ.get("MEMPOOL_ANALYTICS", default="true").lower() in ("1", "true", "yes")
+    # Used as a range() step, so anything below 1 is raised to 1
+    MEMPOOL_ENTRY_BATCH: int = max(1, int(os.environ.get("MEMPOOL_ENTRY_BATCH", default=500)))
+    MEMPOOL_MAX_NEW_ENTRIES: int = int(os.environ.get("MEMPOOL_MAX_NEW_ENTRIES", default=5000))
+    MEMPOOL_FEE_RATE_BUCKETS: typing.List[float] = [
+        float(bucket) for bucket in os.environ.get(
+            "MEMPOOL_FEE_RATE_BUCKETS", default="400,500,750,1000,2000,5000,10000,50000"
+        ).split(",") if bucket != str()
+    ]
+    MEMPOOL_VSIZE_BUCKETS: typing.List[float] = [
+        float(bucket) for bucket in os.environ.get(
+            "MEMPOOL_VSIZE_BUCKETS", default="250,500,1000,2000,5000,10000,50000,100000"
+        ).split(",") if bucket != str()
+    ]
+
+    BLOCK_WINDOW: int = int(os.environ.get("BLOCK_WINDOW", default=144))
+    # Used as a range() step, so anything below 1 is raised to 1
+    BLOCK_BACKFILL_BATCH: int = max(1, int(os.environ.get("BLOCK_BACKFILL_BATCH", default=16)))
+    BLOCK_TX_TYPES: bool = os.environ.get("BLOCK_TX_TYPES", default="true").lower() in ("1", "true", "yes")
+
+    CHECKPOINT_DIR: str = os.environ.get("CHECKPOINT_DIR", default="")
+    CHECKPOINT_SECONDS: float = float(os.environ.get("CHECKPOINT_SECONDS", default=60))
+    SHUTDOWN_TIMEOUT: float = float(os.environ.get("SHUTDOWN_TIMEOUT", default=5))
+
+    SLOW_CALLS: int = int(os.environ.get("SLOW_CALLS", default=0))
+    SLOW_CALL_SECONDS: float = float(os.environ.get("SLOW_CALL_SECONDS", default=1))
+    DEBUG_ENDPOINTS: bool = os.environ.get("DEBUG_ENDPOINTS", default="false").lower() in ("1", "true", "yes")
+    PROCESS_METRICS: bool = os.environ.get("PROCESS_METRICS", default="false").lower() in ("1", "true", "yes")
+
+    JSON_CODEC: str = os.environ.get("JSON_CODEC", default="auto").lower()
+
+    PEER_METRICS: bool = os.environ.get("PEER_METRICS", default="true").lower() in ("1", "true", "yes")
+    PEER_TOP_K: int = int(os.environ.get("PEER_TOP_K", default=10))
+    PEER_PING_BUCKETS: typing.List[float] = [
+        float(bucket) for bucket in os.environ.get(
+            "PEER_PING_BUCKETS", default="0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5"
+        ).split(",") if bucket != str()
+    ]
+    PEER_LAG_BUCKETS: typing.List[float] = [
+        float(bucket) for bucket in os.environ.get(
+            "PEER_LAG_BUCKETS", default="0,1,2,5,10,100,1000,10000"
+        ).split(",") if bucket != str()
+    ]
+
+    CONTRACT_METRICS: bool = os.environ.get("CONTRACT_METRICS", default="false").lower() in ("1", "true", "yes")
+    CONTRACT_WATCH: typing.List[str] = [
+        contract.strip().lower().removeprefix("0x")
+        for contract in os.environ.get("CONTRACT_WATCH", default="").split(",") if contract.strip() != str()
+    ]
+    CONTRACT_TOP_K: int = int(os.environ.get("CONTRACT_TOP_K", default=10))
+    CONTRACT_MAX_TRACKED: int = int(os.environ.get("CONTRACT_MAX_TRACKED", default=1000))
+    # Used as a range() step, so anything below 1 is raised to 1
+    CONTRACT_BATCH_BLOCKS: int = max(1, int(os.environ.get("CONTRACT_BATCH_BLOCKS", default=20)))
+    CONTRACT_MAX_BLOCKS: int = int(os.environ.get("CONTRACT_MAX_BLOCKS", default=500))
+    CONTRACT_CONFIRMATIONS: int = int(os.environ.get("CONTRACT_CONFIRMATIONS", default=2))
+
+    STAKING_METRICS: bool = os.environ.get("STAKING_METRICS", default="true").lower() in ("1", "true", "yes")
+    WALLET_TIMEOUT: float = float(os.environ.get("WALLET_TIMEOUT", default=30))
+    WALLET_RECHECK_SECONDS: float = float(os.environ.get("WALLET_RECHECK_SECONDS", default=600))
+
+    SERIES_LIMIT: int = int(os.environ.get("SERIES_LIMIT", default=1000))
+
+    BREAKER_FAILURES: int = int(os.environ.get("BREAKER_FAILURES", default=3))
+    BREAKER_BACKOFF: float = float(os.environ.get("BREAKER_BACKOFF", default=5))
+    BREAKER_MAX_BACKOFF: float = float(os.environ.get("BREAKER_MAX_BACKOFF", default=300))
+    BREAKER_PROBE_TIMEOUT: float = float(os.environ.get("BREAKER_PROBE_TIMEOUT", default=2))
+    STALE_INTERVALS: float = float(os.environ.get("STALE_INTERVALS", default=0))
+
+    FAST_TIMEOUT: float = float(os.environ.get("FAST_TIMEOUT", default=5))
+    METHOD_TIMEOUTS: typing.Dict[str, float] = {
+        method.split("=")[0].strip(): float(method.split("=")[1])
+        for method in os.environ.get("METHOD_TIMEOUTS", default="").split(",") if method != str()
+    }
 
     TIMEOUT: float = float(os.environ.get("TIMEOUT", default=15))
     REFRESH_SECONDS: int = int(os.environ.get("REFRESH_SECONDS", default=5))
+    GROUP_INTERVALS: typing.Dict[str, float] = {
+        group.split("=")[0].strip(): float(group.split("=")[1])
+        for group in os.environ.get("GROUP_INTERVALS", default="").split(",") if group != str()
+    }
     LOGGING_LEVEL: str = os.environ.get("LOGGING_LEVEL", default="INFO")
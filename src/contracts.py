@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+from typing import (
+    Dict, Iterable, List, Optional, Set, Tuple
+)
+
+import heapq
+
+from .config import Config
+from .metrics import (
+    QTUM_CONTRACT_GAS_USED, QTUM_CONTRACT_TXS, QTUM_CONTRACT_EVENTS, QTUM_CONTRACT_TRANSFERS,
+    QTUM_CONTRACTS_GAS_USED, QTUM_CONTRACTS_TXS, QTUM_CONTRACTS_EVENTS, QTUM_CONTRACTS_TRANSFERS,
+    QTUM_CONTRACTS_TRACKED, QTUM_CONTRACTS_INDEXED_HEIGHT
+)
+from .snapshot import Samples
+
+# keccak256("Transfer(address,address,uint256)"), the first topic of every QRC20 transfer
+TRANSFER_TOPIC: str = "ddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+
+class ContractStats:
+    __slots__ = (
+        "_gas_used", "_txs", "_events", "_transfers"
+    )
+
+    def __init__(self) -> None:
+        self._gas_used: int = 0
+        self._txs: int = 0
+        self._events: int = 0
+        self._transfers: int = 0
+
+    @property
+    def gas_used(self) -> int:
+        return self._gas_used
+
+    @property
+    def txs(self) -> int:
+        return self._txs
+
+    @property
+    def events(self) -> int:
+        return self._events
+
+    @property
+    def transfers(self) -> int:
+        return self._transfers
+
+    def add_tx(self, gas_used: int) -> None:
+        self._gas_used += gas_used
+        self._txs += 1
+
+    def add_event(self, transfer: bool) -> None:
+        self._events += 1
+        self._transfers += 1 if transfer else 0
+
+
+class ContractTracker:
+    __slots__ = (
+        "_height", "_contracts", "_totals", "_watched"
+    )
+
+    def __init__(self, watched: Iterable[str] = Config.CONTRACT_WATCH) -> None:
+        # Last indexed height, every height at or below it has been counted exactly once
+        self._height: Optional[int] = None
+        # Running totals of at most CONTRACT_MAX_TRACKED contracts plus the watched ones
+        self._contracts: Dict[str, ContractStats] = { }
+        self._totals: ContractStats = ContractStats()
+        self._watched: Set[str] = set(watched)
+
+    def __len__(self) -> int:
+        return len(self._contracts)
+
+    @property
+    def height(self) -> Optional[int]:
+        return self._height
+
+    def pending(self, block_count: int) -> List[Tuple[int, int]]:
+        # Height ranges not indexed yet, CONTRACT_BATCH_BLOCKS each and at most CONTRACT_MAX_BLOCKS per refresh.
+        # Heights are only indexed once they have CONTRACT_CONFIRMATIONS, so a short reorg is never counted twice.
+        confirmed: int = block_count - max(Config.CONTRACT_CONFIRMATIONS, 1) + 1
+        # A fresh tracker starts at the confirmed tip instead of rescanning the chain
+        start: int = confirmed if self._height is None else self._height + 1
+        end: int = min(confirmed, start + Config.CONTRACT_MAX_BLOCKS - 1)
+        return [
+            (from_block, min(from_block + Config.CONTRACT_BATCH_BLOCKS - 1, end))
+            for from_block in range(start, end + 1, Config.CONTRACT_BATCH_BLOCKS)
+        ]
+
+    def add(self, receipts: List[dict], to_block: int) -> None:
+        # Receipts of every height up to to_block, each contract output of a transaction has its own receipt.
+        # Gas counts for the contract called, events for the contract that emitted them (e.g. a token
+        # transferred by a DEX call).
+        for receipt in receipts:
+            gas_used: int = receipt.get("gasUsed", 0)
+            self._totals.add_tx(gas_used=gas_used)
+            self._stats(receipt.get("contractAddress", "")).add_tx(gas_used=gas_used)
+            for log in receipt.get("log", [ ]):
+                transfer: bool = bool(log.get("topics")) and log["topics"][0] == TRANSFER_TOPIC
+                self._totals.add_event(transfer=transfer)
+                self._stats(log.get("address", "")).add_event(transfer=transfer)
+        self._height = to_block
+        self._evict()
+
+    def _stats(self, contract: str) -> ContractStats:
+        stats: Optional[ContractStats] = self._contracts.get(contract)
+        if stats is None:
+            stats = self._contracts[contract] = ContractStats()
+        return stats
+
+    def _activity(self, contract: str) -> Tuple[int, int]:
+        # Gas first, tokens only ever emitting events through other contracts rank by events
+        stats: ContractStats = self._contracts[contract]
+        return stats.gas_used, stats.events
+
+    def _evict(self) -> None:
+        # Past CONTRACT_MAX_TRACKED the least active contracts are forgotten, watched ones are kept
+        excess: int = len(self._contracts) - Config.CONTRACT_MAX_TRACKED
+        if excess <= 0:
+            return
+        for contract in heapq.nsmallest(
+            excess, (contract for contract in self._contracts if contract not in self._watched),
+            key=self._activity
+        ):
+            del self._contracts[contract]
+
+    def export(self, samples: Samples) -> None:
+        samples.set(QTUM_CONTRACTS_GAS_USED, self._totals.gas_used)
+        samples.set(QTUM_CONTRACTS_TXS, self._totals.txs)
+        samples.set(QTUM_CONTRACTS_EVENTS, self._totals.events)
+        samples.set(QTUM_CONTRACTS_TRANSFERS, self._totals.transfers)
+        samples.set(QTUM_CONTRACTS_TRACKED, len(self._contracts))
+        if self._height is not None:
+            samples.set(QTUM_CONTRACTS_INDEXED_HEIGHT, self._height)
+
+        # Only the most active contracts get their own series, watched ones always do
+        busiest: List[str] = heapq.nlargest(
+            Config.CONTRACT_TOP_K, self._contracts, key=self._activity
+        )
+        for contract in set(busiest) | self._watched:
+            stats: ContractStats = self._contracts.get(contract) or ContractStats()
+            samples.set(QTUM_CONTRACT_GAS_USED, stats.gas_used, contract=contract)
+            samples.set(QTUM_CONTRACT_TXS, stats.txs, contract=contract)
+            samples.set(QTUM_CONTRACT_EVENTS, stats.events, contract=contract)
+            samples.set(QTUM_CONTRACT_TRANSFERS, stats.transfers, contract=contract)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+
+from contextlib import (
+    AbstractContextManager, contextmanager, nullcontext
+)
+from prometheus_client import (
+    CollectorRegistry, REGISTRY
+)
+from threading import (
+    Event, Lock
+)
+from typing import (
+    Dict, Iterator, List, Optional, Tuple
+)
+
+import cProfile
+import gc
+import io
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+
+from .metrics import (
+    EXPORTER_GC_PAUSE, EXPORTER_MAX_RSS
+)
+
+# Shared by every collection while no capture is running
+_IDLE: AbstractContextManager = nullcontext()
+
+# Frames of the tracer itself and of imports are noise in an allocation report
+_TRACE_FILTERS: Tuple[tracemalloc.Filter, ...] = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>")
+)
+
+
+class Profiler:
+    __slots__ = (
+        "_remaining", "_cycles", "_stats", "_lock", "_busy", "_done"
+    )
+
+    def __init__(self) -> None:
+        # Collect cycles still to profile, 0 while no capture is running
+        self._remaining: int = 0
+        self._cycles: int = 0
+        self._stats: Optional[pstats.Stats] = None
+        self._lock: Lock = Lock()
+        # cProfile only sees its own thread, so one cycle is profiled at a time on the thread running it
+        self._busy: Lock = Lock()
+        self._done: Event = Event()
+
+    @property
+    def active(self) -> bool:
+        return self._remaining > 0
+
+    def start(self, cycles: int) -> bool:
+        # Returns False while another capture is running
+        with self._lock:
+            if self._remaining > 0:
+                return False
+            self._remaining, self._cycles, self._stats = cycles, 0, None
+            self._done.clear()
+            return True
+
+    def cycle(self) -> AbstractContextManager:
+        # Wraps one collect cycle, a plain attribute check while no capture is running
+        return _IDLE if self._remaining <= 0 else self._profiled()
+
+    @contextmanager
+    def _profiled(self) -> Iterator[None]:
+        # Cycles running on other nodes meanwhile are not profiled, the next ones are
+        if not self._busy.acquire(blocking=False):
+            yield
+            return
+        profile: cProfile.Profile = cProfile.Profile()
+        try:
+            profile.enable()
+            yield
+        finally:
+            profile.disable()
+            self._busy.release()
+            self._add(profile)
+
+    def _add(self, profile: cProfile.Profile) -> None:
+        with self._lock:
+            if self._remaining <= 0:
+                return
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self._cycles += 1
+            self._remaining -= 1
+            if self._remaining == 0:
+                self._done.set()
+
+    def wait(self, timeout: float) -> bool:
+        return self._done.wait(timeout)
+
+    def stop(self, sort: str = "cumulative", limit: int = 50) -> str:
+        # Ends the capture, even if fewer cycles ran than asked for, and reports what was profiled
+        with self._lock:
+            self._remaining = 0
+            self._done.set()
+            cycles, stats = self._cycles, self._stats
+        if stats is None:
+            return "No collect cycle was profiled\n"
+        report: io.StringIO = io.StringIO()
+        report.write(f"Profiled {cycles} collect cycles\n")
+        stats.stream = report
+        stats.sort_stats(sort).print_stats(limit)
+        return report.getvalue()
+
+
+class AllocationTracer:
+    __slots__ = (
+        "_snapshot", "_lock"
+    )
+
+    def __init__(self) -> None:
+        # Last snapshot taken, the next report diffs against it
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._lock: Lock = Lock()
+
+    @staticmethod
+    def _take() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+
+    def report(self, key: str = "lineno", limit: int = 25, frames: int = 1) -> dict:
+        # The first report starts tracing, which slows every allocation down until stop()
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self._snapshot = self._take()
+                return {"tracing": True, "started": True}
+            snapshot: tracemalloc.Snapshot = self._take()
+            top: List[tracemalloc.Statistic] = snapshot.statistics(key)[:limit]
+            diff: List[tracemalloc.StatisticDiff] = (
+                snapshot.compare_to(self._snapshot, key)[:limit] if self._snapshot is not None else [ ]
+            )
+            self._snapshot = snapshot
+            traced, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": True, "started": False, "traced_bytes": traced, "peak_bytes": peak,
+            "top": [
+                {"traceback": stat.traceback.format(), "size": stat.size, "count": stat.count} for stat in top
+            ],
+            "diff": [
+                {
+                    "traceback": stat.traceback.format(), "size": stat.size, "size_diff": stat.size_diff,
+                    "count": stat.count, "count_diff": stat.count_diff
+                } for stat in diff
+            ]
+        }
+
+    def stop(self) -> None:
+        with self._lock:
+            tracemalloc.stop()
+            self._snapshot = None
+
+
+def series_counts(registry: CollectorRegistry = REGISTRY) -> Dict[str, int]:
+    # Series per metric family, largest first, histogram buckets each count as a series
+    counts: Dict[str, int] = {
+        family.name: len(family.samples) for family in registry.collect()
+    }
+    return dict(sorted(counts.items(), key=lambda count: count[1], reverse=True))
+
+
+class Diagnostics:
+    __slots__ = (
+        "_profiler", "_allocations", "_registry"
+    )
+
+    def __init__(self, profiler: Profiler, registry: CollectorRegistry = REGISTRY) -> None:
+        self._profiler: Profiler = profiler
+        self._allocations: AllocationTracer = AllocationTracer()
+        self._registry: CollectorRegistry = registry
+
+    @property
+    def profiler(self) -> Profiler:
+        return self._profiler
+
+    @property
+    def allocations(self) -> AllocationTracer:
+        return self._allocations
+
+    def series(self) -> Dict[str, int]:
+        return series_counts(registry=self._registry)
+
+
+PROFILER: Profiler = Profiler()
+
+
+class GcPauses:
+    __slots__ = (
+        "_start", "_pauses"
+    )
+
+    def __init__(self) -> None:
+        self._start: float = 0.0
+        # Labelled children resolved once, the callback runs on every collection
+        self._pauses: List = [EXPORTER_GC_PAUSE.labels(generation=str(generation)) for generation in range(3)]
+
+    def __call__(self, phase: str, info: dict) -> None:
+        # Collections never overlap, the interpreter runs one at a time
+        if phase == "start":
+            self._start = time.perf_counter()
+        else:
+            self._pauses[info["generation"]].observe(time.perf_counter() - self._start)
+
+
+def max_rss() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def enable_process_metrics(registry: CollectorRegistry = REGISTRY) -> None:
+    # Current RSS and collection counts already come from prometheus_client's process and gc collectors
+    registry.register(EXPORTER_GC_PAUSE)
+    registry.register(EXPORTER_MAX_RSS)
+    EXPORTER_MAX_RSS.set_function(max_rss)
+    gc.callbacks.append(GcPauses())
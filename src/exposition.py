@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+
+from prometheus_client import (
+    CollectorRegistry, REGISTRY, CONTENT_TYPE_LATEST, generate_latest
+)
+from prometheus_client.openmetrics.exposition import (
+    CONTENT_TYPE_LATEST as OPENMETRICS_CONTENT_TYPE_LATEST, generate_latest as openmetrics_generate_latest
+)
+from functools import partial
+from http import HTTPStatus
+from threading import (
+    Lock, Thread
+)
+from typing import (
+    Callable, Dict, List, Optional, Set, Tuple
+)
+from urllib.parse import parse_qsl
+
+import asyncio
+import gzip
+import hashlib
+import json
+import time
+
+from .config import Config
+from .diagnostics import Diagnostics
+from .instrumentation import SlowCalls
+from .metrics import (
+    EXPORTER_HTTP_CONNECTIONS, EXPORTER_HTTP_CONNECTIONS_REJECTED, EXPORTER_HTTP_REQUESTS
+)
+from .snapshot import SnapshotCollector
+
+# Status, headers and body
+Response = Tuple[int, List[Tuple[str, str]], bytes]
+
+# Request limits, anything beyond them drops the connection
+MAX_LINE: int = 16384
+MAX_HEADERS: int = 100
+MAX_BODY: int = 65536
+
+# Request paths by handler label, any other path serves the metrics page
+HANDLERS: Dict[str, str] = {
+    "/favicon.ico": "favicon", "/healthz": "healthz", "/ready": "ready", "/debug/slow_calls": "slow_calls",
+    "/debug/profile": "profile", "/debug/tracemalloc": "tracemalloc", "/debug/tracemalloc/stop": "tracemalloc",
+    "/debug/series": "series"
+}
+
+# Sort keys /debug/profile accepts, as understood by pstats
+PROFILE_SORTS: Tuple[str, ...] = ("cumulative", "tottime", "ncalls", "filename")
+TRACEMALLOC_KEYS: Tuple[str, ...] = ("lineno", "filename", "traceback")
+
+
+class Rendered:
+    __slots__ = (
+        "_generation", "_rendered_at", "_content_type", "_body", "_gzip_body", "_etag"
+    )
+
+    def __init__(self, generation: int, content_type: str, body: bytes) -> None:
+        self._generation: int = generation
+        self._rendered_at: float = time.monotonic()
+        self._content_type: str = content_type
+        self._body: bytes = body
+        self._gzip_body: bytes = gzip.compress(body, compresslevel=6)
+        self._etag: str = hashlib.sha1(body).hexdigest()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @property
+    def rendered_at(self) -> float:
+        return self._rendered_at
+
+    @property
+    def content_type(self) -> str:
+        return self._content_type
+
+    def body(self, gzipped: bool) -> bytes:
+        return self._gzip_body if gzipped else self._body
+
+    def etag(self, gzipped: bool) -> str:
+        # Each encoding is its own representation, so it gets its own validator
+        return f"\"{self._etag}-gzip\"" if gzipped else f"\"{self._etag}\""
+
+
+class ExpositionCache:
+    __slots__ = (
+        "_snapshot", "_registry", "_max_age", "_rendered", "_lock"
+    )
+
+    def __init__(
+        self, snapshot: SnapshotCollector, registry: CollectorRegistry = REGISTRY,
+        max_age: float = Config.EXPOSITION_MAX_AGE
+    ) -> None:
+        self._snapshot: SnapshotCollector = snapshot
+        self._registry: CollectorRegistry = registry
+        # Self-metrics, breaker state and process metrics change without a publish, so even an unchanged
+        # snapshot is re-rendered after max_age, most of all while a stalled node publishes nothing
+        self._max_age: float = max_age
+        self._rendered: Dict[bool, Rendered] = { }
+        self._lock: Lock = Lock()
+
+    def _fresh(self, rendered: Optional[Rendered], generation: int) -> bool:
+        return (
+            rendered is not None and rendered.generation == generation
+            and time.monotonic() - rendered.rendered_at < self._max_age
+        )
+
+    def cached(self, openmetrics: bool) -> Optional[Rendered]:
+        # The last render while no new snapshot has been published since and it is not older than max_age
+        rendered: Optional[Rendered] = self._rendered.get(openmetrics)
+        return rendered if self._fresh(rendered, self._snapshot.generation) else None
+
+    def get(self, openmetrics: bool) -> Rendered:
+        # Fast path: reuse the last render until a new snapshot is published or it ages out
+        rendered: Optional[Rendered] = self.cached(openmetrics)
+        if rendered is not None:
+            return rendered
+
+        with self._lock:
+            generation: int = self._snapshot.generation
+            rendered = self._rendered.get(openmetrics)
+            if not self._fresh(rendered, generation):
+                if openmetrics:
+                    rendered = Rendered(
+                        generation, OPENMETRICS_CONTENT_TYPE_LATEST, openmetrics_generate_latest(self._registry)
+                    )
+                else:
+                    rendered = Rendered(
+                        generation, CONTENT_TYPE_LATEST, generate_latest(self._registry)
+                    )
+                self._rendered[openmetrics] = rendered
+            return rendered
+
+
+def accepts_openmetrics(accept: str) -> bool:
+    return any(
+        accepted.split(";")[0].strip() == "application/openmetrics-text" for accepted in accept.split(",")
+    )
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    return any(
+        encoding.split(";")[0].strip() == "gzip" for encoding in accept_encoding.split(",")
+    )
+
+
+class ExpositionHandler:
+    __slots__ = (
+        "_cache", "_slow_calls", "_on_scrape", "_ready", "_diagnostics"
+    )
+
+    def __init__(
+        self, cache: ExpositionCache, slow_calls: Optional[SlowCalls] = None,
+        on_scrape: Optional[Callable[[], None]] = None, ready: Optional[Callable[[], bool]] = None,
+        diagnostics: Optional[Diagnostics] = None
+    ) -> None:
+        self._cache: ExpositionCache = cache
+        self._slow_calls: Optional[SlowCalls] = slow_calls
+        # Only set with DEBUG_ENDPOINTS, the profiling and tracing endpoints answer 404 otherwise
+        self._diagnostics: Optional[Diagnostics] = diagnostics
+        # Only set in collect-on-scrape mode, otherwise a scrape never waits on the node
+        self._on_scrape: Optional[Callable[[], None]] = on_scrape
+        self._ready: Optional[Callable[[], bool]] = ready
+
+    async def _debug(self, path: str, query: Dict[str, str]) -> Response:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        if path == "/debug/profile":
+            cycles: int = int(query.get("cycles", "1"))
+            timeout: float = float(query.get("timeout", "60"))
+            sort: str = query.get("sort", "cumulative")
+            if cycles < 1 or sort not in PROFILE_SORTS:
+                raise ValueError(f"cycles must be positive and sort one of {', '.join(PROFILE_SORTS)}")
+            if not self._diagnostics.profiler.start(cycles=cycles):
+                return 409, [("Content-Type", "text/plain")], b"A profile is already being captured\n"
+            # Waits for the collections to run, at most timeout seconds
+            await loop.run_in_executor(None, self._diagnostics.profiler.wait, timeout)
+            report: str = self._diagnostics.profiler.stop(sort=sort, limit=int(query.get("limit", "50")))
+            return 200, [("Content-Type", "text/plain")], report.encode("utf-8")
+
+        if path == "/debug/tracemalloc":
+            key: str = query.get("key", "lineno")
+            if key not in TRACEMALLOC_KEYS:
+                raise ValueError(f"key must be one of {', '.join(TRACEMALLOC_KEYS)}")
+            # Snapshots walk every traced block, so they are taken off the loop
+            allocations: dict = await loop.run_in_executor(
+                None, partial(
+                    self._diagnostics.allocations.report, key=key, limit=int(query.get("limit", "25")),
+                    frames=int(query.get("frames", "1"))
+                )
+            )
+            return 200, [("Content-Type", "application/json")], json.dumps(allocations, indent=2).encode("utf-8")
+
+        if path == "/debug/tracemalloc/stop":
+            self._diagnostics.allocations.stop()
+            return 200, [("Content-Type", "text/plain")], b"tracemalloc stopped\n"
+
+        series: Dict[str, int] = await loop.run_in_executor(None, self._diagnostics.series)
+        body: bytes = json.dumps({"total": sum(series.values()), "families": series}, indent=2).encode("utf-8")
+        return 200, [("Content-Type", "application/json")], body
+
+    async def respond(self, path: str, headers: Dict[str, str], query: Optional[Dict[str, str]] = None) -> Response:
+        if path == "/favicon.ico":
+            return 200, [ ], b""
+
+        if path == "/healthz":
+            # The event loop answering is all liveness needs
+            return 200, [("Content-Type", "text/plain")], b"ok\n"
+
+        if path == "/ready":
+            if self._ready is not None and not self._ready():
+                return 503, [("Content-Type", "text/plain")], b"waiting for the first collection\n"
+            return 200, [("Content-Type", "text/plain")], b"ready\n"
+
+        if path == "/debug/slow_calls":
+            if self._slow_calls is None or not self._slow_calls.enabled:
+                return 404, [("Content-Type", "text/plain")], (
+                    b"Slow call log is disabled, set SLOW_CALLS to enable it\n"
+                )
+            body: bytes = json.dumps(self._slow_calls.calls(), indent=2, default=str).encode("utf-8")
+            return 200, [("Content-Type", "application/json")], body
+
+        if path in HANDLERS and path.startswith("/debug/"):
+            if self._diagnostics is None:
+                return 404, [("Content-Type", "text/plain")], (
+                    b"Debug endpoints are disabled, set DEBUG_ENDPOINTS to enable them\n"
+                )
+            try:
+                return await self._debug(path, query or { })
+            except ValueError as exception:
+                return 400, [("Content-Type", "text/plain")], f"{str(exception)}\n".encode("utf-8")
+
+        # Anything else is the metrics page, like prometheus_client's own server
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        if self._on_scrape is not None:
+            await loop.run_in_executor(None, self._on_scrape)
+
+        gzipped: bool = accepts_gzip(headers.get("accept-encoding", ""))
+        openmetrics: bool = accepts_openmetrics(headers.get("accept", ""))
+        # Rendering is CPU bound, only a stale render leaves the loop
+        rendered: Optional[Rendered] = self._cache.cached(openmetrics=openmetrics)
+        if rendered is None:
+            rendered = await loop.run_in_executor(None, self._cache.get, openmetrics)
+        etag: str = rendered.etag(gzipped=gzipped)
+        response_headers: List[Tuple[str, str]] = [
+            ("Content-Type", rendered.content_type), ("ETag", etag), ("Vary", "Accept, Accept-Encoding")
+        ]
+
+        if_none_match: str = headers.get("if-none-match", "")
+        if if_none_match == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return 304, response_headers, b""
+
+        if gzipped:
+            response_headers.append(("Content-Encoding", "gzip"))
+        return 200, response_headers, rendered.body(gzipped=gzipped)
+
+
+class ExpositionServer:
+    __slots__ = (
+        "_handler", "_addr", "_port", "_max_connections", "_idle_timeout", "_request_timeout", "_connections",
+        "_loop", "_server", "_thread"
+    )
+
+    def __init__(
+        self, handler: ExpositionHandler, addr: str, port: int,
+        max_connections: int = Config.EXPOSITION_MAX_CONNECTIONS,
+        idle_timeout: float = Config.EXPOSITION_IDLE_TIMEOUT,
+        request_timeout: float = Config.EXPOSITION_REQUEST_TIMEOUT
+    ) -> None:
+        self._handler: ExpositionHandler = handler
+        self._addr: str = addr
+        self._port: int = port
+        self._max_connections: int = max_connections
+        # How long a keep-alive connection may sit between requests
+        self._idle_timeout: float = idle_timeout
+        # How long a client may take to send a request's headers or read its response
+        self._request_timeout: float = request_timeout
+        # Connection tasks, cancelled on shutdown
+        self._connections: Set[asyncio.Task] = set()
+        self._loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[Thread] = None
+
+    @property
+    def server_port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    @property
+    def thread(self) -> Optional[Thread]:
+        return self._thread
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, str, Dict[str, str]]]:
+        request_line: bytes = await asyncio.wait_for(reader.readline(), timeout=self._idle_timeout)
+        if not request_line.strip():
+            return None
+        method, target, version = request_line.decode("latin-1").split()
+        headers: Dict[str, str] = { }
+
+        async def read_headers() -> None:
+            for _ in range(MAX_HEADERS):
+                line: bytes = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    return
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            raise ValueError("too many headers")
+
+        await asyncio.wait_for(read_headers(), timeout=self._request_timeout)
+        # Bodies mean nothing to a GET, they are only read so the next pipelined request lines up
+        length: int = int(headers.get("content-length", "0"))
+        if length > MAX_BODY or "transfer-encoding" in headers:
+            raise ValueError("request body not supported")
+        if length:
+            await asyncio.wait_for(reader.readexactly(length), timeout=self._request_timeout)
+        return method, target, version, headers
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if len(self._connections) >= self._max_connections:
+            writer.close()
+            EXPORTER_HTTP_CONNECTIONS_REJECTED.inc()
+            return
+        task: asyncio.Task = asyncio.current_task()
+        self._connections.add(task)
+        EXPORTER_HTTP_CONNECTIONS.inc()
+        try:
+            # Requests on a connection are answered in order, which is all HTTP/1.1 pipelining asks for
+            while True:
+                request: Optional[Tuple[str, str, str, Dict[str, str]]] = await self._read_request(reader)
+                if request is None:
+                    return
+                method, target, version, headers = request
+                path, _, query = target.partition("?")
+                connection: str = headers.get("connection", "").lower()
+                keep_alive: bool = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+                if method not in ("GET", "HEAD"):
+                    status, response_headers, body = 405, [("Allow", "GET, HEAD")], b""
+                else:
+                    status, response_headers, body = await self._handler.respond(path, headers, dict(parse_qsl(query)))
+                EXPORTER_HTTP_REQUESTS.labels(handler=HANDLERS.get(path, "metrics"), code=str(status)).inc()
+
+                response_headers = response_headers + [
+                    ("Content-Length", str(len(body))), ("Connection", "keep-alive" if keep_alive else "close")
+                ]
+                writer.write(
+                    f"{version if version in ('HTTP/1.0', 'HTTP/1.1') else 'HTTP/1.1'} {status} "
+                    f"{HTTPStatus(status).phrase}\r\n".encode("latin-1")
+                    + "".join(f"{name}: {value}\r\n" for name, value in response_headers).encode("latin-1")
+                    + b"\r\n" + (body if method == "GET" else b"")
+                )
+                # A scraper that stops reading only holds up its own connection
+                await asyncio.wait_for(writer.drain(), timeout=self._request_timeout)
+                if not keep_alive:
+                    return
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+            # Idle, slow, malformed or gone, the connection is simply dropped
+            return
+        finally:
+            self._connections.discard(task)
+            EXPORTER_HTTP_CONNECTIONS.dec()
+            writer.close()
+
+    def start(self) -> None:
+        self._server = self._loop.run_until_complete(asyncio.start_server(
+            self._serve, host=self._addr, port=self._port, limit=MAX_LINE, reuse_address=True
+        ))
+        self._thread = Thread(target=self._loop.run_forever, name="qtum-exporter-exposition", daemon=True)
+        self._thread.start()
+
+    async def _close(self) -> None:
+        self._server.close()
+        connections: List[asyncio.Task] = list(self._connections)
+        for task in connections:
+            task.cancel()
+        await asyncio.gather(*connections, return_exceptions=True)
+
+    def shutdown(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+def start_exposition_server(
+    port: int, addr: str, cache: ExpositionCache, slow_calls: Optional[SlowCalls] = None,
+    on_scrape: Optional[Callable[[], None]] = None, ready: Optional[Callable[[], bool]] = None,
+    diagnostics: Optional[Diagnostics] = None
+) -> Tuple[ExpositionServer, Thread]:
+    server: ExpositionServer = ExpositionServer(
+        handler=ExpositionHandler(
+            cache=cache, slow_calls=slow_calls, on_scrape=on_scrape, ready=ready, diagnostics=diagnostics
+        ),
+        addr=addr, port=port
+    )
+    server.start()
+    return server, server.thread
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+from collections import deque
+from typing import (
+    Any, Deque, Dict, List, Optional, Tuple
+)
+
+import time
+
+from .config import Config
+from .metrics import (
+    EXPORTER_RPC_DURATION, EXPORTER_RPC_REQUEST_BYTES, EXPORTER_RPC_RESPONSE_BYTES, EXPORTER_RPC_ERRORS
+)
+
+
+class SlowCalls:
+    __slots__ = (
+        "_threshold", "_calls"
+    )
+
+    def __init__(self, size: int = Config.SLOW_CALLS, threshold: float = Config.SLOW_CALL_SECONDS) -> None:
+        self._threshold: float = threshold
+        # Bounded, appends and copies are atomic so RPC threads never wait on the debug endpoint
+        self._calls: Deque[dict] = deque(maxlen=size)
+
+    @property
+    def enabled(self) -> bool:
+        return self._calls.maxlen > 0
+
+    def record(self, url: str, seconds: float, calls: List[Tuple[str, list]], error: Optional[str] = None) -> None:
+        if self._calls.maxlen and seconds >= self._threshold:
+            self._calls.append({
+                "time": time.time(), "url": url, "seconds": seconds, "error": error,
+                "calls": [{"method": method, "params": params} for method, params in calls]
+            })
+
+    def calls(self) -> List[dict]:
+        # Slowest first
+        return sorted(list(self._calls), key=lambda call: call["seconds"], reverse=True)
+
+
+SLOW_CALLS: SlowCalls = SlowCalls()
+
+# Labelled children per node and method, resolving labels is the costly part of an observation
+_method_metrics: Dict[Tuple[str, str], Tuple[Any, Any, Any]] = { }
+
+
+def observe_call(
+    node: str, method: str, seconds: float, request_bytes: int, response_bytes: int, error_code: Optional[int] = None
+) -> None:
+    metrics: Optional[Tuple[Any, Any, Any]] = _method_metrics.get((node, method))
+    if metrics is None:
+        metrics = _method_metrics.setdefault((node, method), (
+            EXPORTER_RPC_DURATION.labels(node=node, method=method),
+            EXPORTER_RPC_REQUEST_BYTES.labels(node=node, method=method),
+            EXPORTER_RPC_RESPONSE_BYTES.labels(node=node, method=method)
+        ))
+    # In a batch every call sees the round trip of the whole batch
+    metrics[0].observe(seconds)
+    metrics[1].observe(request_bytes)
+    metrics[2].observe(response_bytes)
+    if error_code is not None:
+        EXPORTER_RPC_ERRORS.labels(node=node, method=method, code=str(error_code)).inc()
+
+
+def observe_transport_error(node: str, methods: List[str]) -> None:
+    for method in methods:
+        EXPORTER_RPC_ERRORS.labels(node=node, method=method, code="transport").inc()
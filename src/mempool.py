@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+from typing import (
+    Dict, List, Optional, Set, Tuple
+)
+
+import bisect
+import heapq
+import time
+
+from .amounts import to_satoshis
+from .metrics import (
+    QTUM_MEMPOOL_FEE_RATE, QTUM_MEMPOOL_TX_VSIZE, QTUM_MEMPOOL_OLDEST_TX_AGE, QTUM_MEMPOOL_TRACKED_TXS
+)
+from .snapshot import Samples
+
+# txid -> (fee rate in satoshis per vbyte, vsize, time entered the mempool)
+MempoolEntry = Tuple[float, int, int]
+
+
+class MempoolTracker:
+    __slots__ = (
+        "_entries", "_fee_rate_counts", "_fee_rate_sum", "_vsize_counts", "_vsize_sum", "_times"
+    )
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, MempoolEntry] = { }
+        # Histograms are kept up to date on every add and remove instead of being rebuilt each cycle
+        self._fee_rate_counts: List[int] = [0] * len(QTUM_MEMPOOL_FEE_RATE.buckets)
+        self._fee_rate_sum: float = 0.0
+        self._vsize_counts: List[int] = [0] * len(QTUM_MEMPOOL_TX_VSIZE.buckets)
+        self._vsize_sum: int = 0
+        # Min-heap of (time, txid), removed txids are skipped lazily
+        self._times: List[Tuple[int, str]] = [ ]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def diff(self, txids: List[str]) -> List[str]:
+        # Forget txids that left the mempool and return the ones not indexed yet
+        current: Set[str] = set(txids)
+        for txid in [txid for txid in self._entries if txid not in current]:
+            self._remove(txid)
+        return [txid for txid in txids if txid not in self._entries]
+
+    def add(self, txid: str, entry: dict) -> None:
+        if txid in self._entries:
+            return
+        vsize: int = entry["vsize"]
+        fee: int = to_satoshis(entry["fees"]["base"] if "fees" in entry else entry["fee"])
+        fee_rate: float = fee / vsize if vsize else 0.0
+        self._entries[txid] = (fee_rate, vsize, entry["time"])
+
+        self._fee_rate_counts[bisect.bisect_left(QTUM_MEMPOOL_FEE_RATE.buckets, fee_rate)] += 1
+        self._fee_rate_sum += fee_rate
+        self._vsize_counts[bisect.bisect_left(QTUM_MEMPOOL_TX_VSIZE.buckets, vsize)] += 1
+        self._vsize_sum += vsize
+        heapq.heappush(self._times, (entry["time"], txid))
+
+    def _remove(self, txid: str) -> None:
+        fee_rate, vsize, _ = self._entries.pop(txid)
+        self._fee_rate_counts[bisect.bisect_left(QTUM_MEMPOOL_FEE_RATE.buckets, fee_rate)] -= 1
+        self._fee_rate_sum -= fee_rate
+        self._vsize_counts[bisect.bisect_left(QTUM_MEMPOOL_TX_VSIZE.buckets, vsize)] -= 1
+        self._vsize_sum -= vsize
+        # Skipped entries only leave the heap once they reach its top, so one long-lived transaction
+        # would keep every later removal, past twice the live entries the heap is rebuilt from them
+        if len(self._times) > 2 * len(self._entries):
+            self._times = [(entry_time, txid) for txid, (_, _, entry_time) in self._entries.items()]
+            heapq.heapify(self._times)
+
+    def oldest_time(self) -> Optional[int]:
+        while self._times:
+            entry_time, txid = self._times[0]
+            entry: Optional[MempoolEntry] = self._entries.get(txid)
+            if entry is not None and entry[2] == entry_time:
+                return entry_time
+            heapq.heappop(self._times)
+        return None
+
+    def export(self, samples: Samples) -> None:
+        samples.histogram(QTUM_MEMPOOL_FEE_RATE, self._fee_rate_counts, self._fee_rate_sum)
+        samples.histogram(QTUM_MEMPOOL_TX_VSIZE, self._vsize_counts, self._vsize_sum)
+        samples.set(QTUM_MEMPOOL_TRACKED_TXS, len(self._entries))
+        oldest_time: Optional[int] = self.oldest_time()
+        samples.set(
+            QTUM_MEMPOOL_OLDEST_TX_AGE, max(time.time() - oldest_time, 0) if oldest_time is not None else 0
+        )
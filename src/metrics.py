@@ -1,24 +1,33 @@
 #!/usr/bin/env python3
 
 from prometheus_client import (
-    Gauge, Counter
+    Gauge, Counter, Histogram, REGISTRY
 )
 from typing import (
     Optional, Dict
 )
 
+from .config import Config
+from .snapshot import (
+    SnapshotCollector, SnapshotCounter, SnapshotGauge, SnapshotHistogram
+)
+
+# Node metrics are rendered from the snapshot published at the end of each collect cycle
+SNAPSHOT: SnapshotCollector = SnapshotCollector()
+REGISTRY.register(SNAPSHOT)
+
 
 # Difficulty metrics
-QTUM_DIFFICULTY: Gauge = Gauge(
-    "qtum_difficulty", "The current difficulty"
+QTUM_DIFFICULTY: SnapshotGauge = SnapshotGauge(
+    "qtum_difficulty", "The current difficulty", labelnames=["node"]
 )
 
 # Hash per second metrics
-QTUM_HASH_PS_GAUGES: Dict[int, Gauge] = { }
+QTUM_HASH_PS_GAUGES: Dict[int, SnapshotGauge] = { }
 
 
-def hash_ps_gauge(num_blocks: int) -> Gauge:
-    gauge: Optional[Gauge] = QTUM_HASH_PS_GAUGES.get(num_blocks)
+def hash_ps_gauge(num_blocks: int) -> SnapshotGauge:
+    gauge: Optional[SnapshotGauge] = QTUM_HASH_PS_GAUGES.get(num_blocks)
 
     def hashps_gauge_suffix(nblocks):
         if nblocks < 0:
@@ -31,156 +40,433 @@ def hash_ps_gauge(num_blocks: int) -> Gauge:
         desc_end: str = (
             "since the last difficulty change" if num_blocks == -1 else f"for the last {num_blocks} blocks"
         )
-        gauge: Gauge = Gauge(
+        gauge: SnapshotGauge = SnapshotGauge(
             f"qtum_hash_ps{hashps_gauge_suffix(num_blocks)}",
-            f"Estimated network hash rate per second {desc_end}",
+            f"Estimated network hash rate per second {desc_end}", labelnames=["node"]
         )
         QTUM_HASH_PS_GAUGES[num_blocks] = gauge
     return gauge
 
 
 # Memory info metrics
-QTUM_MEMINFO_USED: Gauge = Gauge(
-    "qtum_meminfo_used", "Number of bytes used"
+QTUM_MEMINFO_USED: SnapshotGauge = SnapshotGauge(
+    "qtum_meminfo_used", "Number of bytes used", labelnames=["node"]
 )
-QTUM_MEMINFO_FREE: Gauge = Gauge(
-    "qtum_meminfo_free", "Number of bytes available in current arenas"
+QTUM_MEMINFO_FREE: SnapshotGauge = SnapshotGauge(
+    "qtum_meminfo_free", "Number of bytes available in current arenas", labelnames=["node"]
 )
-QTUM_MEMINFO_TOTAL: Gauge = Gauge(
-    "qtum_meminfo_total", "Total number of bytes managed"
+QTUM_MEMINFO_TOTAL: SnapshotGauge = SnapshotGauge(
+    "qtum_meminfo_total", "Total number of bytes managed", labelnames=["node"]
 )
-QTUM_MEMINFO_LOCKED: Gauge = Gauge(
+QTUM_MEMINFO_LOCKED: SnapshotGauge = SnapshotGauge(
     "qtum_meminfo_locked", "Amount of bytes that succeeded locking. If this number is smaller than total, "
-                           "locking pages failed at some point and key data could be swapped to disk."
+                           "locking pages failed at some point and key data could be swapped to disk.",
+    labelnames=["node"]
 )
-QTUM_MEMINFO_CHUNKS_USED: Gauge = Gauge(
-    "qtum_meminfo_chunks_used", "Number of allocated chunks"
+QTUM_MEMINFO_CHUNKS_USED: SnapshotGauge = SnapshotGauge(
+    "qtum_meminfo_chunks_used", "Number of allocated chunks", labelnames=["node"]
 )
-QTUM_MEMINFO_CHUNKS_FREE: Gauge = Gauge(
-    "qtum_meminfo_chunks_free", "Number of unused chunks"
+QTUM_MEMINFO_CHUNKS_FREE: SnapshotGauge = SnapshotGauge(
+    "qtum_meminfo_chunks_free", "Number of unused chunks", labelnames=["node"]
 )
 
 # Blockchain info metrics
-QTUM_BLOCKS: Gauge = Gauge(
-    "qtum_blocks", "The current number of blocks processed in the server"
+QTUM_BLOCKS: SnapshotGauge = SnapshotGauge(
+    "qtum_blocks", "The current number of blocks processed in the server", labelnames=["node"]
 )
-QTUM_SIZE_ON_DISK: Gauge = Gauge(
-    "qtum_size_on_disk", "The estimated size of the block and undo files on disk"
+QTUM_SIZE_ON_DISK: SnapshotGauge = SnapshotGauge(
+    "qtum_size_on_disk", "The estimated size of the block and undo files on disk", labelnames=["node"]
 )
-QTUM_VERIFICATION_PROGRESS: Gauge = Gauge(
-    "qtum_verification_progress", "Estimate of verification progress [0..1]"
+QTUM_VERIFICATION_PROGRESS: SnapshotGauge = SnapshotGauge(
+    "qtum_verification_progress", "Estimate of verification progress [0..1]", labelnames=["node"]
 )
 
 # Latest block stats metrics
-QTUM_LATEST_BLOCK_SIZE: Gauge = Gauge(
-    "qtum_latest_block_size", "Size of latest block in bytes"
+QTUM_LATEST_BLOCK_SIZE: SnapshotGauge = SnapshotGauge(
+    "qtum_latest_block_size", "Size of latest block in bytes", labelnames=["node"]
+)
+QTUM_LATEST_BLOCK_TXS: SnapshotGauge = SnapshotGauge(
+    "qtum_latest_block_txs", "Number of transactions in latest block", labelnames=["node"]
+)
+QTUM_LATEST_BLOCK_HEIGHT: SnapshotGauge = SnapshotGauge(
+    "qtum_latest_block_height", "Height or index of latest block", labelnames=["node"]
+)
+QTUM_LATEST_BLOCK_WEIGHT: SnapshotGauge = SnapshotGauge(
+    "qtum_latest_block_weight", "Weight of latest block according to BIP 141", labelnames=["node"]
 )
-QTUM_LATEST_BLOCK_TXS: Gauge = Gauge(
-    "qtum_latest_block_txs", "Number of transactions in latest block"
+QTUM_LATEST_BLOCK_INPUTS: SnapshotGauge = SnapshotGauge(
+    "qtum_latest_block_inputs", "Number of inputs in transactions of latest block", labelnames=["node"]
 )
-QTUM_LATEST_BLOCK_HEIGHT: Gauge = Gauge(
-    "qtum_latest_block_height", "Height or index of latest block"
+QTUM_LATEST_BLOCK_OUTPUTS: SnapshotGauge = SnapshotGauge(
+    "qtum_latest_block_outputs", "Number of outputs in transactions of latest block", labelnames=["node"]
 )
-QTUM_LATEST_BLOCK_WEIGHT: Gauge = Gauge(
-    "qtum_latest_block_weight", "Weight of latest block according to BIP 141"
+QTUM_LATEST_BLOCK_VALUE: SnapshotGauge = SnapshotGauge(
+    "qtum_latest_block_value", "Qtum value of all transactions in the latest block", labelnames=["node"]
 )
-QTUM_LATEST_BLOCK_INPUTS: Gauge = Gauge(
-    "qtum_latest_block_inputs", "Number of inputs in transactions of latest block"
+QTUM_LATEST_BLOCK_FEE: SnapshotGauge = SnapshotGauge(
+    "qtum_latest_block_fee", "Total fee to process the latest block", labelnames=["node"]
 )
-QTUM_LATEST_BLOCK_OUTPUTS: Gauge = Gauge(
-    "qtum_latest_block_outputs", "Number of outputs in transactions of latest block"
+QTUM_LATEST_BLOCK_TYPE_TXS: SnapshotGauge = SnapshotGauge(
+    "qtum_latest_block_type_txs", "Number of transactions in the latest block by type", labelnames=["node", "type"]
 )
-QTUM_LATEST_BLOCK_VALUE: Gauge = Gauge(
-    "qtum_latest_block_value", "Qtum value of all transactions in the latest block"
+QTUM_LATEST_BLOCK_TYPE_VALUE: SnapshotGauge = SnapshotGauge(
+    "qtum_latest_block_type_value", "Total output value of the transactions in the latest block by type",
+    labelnames=["node", "type"]
 )
-QTUM_LATEST_BLOCK_FEE: Gauge = Gauge(
-    "qtum_latest_block_fee", "Total fee to process the latest block"
+QTUM_LATEST_BLOCK_TYPE_FEE: SnapshotGauge = SnapshotGauge(
+    "qtum_latest_block_type_fee", "Total fee of the transactions in the latest block by type", labelnames=["node", "type"]
+)
+
+# Block window metrics
+QTUM_BLOCK_WINDOW_BLOCKS: SnapshotGauge = SnapshotGauge(
+    "qtum_block_window_blocks", "Number of recent blocks the rolling block statistics are computed over",
+    labelnames=["node"]
+)
+QTUM_BLOCK_WINDOW_SIZE: SnapshotGauge = SnapshotGauge(
+    "qtum_block_window_size", "Size of recent blocks in bytes", labelnames=["node", "statistic"]
+)
+QTUM_BLOCK_WINDOW_TXS: SnapshotGauge = SnapshotGauge(
+    "qtum_block_window_txs", "Number of transactions in recent blocks", labelnames=["node", "statistic"]
+)
+QTUM_BLOCK_WINDOW_FEE: SnapshotGauge = SnapshotGauge(
+    "qtum_block_window_fee", "Total fee of recent blocks in QTUM", labelnames=["node", "statistic"]
+)
+QTUM_BLOCK_WINDOW_INTERVAL: SnapshotGauge = SnapshotGauge(
+    "qtum_block_window_interval", "Seconds between recent blocks", labelnames=["node", "statistic"]
 )
 
 # List banned metrics
-QTUM_BAN_CREATED: Gauge = Gauge(
-    "qtum_ban_created", "Time the ban was created", labelnames=["address", "reason"]
+QTUM_BAN_CREATED: SnapshotGauge = SnapshotGauge(
+    "qtum_ban_created", "Time the ban was created", labelnames=["node", "address", "reason"]
+)
+QTUM_BANNED_UNTIL: SnapshotGauge = SnapshotGauge(
+    "qtum_banned_until", "Time the ban expires", labelnames=["node", "address", "reason"]
 )
-QTUM_BANNED_UNTIL: Gauge = Gauge(
-    "qtum_banned_until", "Time the ban expires", labelnames=["address", "reason"]
+QTUM_BANNED: SnapshotGauge = SnapshotGauge(
+    "qtum_banned", "Number of banned addresses by reason", labelnames=["node", "reason"]
 )
 
 # Network info metrics
-QTUM_SERVER_VERSION: Gauge = Gauge(
-    "qtum_server_version", "The server version"
+QTUM_SERVER_VERSION: SnapshotGauge = SnapshotGauge(
+    "qtum_server_version", "The server version", labelnames=["node"]
 )
-QTUM_PROTOCOL_VERSION: Gauge = Gauge(
-    "qtum_protocol_version", "The protocol version of the server"
+QTUM_PROTOCOL_VERSION: SnapshotGauge = SnapshotGauge(
+    "qtum_protocol_version", "The protocol version of the server", labelnames=["node"]
 )
-QTUM_CONNECTIONS: Gauge = Gauge(
-    "qtum_connections", "The number of connections or peers"
+QTUM_CONNECTIONS: SnapshotGauge = SnapshotGauge(
+    "qtum_connections", "The number of connections or peers", labelnames=["node"]
 )
-QTUM_CONNECTIONS_IN: Gauge = Gauge(
-    "qtum_connections_in", "The number of connections in"
+QTUM_CONNECTIONS_IN: SnapshotGauge = SnapshotGauge(
+    "qtum_connections_in", "The number of connections in", labelnames=["node"]
 )
-QTUM_CONNECTIONS_OUT: Gauge = Gauge(
-    "qtum_connections_out", "The number of connections out"
+QTUM_CONNECTIONS_OUT: SnapshotGauge = SnapshotGauge(
+    "qtum_connections_out", "The number of connections out", labelnames=["node"]
 )
 QTUM_WARNINGS: Counter = Counter(
-    "qtum_warnings", "Number of network or blockchain warnings detected"
+    "qtum_warnings", "Number of network or blockchain warnings detected", labelnames=["node"]
 )
 
 # Chain tx stats metrics
-QTUM_TX_COUNT: Gauge = Gauge(
-    "qtum_tx_count", "Number of TX since the genesis block"
+QTUM_TX_COUNT: SnapshotGauge = SnapshotGauge(
+    "qtum_tx_count", "Number of TX since the genesis block", labelnames=["node"]
 )
 
 # Mempool info metrics
-QTUM_MEMPOOL_BYTES: Gauge = Gauge(
-    "qtum_mempool_bytes", "Size of mempool in bytes"
+QTUM_MEMPOOL_BYTES: SnapshotGauge = SnapshotGauge(
+    "qtum_mempool_bytes", "Size of mempool in bytes", labelnames=["node"]
+)
+QTUM_MEMPOOL_SIZE: SnapshotGauge = SnapshotGauge(
+    "qtum_mempool_size", "Number of unconfirmed transactions in mempool", labelnames=["node"]
+)
+QTUM_MEMPOOL_USAGE: SnapshotGauge = SnapshotGauge(
+    "qtum_mempool_usage", "Total memory usage for the mempool", labelnames=["node"]
+)
+QTUM_MEMPOOL_UNBROADCAST: SnapshotGauge = SnapshotGauge(
+    "qtum_mempool_unbroadcast", "Number of transactions waiting for acknowledgment", labelnames=["node"]
+)
+
+# Mempool analytics metrics
+QTUM_MEMPOOL_FEE_RATE: SnapshotHistogram = SnapshotHistogram(
+    "qtum_mempool_fee_rate", "Fee rate of transactions in mempool in satoshis per vbyte",
+    buckets=Config.MEMPOOL_FEE_RATE_BUCKETS, labelnames=["node"]
+)
+QTUM_MEMPOOL_TX_VSIZE: SnapshotHistogram = SnapshotHistogram(
+    "qtum_mempool_tx_vsize", "Virtual size of transactions in mempool in vbytes",
+    buckets=Config.MEMPOOL_VSIZE_BUCKETS, labelnames=["node"]
+)
+QTUM_MEMPOOL_OLDEST_TX_AGE: SnapshotGauge = SnapshotGauge(
+    "qtum_mempool_oldest_tx_age", "Seconds since the oldest transaction in mempool entered it", labelnames=["node"]
+)
+QTUM_MEMPOOL_TRACKED_TXS: SnapshotGauge = SnapshotGauge(
+    "qtum_mempool_tracked_txs", "Number of mempool transactions indexed for fee rate and size analytics", labelnames=["node"]
 )
-QTUM_MEMPOOL_SIZE: Gauge = Gauge(
-    "qtum_mempool_size", "Number of unconfirmed transactions in mempool"
+
+# Peer metrics
+QTUM_PEER_PING: SnapshotHistogram = SnapshotHistogram(
+    "qtum_peer_ping", "Ping time of connected peers in seconds",
+    buckets=Config.PEER_PING_BUCKETS, labelnames=["node"]
+)
+QTUM_PEER_HEIGHT_LAG: SnapshotHistogram = SnapshotHistogram(
+    "qtum_peer_height_lag", "Number of blocks connected peers are behind the node",
+    buckets=Config.PEER_LAG_BUCKETS, labelnames=["node"]
+)
+QTUM_PEER_SEND_RATE: SnapshotGauge = SnapshotGauge(
+    "qtum_peer_send_rate", "Bytes per second sent to the busiest peers", labelnames=["node", "peer"]
 )
-QTUM_MEMPOOL_USAGE: Gauge = Gauge(
-    "qtum_mempool_usage", "Total memory usage for the mempool"
+QTUM_PEER_RECV_RATE: SnapshotGauge = SnapshotGauge(
+    "qtum_peer_recv_rate", "Bytes per second received from the busiest peers", labelnames=["node", "peer"]
 )
-QTUM_MEMPOOL_UNBROADCAST: Gauge = Gauge(
-    "qtum_mempool_unbroadcast", "Number of transactions waiting for acknowledgment"
+QTUM_PEER_PING_TIME: SnapshotGauge = SnapshotGauge(
+    "qtum_peer_ping_time", "Ping time of the busiest peers in seconds", labelnames=["node", "peer"]
+)
+QTUM_PEER_MESSAGE_RATE: SnapshotGauge = SnapshotGauge(
+    "qtum_peer_message_rate", "Bytes per second exchanged with all peers by message type",
+    labelnames=["node", "direction", "message"]
+)
+
+# Contract activity metrics, running totals since the exporter started indexing
+QTUM_CONTRACT_GAS_USED: SnapshotCounter = SnapshotCounter(
+    "qtum_contract_gas_used", "Gas used by transactions that emitted events calling the busiest and watched contracts",
+    labelnames=["node", "contract"]
+)
+QTUM_CONTRACT_TXS: SnapshotCounter = SnapshotCounter(
+    "qtum_contract_txs", "Number of transactions that emitted events calling the busiest and watched contracts",
+    labelnames=["node", "contract"]
+)
+QTUM_CONTRACT_EVENTS: SnapshotCounter = SnapshotCounter(
+    "qtum_contract_events", "Number of events emitted by the busiest and watched contracts",
+    labelnames=["node", "contract"]
+)
+QTUM_CONTRACT_TRANSFERS: SnapshotCounter = SnapshotCounter(
+    "qtum_contract_transfers", "Number of QRC20 Transfer events emitted by the busiest and watched contracts",
+    labelnames=["node", "contract"]
+)
+QTUM_CONTRACTS_GAS_USED: SnapshotCounter = SnapshotCounter(
+    "qtum_contracts_gas_used", "Gas used by contract transactions that emitted events", labelnames=["node"]
+)
+QTUM_CONTRACTS_TXS: SnapshotCounter = SnapshotCounter(
+    "qtum_contracts_txs", "Number of contract transactions that emitted events", labelnames=["node"]
+)
+QTUM_CONTRACTS_EVENTS: SnapshotCounter = SnapshotCounter(
+    "qtum_contracts_events", "Number of events emitted by all contracts", labelnames=["node"]
+)
+QTUM_CONTRACTS_TRANSFERS: SnapshotCounter = SnapshotCounter(
+    "qtum_contracts_transfers", "Number of QRC20 Transfer events emitted by all contracts", labelnames=["node"]
+)
+QTUM_CONTRACTS_TRACKED: SnapshotGauge = SnapshotGauge(
+    "qtum_contracts_tracked", "Number of contracts with their own running totals", labelnames=["node"]
+)
+QTUM_CONTRACTS_INDEXED_HEIGHT: SnapshotGauge = SnapshotGauge(
+    "qtum_contracts_indexed_height", "Height of the last block whose contract activity was indexed", labelnames=["node"]
 )
 
 # Chain tips metrics
-QTUM_NUM_CHAIN_TIPS: Gauge = Gauge(
-    "qtum_num_chain_tips", "Number of known blockchain branches"
+QTUM_NUM_CHAIN_TIPS: SnapshotGauge = SnapshotGauge(
+    "qtum_num_chain_tips", "Number of known blockchain branches", labelnames=["node"]
 )
 
 # Estimate smart fee metrics
-QTUM_ESTIMATED_SMART_FEE_GAUGES: Dict[int, Gauge] = { }
+QTUM_ESTIMATED_SMART_FEE_GAUGES: Dict[int, SnapshotGauge] = { }
 
 
-def estimate_smart_fee_gauge(num_blocks: int) -> Gauge:
-    gauge: Optional[Gauge] = QTUM_ESTIMATED_SMART_FEE_GAUGES.get(num_blocks)
+def estimate_smart_fee_gauge(num_blocks: int) -> SnapshotGauge:
+    gauge: Optional[SnapshotGauge] = QTUM_ESTIMATED_SMART_FEE_GAUGES.get(num_blocks)
     if gauge is None:
-        gauge: Gauge = Gauge(
+        gauge: SnapshotGauge = SnapshotGauge(
             f"qtum_estimate_smart_fee_{num_blocks}",
-            f"Estimated smart fee per kilobyte for confirmation in {num_blocks} blocks"
+            f"Estimated smart fee per kilobyte for confirmation in {num_blocks} blocks", labelnames=["node"]
         )
         QTUM_ESTIMATED_SMART_FEE_GAUGES[num_blocks] = gauge
     return gauge
 
 
 # Network totals metrics
-QTUM_TOTAL_BYTES_RECV: Gauge = Gauge(
-    "qtum_total_bytes_recv", "Total bytes received"
+QTUM_TOTAL_BYTES_RECV: SnapshotGauge = SnapshotGauge(
+    "qtum_total_bytes_recv", "Total bytes received", labelnames=["node"]
 )
-QTUM_TOTAL_BYTES_SENT: Gauge = Gauge(
-    "qtum_total_bytes_sent", "Total bytes sent"
+QTUM_TOTAL_BYTES_SENT: SnapshotGauge = SnapshotGauge(
+    "qtum_total_bytes_sent", "Total bytes sent", labelnames=["node"]
 )
 
 # Uptime metrics
-QTUM_UPTIME: Gauge = Gauge(
-    "qtum_uptime", "The number of seconds that the server has been running"
+QTUM_UPTIME: SnapshotGauge = SnapshotGauge(
+    "qtum_uptime", "The number of seconds that the server has been running", labelnames=["node"]
+)
+
+# Staking and wallet metrics, weights and balances in QTUM
+QTUM_NETWORK_STAKE_WEIGHT: SnapshotGauge = SnapshotGauge(
+    "qtum_network_stake_weight", "Estimated weight of all coins staking on the network", labelnames=["node"]
+)
+QTUM_WALLET_AVAILABLE: SnapshotGauge = SnapshotGauge(
+    "qtum_wallet_available", "Whether the node has a wallet loaded that answers wallet calls", labelnames=["node"]
+)
+QTUM_STAKING_ENABLED: SnapshotGauge = SnapshotGauge(
+    "qtum_staking_enabled", "Whether staking is enabled in the wallet", labelnames=["node"]
+)
+QTUM_STAKING: SnapshotGauge = SnapshotGauge(
+    "qtum_staking", "Whether the wallet is currently staking", labelnames=["node"]
+)
+QTUM_STAKING_WEIGHT: SnapshotGauge = SnapshotGauge(
+    "qtum_staking_weight", "Weight of the wallet coins that are staking", labelnames=["node"]
+)
+QTUM_STAKING_EXPECTED_TIME: SnapshotGauge = SnapshotGauge(
+    "qtum_staking_expected_time", "Expected number of seconds until the wallet earns a staking reward",
+    labelnames=["node"]
+)
+QTUM_WALLET_BALANCE: SnapshotGauge = SnapshotGauge(
+    "qtum_wallet_balance", "Confirmed wallet balance that can be spent", labelnames=["node"]
+)
+QTUM_WALLET_STAKE: SnapshotGauge = SnapshotGauge(
+    "qtum_wallet_stake", "Wallet balance locked in not yet mature stakes", labelnames=["node"]
+)
+QTUM_WALLET_UNCONFIRMED_BALANCE: SnapshotGauge = SnapshotGauge(
+    "qtum_wallet_unconfirmed_balance", "Wallet balance of unconfirmed transactions", labelnames=["node"]
+)
+QTUM_WALLET_IMMATURE_BALANCE: SnapshotGauge = SnapshotGauge(
+    "qtum_wallet_immature_balance", "Wallet balance of not yet mature coinbase outputs", labelnames=["node"]
+)
+QTUM_WALLET_TXS: SnapshotGauge = SnapshotGauge(
+    "qtum_wallet_txs", "Number of transactions in the wallet", labelnames=["node"]
+)
+QTUM_WALLET_KEYPOOL_SIZE: SnapshotGauge = SnapshotGauge(
+    "qtum_wallet_keypool_size", "Number of pre-generated keys in the wallet keypool", labelnames=["node"]
+)
+QTUM_WALLET_UNLOCKED_UNTIL: SnapshotGauge = SnapshotGauge(
+    "qtum_wallet_unlocked_until", "Unix time the encrypted wallet locks again, 0 while locked", labelnames=["node"]
+)
+
+# ZMQ notification metrics
+QTUM_BLOCKS_NOTIFIED: Counter = Counter(
+    "qtum_blocks_notified", "Number of new block notifications received over ZMQ", labelnames=["node"]
+)
+QTUM_MEMPOOL_TXS_RECEIVED: Counter = Counter(
+    "qtum_mempool_txs_received", "Number of transactions received over ZMQ as they entered the mempool or a block",
+    labelnames=["node"]
+)
+QTUM_MEMPOOL_TX_BYTES_RECEIVED: Counter = Counter(
+    "qtum_mempool_tx_bytes_received", "Size in bytes of the transactions received over ZMQ", labelnames=["node"]
 )
 
 # Qtum exporters metrics
+QTUM_UP: SnapshotGauge = SnapshotGauge(
+    "qtum_up", "Whether the last collection from the node succeeded (1) or failed (0)", labelnames=["node"]
+)
 EXPORTER_ERRORS: Counter = Counter(
-    "qtum_exporter_errors", "Number of errors encountered by the exporter", labelnames=["type"]
+    "qtum_exporter_errors", "Number of errors encountered by the exporter", labelnames=["node", "type"]
 )
 PROCESS_TIME: Counter = Counter(
     "qtum_exporter_process_time", "Time spent processing metrics from qtum node"
 )
+EXPORTER_SCHEDULING_LAG: Gauge = Gauge(
+    "qtum_exporter_scheduling_lag", "Seconds between a job's scheduled deadline and when it actually ran",
+    labelnames=["job"]
+)
+EXPORTER_OVERRUNS: Counter = Counter(
+    "qtum_exporter_overruns", "Number of scheduled ticks skipped because a job overran its interval",
+    labelnames=["job"]
+)
+EXPORTER_RPC_CONNECTIONS: Counter = Counter(
+    "qtum_exporter_rpc_connections", "Number of RPC requests by whether they opened a new or reused a pooled connection",
+    labelnames=["node", "state"]
+)
+EXPORTER_RPC_RECONNECTS: Counter = Counter(
+    "qtum_exporter_rpc_reconnects", "Number of times the RPC client was rebuilt after a transport error",
+    labelnames=["node"]
+)
+EXPORTER_BLOCK_CACHE_HITS: Counter = Counter(
+    "qtum_exporter_block_cache_hits", "Number of block-derived RPC results served from the best block hash cache",
+    labelnames=["node", "method"]
+)
+EXPORTER_BLOCK_CACHE_MISSES: Counter = Counter(
+    "qtum_exporter_block_cache_misses", "Number of block-derived RPC results fetched because the best block hash changed",
+    labelnames=["node", "method"]
+)
+EXPORTER_MEMPOOL_ENTRIES_FETCHED: Counter = Counter(
+    "qtum_exporter_mempool_entries_fetched", "Number of getmempoolentry calls made for newly seen transactions",
+    labelnames=["node"]
+)
+EXPORTER_BLOCK_STATS_FETCHED: Counter = Counter(
+    "qtum_exporter_block_stats_fetched", "Number of getblockstats calls made to fill the rolling block window",
+    labelnames=["node"]
+)
+EXPORTER_CHECKPOINT_LOADS: Counter = Counter(
+    "qtum_exporter_checkpoint_loads", "Number of checkpoint loads at startup by result (loaded, missing or corrupt)",
+    labelnames=["node", "result"]
+)
+EXPORTER_RPC_DURATION: Histogram = Histogram(
+    "qtum_exporter_rpc_duration_seconds",
+    "Seconds until an RPC call was answered, every call of a batch records the whole batch round trip",
+    # Few buckets from cached lookups to WALLET_TIMEOUT, every node and method multiplies them
+    labelnames=["node", "method"], buckets=(0.005, 0.025, 0.1, 0.5, 2.5, 10, 30)
+)
+EXPORTER_RPC_REQUEST_BYTES: Histogram = Histogram(
+    "qtum_exporter_rpc_request_bytes", "Size of RPC call requests in bytes",
+    labelnames=["node", "method"], buckets=(64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+)
+EXPORTER_RPC_RESPONSE_BYTES: Histogram = Histogram(
+    "qtum_exporter_rpc_response_bytes", "Size of RPC call responses in bytes",
+    labelnames=["node", "method"], buckets=(64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+)
+EXPORTER_RPC_ERRORS: Counter = Counter(
+    "qtum_exporter_rpc_errors", "Number of failed RPC calls by method and error code, transport for connection errors",
+    labelnames=["node", "method", "code"]
+)
+EXPORTER_COLLECT_PHASE_DURATION: Histogram = Histogram(
+    "qtum_exporter_collect_phase_duration_seconds", "Seconds spent per collect phase (groups, rpc or publish)",
+    labelnames=["node", "phase"]
+)
+EXPORTER_SERIES: Gauge = Gauge(
+    "qtum_exporter_series", "Number of series published by the last successful collection of a group",
+    labelnames=["node", "group"]
+)
+EXPORTER_SERIES_CAPPED: Gauge = Gauge(
+    "qtum_exporter_series_capped", "Whether a per-item metric exceeded SERIES_LIMIT and is only exported in aggregate",
+    labelnames=["node", "metric"]
+)
+EXPORTER_GROUP_LAST_SUCCESS: Gauge = Gauge(
+    "qtum_exporter_group_last_success_timestamp_seconds", "Unix time of the last successful collection of a group",
+    labelnames=["node", "group"]
+)
+EXPORTER_BREAKER_STATE: Gauge = Gauge(
+    "qtum_exporter_rpc_breaker_state", "State of the RPC circuit breaker (0 closed, 1 open, 2 half-open)",
+    labelnames=["node"]
+)
+EXPORTER_BREAKER_OPENS: Counter = Counter(
+    "qtum_exporter_rpc_breaker_opens", "Number of times the RPC circuit breaker opened",
+    labelnames=["node"]
+)
+EXPORTER_COLLECTIONS_SKIPPED: Counter = Counter(
+    "qtum_exporter_collections_skipped", "Number of collections not started because the node was still busy with the previous one",
+    labelnames=["node", "job"]
+)
+EXPORTER_HTTP_CONNECTIONS: Gauge = Gauge(
+    "qtum_exporter_http_connections", "Number of open connections to the metrics server"
+)
+EXPORTER_HTTP_CONNECTIONS_REJECTED: Counter = Counter(
+    "qtum_exporter_http_connections_rejected", "Number of connections closed because EXPOSITION_MAX_CONNECTIONS were open"
+)
+EXPORTER_HTTP_REQUESTS: Counter = Counter(
+    "qtum_exporter_http_requests", "Number of requests served by the metrics server by handler and status code",
+    labelnames=["handler", "code"]
+)
+EXPORTER_ZMQ_LAST_MESSAGE: Gauge = Gauge(
+    "qtum_exporter_zmq_last_message_timestamp_seconds", "Unix time of the last ZMQ notification received per topic",
+    labelnames=["node", "topic"]
+)
+EXPORTER_ZMQ_MISSED: Counter = Counter(
+    "qtum_exporter_zmq_missed", "Number of ZMQ notifications lost, from gaps in the publisher's sequence numbers",
+    labelnames=["node", "topic"]
+)
+EXPORTER_CONTRACT_BLOCKS_INDEXED: Counter = Counter(
+    "qtum_exporter_contract_blocks_indexed", "Number of blocks whose contract activity was read with searchlogs",
+    labelnames=["node"]
+)
+
+# Process metrics, only registered with PROCESS_METRICS so they cost nothing otherwise
+EXPORTER_GC_PAUSE: Histogram = Histogram(
+    "qtum_exporter_gc_pause_seconds", "Seconds the exporter process was paused by a garbage collection per generation",
+    labelnames=["generation"], buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1), registry=None
+)
+EXPORTER_MAX_RSS: Gauge = Gauge(
+    "qtum_exporter_max_rss_bytes", "Peak resident set size of the exporter process in bytes", registry=None
+)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+from typing import (
+    Dict, List, Optional
+)
+
+import json
+
+from .blocks import BlockTracker
+from .cache import BlockCache
+from .config import Config
+from .contracts import ContractTracker
+from .mempool import MempoolTracker
+from .notifications import Notifications
+from .peers import PeerTracker
+from .wallet import WalletStatus
+
+
+class Node:
+    __slots__ = (
+        "_name", "_host", "_port", "_rpc_user", "_rpc_password", "_block_cache", "_blocks", "_mempool", "_peers",
+        "_contracts", "_last_success", "_notifications", "_wallet"
+    )
+
+    def __init__(
+        self, name: str, host: str, port: int, rpc_user: str, rpc_password: str, zmq_hashblock: str = "",
+        zmq_rawtx: str = ""
+    ) -> None:
+        self._name: str = name
+        self._host: str = host
+        self._port: int = port
+        self._rpc_user: str = rpc_user
+        self._rpc_password: str = rpc_password
+        # Per-node state, so one node's tip never invalidates another's results
+        self._block_cache: BlockCache = BlockCache(node=name)
+        self._blocks: BlockTracker = BlockTracker()
+        self._mempool: MempoolTracker = MempoolTracker()
+        self._peers: PeerTracker = PeerTracker()
+        self._contracts: ContractTracker = ContractTracker()
+        # Unix time each group was last collected, to tell stale samples apart
+        self._last_success: Dict[str, float] = { }
+        self._notifications: Notifications = Notifications(node=name, hashblock=zmq_hashblock, rawtx=zmq_rawtx)
+        self._wallet: WalletStatus = WalletStatus(node=name)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def url(self) -> str:
+        return f"http://{self._host}:{self._port}"
+
+    @property
+    def rpc_user(self) -> str:
+        return self._rpc_user
+
+    @property
+    def rpc_password(self) -> str:
+        return self._rpc_password
+
+    @property
+    def block_cache(self) -> BlockCache:
+        return self._block_cache
+
+    @property
+    def blocks(self) -> BlockTracker:
+        return self._blocks
+
+    @property
+    def mempool(self) -> MempoolTracker:
+        return self._mempool
+
+    @property
+    def peers(self) -> PeerTracker:
+        return self._peers
+
+    @property
+    def contracts(self) -> ContractTracker:
+        return self._contracts
+
+    @property
+    def last_success(self) -> Dict[str, float]:
+        return self._last_success
+
+    @property
+    def notifications(self) -> Notifications:
+        return self._notifications
+
+    @property
+    def wallet(self) -> WalletStatus:
+        return self._wallet
+
+
+def load_nodes(nodes_file: Optional[str] = Config.NODES_FILE) -> List[Node]:
+    # Without a nodes file, scrape the single node from the QTUM_RPC_* variables
+    if not nodes_file:
+        return [
+            Node(
+                name=Config.NODE_NAME or f"{Config.QTUM_RPC_HOST}:{Config.QTUM_RPC_PORT}",
+                host=Config.QTUM_RPC_HOST,
+                port=Config.QTUM_RPC_PORT,
+                rpc_user=Config.QTUM_RPC_USER,
+                rpc_password=Config.QTUM_RPC_PASSWORD,
+                zmq_hashblock=Config.ZMQ_PUB_HASHBLOCK,
+                zmq_rawtx=Config.ZMQ_PUB_RAWTX
+            )
+        ]
+
+    with open(nodes_file, "r", encoding="utf-8") as file:
+        targets: list = json.load(file)
+
+    nodes: List[Node] = [ ]
+    for target in targets:
+        host: str = target.get("host", Config.QTUM_RPC_HOST)
+        port: int = int(target.get("port", Config.QTUM_RPC_PORT))
+        nodes.append(Node(
+            name=target.get("name", f"{host}:{port}"),
+            host=host,
+            port=port,
+            rpc_user=target.get("user", Config.QTUM_RPC_USER),
+            rpc_password=target.get("password", Config.QTUM_RPC_PASSWORD),
+            zmq_hashblock=target.get("zmq_hashblock", ""),
+            zmq_rawtx=target.get("zmq_rawtx", "")
+        ))
+
+    names: List[str] = [node.name for node in nodes]
+    if not nodes or len(set(names)) != len(names):
+        raise ValueError(f"Nodes file '{nodes_file}' must list at least one node with unique names, not {names}")
+    return nodes
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+
+from logging import (
+    Logger, Formatter, StreamHandler
+)
+from threading import (
+    Event, Lock, Thread
+)
+from typing import (
+    Callable, Dict, List, Optional
+)
+
+import logging
+import struct
+import time
+
+try:
+    import zmq
+except ImportError:
+    zmq = None
+
+from .config import Config
+from .metrics import (
+    QTUM_BLOCKS_NOTIFIED, QTUM_MEMPOOL_TXS_RECEIVED, QTUM_MEMPOOL_TX_BYTES_RECEIVED,
+    EXPORTER_ZMQ_LAST_MESSAGE, EXPORTER_ZMQ_MISSED
+)
+
+logger: Logger = logging.getLogger("qtum-exporter-notifications")
+logger.setLevel(level=Config.LOGGING_LEVEL)
+formatter: Formatter = logging.Formatter(
+    fmt="%(asctime)s %(name)s %(levelname)s %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+)
+stream_handler: StreamHandler = logging.StreamHandler()
+stream_handler.setFormatter(fmt=formatter)
+logger.addHandler(stream_handler)
+
+HASHBLOCK: str = "hashblock"
+RAWTX: str = "rawtx"
+
+
+class Notifications:
+    __slots__ = (
+        "_node", "_endpoints", "_last_message", "_sequences", "_block_hash", "_lock"
+    )
+
+    def __init__(self, node: str, hashblock: str = "", rawtx: str = "") -> None:
+        self._node: str = node
+        # Endpoint per topic, qtumd may publish both on the same one
+        self._endpoints: Dict[str, str] = {
+            topic: endpoint for topic, endpoint in ((HASHBLOCK, hashblock), (RAWTX, rawtx)) if endpoint
+        }
+        # Monotonic time of the last message per endpoint
+        self._last_message: Dict[str, float] = { }
+        self._sequences: Dict[str, int] = { }
+        # Tip pushed by the last block notification and not yet handed to a collection
+        self._block_hash: Optional[str] = None
+        self._lock: Lock = Lock()
+
+    @property
+    def node(self) -> str:
+        return self._node
+
+    @property
+    def endpoints(self) -> Dict[str, str]:
+        return self._endpoints
+
+    @property
+    def live(self) -> bool:
+        # Any message on the block socket proves it is up, one quiet for ZMQ_QUIET_SECONDS falls back to polling
+        endpoint: Optional[str] = self._endpoints.get(HASHBLOCK)
+        if endpoint is None or endpoint not in self._last_message:
+            return False
+        return time.monotonic() - self._last_message[endpoint] <= Config.ZMQ_QUIET_SECONDS
+
+    @property
+    def pending(self) -> bool:
+        return self._block_hash is not None
+
+    def take_block_hash(self) -> Optional[str]:
+        with self._lock:
+            block_hash, self._block_hash = self._block_hash, None
+        return block_hash
+
+    def received(self, topic: str, body: bytes, sequence: Optional[int]) -> bool:
+        # Returns whether the message announced a new block
+        self._last_message[self._endpoints[topic]] = time.monotonic()
+        EXPORTER_ZMQ_LAST_MESSAGE.labels(node=self._node, topic=topic).set(time.time())
+        last: Optional[int] = self._sequences.get(topic)
+        if sequence is not None:
+            # A lower sequence number means qtumd restarted, not that messages were lost
+            if last is not None and sequence > last + 1:
+                EXPORTER_ZMQ_MISSED.labels(node=self._node, topic=topic).inc(sequence - last - 1)
+            self._sequences[topic] = sequence
+
+        if topic == HASHBLOCK:
+            QTUM_BLOCKS_NOTIFIED.labels(node=self._node).inc()
+            with self._lock:
+                self._block_hash = body.hex()
+            return True
+        QTUM_MEMPOOL_TXS_RECEIVED.labels(node=self._node).inc()
+        QTUM_MEMPOOL_TX_BYTES_RECEIVED.labels(node=self._node).inc(len(body))
+        return False
+
+
+class ZmqSubscriber:
+    __slots__ = (
+        "_notifications", "_on_block", "_stop", "_thread"
+    )
+
+    def __init__(
+        self, notifications: List[Notifications], on_block: Optional[Callable[[str], None]] = None
+    ) -> None:
+        self._notifications: List[Notifications] = notifications
+        # Called with the node name on every block notification
+        self._on_block: Optional[Callable[[str], None]] = on_block
+        self._stop: Event = Event()
+        self._thread: Thread = Thread(target=self._run, name="qtum-exporter-zmq", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _subscribe(self, context: "zmq.Context", poller: "zmq.Poller") -> Dict["zmq.Socket", Notifications]:
+        sockets: Dict[zmq.Socket, Notifications] = { }
+        for notifications in self._notifications:
+            topics: Dict[str, List[str]] = { }
+            for topic, endpoint in notifications.endpoints.items():
+                topics.setdefault(endpoint, [ ]).append(topic)
+            for endpoint, endpoint_topics in topics.items():
+                socket: zmq.Socket = context.socket(zmq.SUB)
+                # A dead publisher is noticed by the kernel instead of leaving the socket quiet forever
+                socket.setsockopt(zmq.TCP_KEEPALIVE, 1)
+                for topic in endpoint_topics:
+                    socket.setsockopt(zmq.SUBSCRIBE, topic.encode())
+                socket.connect(endpoint)
+                poller.register(socket, zmq.POLLIN)
+                sockets[socket] = notifications
+                logger.info(f"Node '{notifications.node}' subscribed to {', '.join(endpoint_topics)} on {endpoint}")
+        return sockets
+
+    def _receive(self, socket: "zmq.Socket", notifications: Notifications) -> None:
+        # Drains everything queued, a burst of transactions is handled in one wake-up
+        while True:
+            try:
+                frames: List[bytes] = socket.recv_multipart(flags=zmq.NOBLOCK)
+            except zmq.Again:
+                return
+            topic: str = frames[0].decode("ascii", errors="replace")
+            if topic not in notifications.endpoints or len(frames) < 2:
+                continue
+            sequence: Optional[int] = struct.unpack("<I", frames[2])[0] if len(frames) > 2 and len(frames[2]) == 4 else None
+            if notifications.received(topic=topic, body=frames[1], sequence=sequence) and self._on_block is not None:
+                try:
+                    self._on_block(notifications.node)
+                except Exception as exception:
+                    logger.error(f"Node '{notifications.node}' block notification failed: {str(exception)}", exc_info=True)
+
+    def _run(self) -> None:
+        context: zmq.Context = zmq.Context()
+        poller: zmq.Poller = zmq.Poller()
+        sockets: Dict[zmq.Socket, Notifications] = self._subscribe(context=context, poller=poller)
+        try:
+            while not self._stop.is_set():
+                # Wakes up once a second to notice stop()
+                for socket, _ in poller.poll(timeout=1000):
+                    self._receive(socket=socket, notifications=sockets[socket])
+        finally:
+            for socket in sockets:
+                socket.close(linger=0)
+            context.term()
+
+
+def start_subscriber(
+    notifications: List[Notifications], on_block: Optional[Callable[[str], None]] = None
+) -> Optional[ZmqSubscriber]:
+    # pyzmq is optional, without it or any endpoint the exporter only polls
+    notifications = [node_notifications for node_notifications in notifications if node_notifications.endpoints]
+    if not notifications:
+        return None
+    if zmq is None:
+        logger.warning("ZMQ endpoints are set but pyzmq is not installed, falling back to polling")
+        return None
+    subscriber: ZmqSubscriber = ZmqSubscriber(notifications=notifications, on_block=on_block)
+    subscriber.start()
+    return subscriber
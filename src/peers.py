@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+from typing import (
+    Dict, List, Optional, Tuple
+)
+
+import bisect
+import heapq
+import time
+
+from .config import Config
+from .metrics import (
+    QTUM_PEER_PING, QTUM_PEER_HEIGHT_LAG, QTUM_PEER_SEND_RATE, QTUM_PEER_RECV_RATE, QTUM_PEER_PING_TIME,
+    QTUM_PEER_MESSAGE_RATE
+)
+from .snapshot import Samples
+
+
+class PeerCounters:
+    __slots__ = (
+        "_time", "_bytes_sent", "_bytes_recv", "_sent_per_message", "_recv_per_message"
+    )
+
+    def __init__(self, peer: dict, now: float) -> None:
+        self._time: float = now
+        self._bytes_sent: int = peer.get("bytessent", 0)
+        self._bytes_recv: int = peer.get("bytesrecv", 0)
+        self._sent_per_message: Dict[str, int] = peer.get("bytessent_per_msg", { })
+        self._recv_per_message: Dict[str, int] = peer.get("bytesrecv_per_msg", { })
+
+    @property
+    def time(self) -> float:
+        return self._time
+
+    @property
+    def bytes_sent(self) -> int:
+        return self._bytes_sent
+
+    @property
+    def bytes_recv(self) -> int:
+        return self._bytes_recv
+
+    @property
+    def sent_per_message(self) -> Dict[str, int]:
+        return self._sent_per_message
+
+    @property
+    def recv_per_message(self) -> Dict[str, int]:
+        return self._recv_per_message
+
+
+class PeerTracker:
+    __slots__ = (
+        "_previous",
+    )
+
+    def __init__(self) -> None:
+        # Counters of every connected peer at the last cycle, keyed by connection id
+        self._previous: Dict[int, PeerCounters] = { }
+
+    def __len__(self) -> int:
+        return len(self._previous)
+
+    def update(self, peers: List[dict], block_height: int, samples: Samples) -> None:
+        now: float = time.monotonic()
+        current: Dict[int, PeerCounters] = { }
+        # (bytes per second, address, sent rate, received rate, ping) of peers seen last cycle too
+        rates: List[Tuple[float, str, float, float, Optional[float]]] = [ ]
+        message_rates: Dict[Tuple[str, str], float] = { }
+        ping_counts: List[int] = [0] * len(QTUM_PEER_PING.buckets)
+        ping_sum: float = 0.0
+        lag_counts: List[int] = [0] * len(QTUM_PEER_HEIGHT_LAG.buckets)
+        lag_sum: int = 0
+
+        for peer in peers:
+            counters: PeerCounters = PeerCounters(peer, now=now)
+            current[peer["id"]] = counters
+
+            ping: Optional[float] = peer.get("pingtime")
+            if ping is not None:
+                ping_counts[bisect.bisect_left(QTUM_PEER_PING.buckets, ping)] += 1
+                ping_sum += ping
+            if peer.get("synced_blocks", -1) >= 0:
+                lag: int = max(block_height - peer["synced_blocks"], 0)
+                lag_counts[bisect.bisect_left(QTUM_PEER_HEIGHT_LAG.buckets, lag)] += 1
+                lag_sum += lag
+
+            # Rates need two observations of the same connection
+            previous: Optional[PeerCounters] = self._previous.get(peer["id"])
+            if previous is None or now <= previous.time:
+                continue
+            elapsed: float = now - previous.time
+            sent_rate: float = max(counters.bytes_sent - previous.bytes_sent, 0) / elapsed
+            recv_rate: float = max(counters.bytes_recv - previous.bytes_recv, 0) / elapsed
+            rates.append((sent_rate + recv_rate, peer.get("addr", str(peer["id"])), sent_rate, recv_rate, ping))
+            for direction, now_per_message, previous_per_message in (
+                ("sent", counters.sent_per_message, previous.sent_per_message),
+                ("recv", counters.recv_per_message, previous.recv_per_message)
+            ):
+                for message, total in now_per_message.items():
+                    delta: int = max(total - previous_per_message.get(message, 0), 0)
+                    key: Tuple[str, str] = (direction, message)
+                    message_rates[key] = message_rates.get(key, 0.0) + delta / elapsed
+        # Disconnected peers are forgotten
+        self._previous = current
+
+        samples.histogram(QTUM_PEER_PING, ping_counts, ping_sum)
+        samples.histogram(QTUM_PEER_HEIGHT_LAG, lag_counts, lag_sum)
+        for (direction, message), rate in message_rates.items():
+            samples.set(QTUM_PEER_MESSAGE_RATE, rate, direction=direction, message=message)
+        # Only the busiest peers get their own series, so the count stays bounded with many peers
+        busiest: List[Tuple[float, str, float, float, Optional[float]]] = heapq.nlargest(
+            Config.PEER_TOP_K, rates, key=lambda rate: rate[0]
+        )
+        for _, address, sent_rate, recv_rate, ping in busiest:
+            samples.set(QTUM_PEER_SEND_RATE, sent_rate, peer=address)
+            samples.set(QTUM_PEER_RECV_RATE, recv_rate, peer=address)
+            if ping is not None:
+                samples.set(QTUM_PEER_PING_TIME, ping, peer=address)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+from concurrent.futures import Future
+from logging import (
+    Logger, Formatter, StreamHandler
+)
+from threading import Lock
+from typing import (
+    Callable, Dict, List, Optional, Set, Tuple
+)
+
+import concurrent.futures
+import logging
+import time
+
+from .collector import CollectorGroup
+from .config import Config
+from .node import Node
+from .metrics import (
+    PROCESS_TIME, EXPORTER_COLLECTIONS_SKIPPED
+)
+
+logger: Logger = logging.getLogger("qtum-exporter-pipeline")
+logger.setLevel(level=Config.LOGGING_LEVEL)
+formatter: Formatter = logging.Formatter(
+    fmt="%(asctime)s %(name)s %(levelname)s %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+)
+stream_handler: StreamHandler = logging.StreamHandler()
+stream_handler.setFormatter(fmt=formatter)
+logger.addHandler(stream_handler)
+
+# Starts collecting groups from a node on a worker and returns at once
+Submit = Callable[[Node, List[CollectorGroup]], Future]
+# Narrows the groups of a job down to those a node still needs polled
+Select = Callable[[Node, List[CollectorGroup]], List[CollectorGroup]]
+
+
+class CollectionPipeline:
+    __slots__ = (
+        "_nodes", "_submit", "_running", "_running_groups", "_finished_nodes", "_lock"
+    )
+
+    def __init__(self, nodes: List[Node], submit: Submit) -> None:
+        self._nodes: List[Node] = nodes
+        self._submit: Submit = submit
+        # Last collection started per (node, job), a job never runs twice at once on a node
+        self._running: Dict[Tuple[str, str], Future] = { }
+        # Collection each (node, group) was last handed to, a group never runs twice at once on a node even when
+        # two jobs include it (e.g. a poll picking up a block whose "block" job is still running)
+        self._running_groups: Dict[Tuple[str, str], Future] = { }
+        self._finished_nodes: Set[str] = set()
+        self._lock: Lock = Lock()
+
+    def ready(self) -> bool:
+        # Every node has finished a first collection, successful or not, so there is something to serve
+        return len(self._finished_nodes) == len(self._nodes)
+
+    def _finished(self, node: Node, job: str, start: float) -> Callable[[Future], None]:
+
+        def finished(future: Future) -> None:
+            duration: float = time.perf_counter() - start
+            PROCESS_TIME.inc(duration)
+            self._finished_nodes.add(node.name)
+            if not future.cancelled() and future.exception() is not None:
+                logger.error(f"Node '{node.name}' {job} failed: {str(future.exception())}")
+            logger.debug(f"Node '{node.name}' {job} took {duration} seconds")
+
+        return finished
+
+    def _group_running(self, node: Node, group: CollectorGroup) -> bool:
+        running: Optional[Future] = self._running_groups.get((node.name, group.name))
+        return running is not None and not running.done()
+
+    def dispatch(
+        self, job: str, groups: List[CollectorGroup], nodes: Optional[List[Node]] = None, select: Optional[Select] = None
+    ) -> List[Future]:
+        # Hands collections to the workers, the caller never waits on RPC and results
+        # reach scrapes through the snapshot each collection publishes when it is done
+        futures: List[Future] = [ ]
+        with self._lock:
+            for node in self._nodes if nodes is None else nodes:
+                node_groups: List[CollectorGroup] = groups if select is None else select(node, groups)
+                if not node_groups:
+                    continue
+                running: Future = self._running.get((node.name, job))
+                if running is not None and not running.done():
+                    # A stalled node does not pile up work, it is picked up again once it answers
+                    EXPORTER_COLLECTIONS_SKIPPED.labels(node=node.name, job=job).inc()
+                    continue
+                idle_groups: List[CollectorGroup] = [
+                    group for group in node_groups if not self._group_running(node=node, group=group)
+                ]
+                if not idle_groups:
+                    EXPORTER_COLLECTIONS_SKIPPED.labels(node=node.name, job=job).inc()
+                    continue
+                future: Future = self._submit(node, idle_groups)
+                future.add_done_callback(self._finished(node=node, job=job, start=time.perf_counter()))
+                self._running[(node.name, job)] = future
+                for group in idle_groups:
+                    self._running_groups[(node.name, group.name)] = future
+                futures.append(future)
+        return futures
+
+    def idle(self, node: Node) -> bool:
+        return all(future.done() for (name, _), future in list(self._running.items()) if name == node.name)
+
+    def cancel(self) -> None:
+        # Queued collections never start and running coroutines are cancelled, a running thread carries on
+        for future in list(self._running.values()):
+            future.cancel()
+
+    def wait(self, timeout: float) -> None:
+        concurrent.futures.wait(list(self._running.values()), timeout=timeout)
+
+
+class ScrapeTrigger:
+    __slots__ = (
+        "_pipeline", "_groups", "_min_interval", "_timeout", "_last", "_pending", "_lock"
+    )
+
+    def __init__(
+        self, pipeline: CollectionPipeline, groups: List[CollectorGroup],
+        min_interval: float = Config.SCRAPE_MIN_INTERVAL, timeout: float = Config.TIMEOUT
+    ) -> None:
+        self._pipeline: CollectionPipeline = pipeline
+        self._groups: List[CollectorGroup] = groups
+        self._min_interval: float = min_interval
+        self._timeout: float = timeout
+        self._last: float = float("-inf")
+        self._pending: List[Future] = [ ]
+        self._lock: Lock = Lock()
+
+    def __call__(self) -> None:
+        # Scrapes closer together than the minimum interval share one collection instead of each
+        # starting their own, a collection still running past the timeout is served from the last snapshot
+        with self._lock:
+            now: float = time.monotonic()
+            if now - self._last >= self._min_interval:
+                self._last = now
+                self._pending = self._pipeline.dispatch(job="scrape", groups=self._groups)
+            pending: List[Future] = self._pending
+        if pending:
+            concurrent.futures.wait(pending, timeout=self._timeout)
@@ -2,20 +2,40 @@
 
 from types import TracebackType
 from httpx import (
-    Client, Timeout
+    AsyncClient, Client, Limits, Timeout, TransportError
 )
 from logging import (
     Logger, Formatter, StreamHandler
 )
 from typing import (
-    Any, List, Optional, Type, Union
+    Any, Dict, List, Optional, Tuple, Type, Union
 )
 
+import asyncio
 import logging
 import itertools
 import json
+import re
+import time
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .breaker import (
+    CircuitBreaker, CircuitOpenError, RPC_IN_WARMUP
+)
 from .config import Config
+from .instrumentation import (
+    SLOW_CALLS, observe_call, observe_transport_error
+)
+from .metrics import (
+    EXPORTER_RPC_CONNECTIONS, EXPORTER_RPC_RECONNECTS
+)
+from .stream import (
+    StreamReducer, StreamingResponse
+)
 
 logger: Logger = logging.getLogger("qtum-exporter-rpc")
 logger.setLevel(level=Config.LOGGING_LEVEL)
@@ -32,90 +52,241 @@ logger.addHandler(stream_handler)
 _next_rpc_id = itertools.count(1).__next__
 
 
+def _client_options(
+    rpc_user: str, rpc_password: str, **kwargs: Any
+) -> dict:
+
+    auth: tuple = (rpc_user, rpc_password)
+    headers: dict = {
+        "content-type": "application/json"
+    }
+
+    # One long-lived keep-alive pool is reused across collect() cycles
+    kwargs.setdefault("limits", Limits(
+        max_connections=Config.RPC_MAX_CONNECTIONS,
+        max_keepalive_connections=Config.RPC_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=Config.RPC_KEEPALIVE_EXPIRY
+    ))
+
+    if "auth" in kwargs:
+        del kwargs["auth"]
+
+    if "headers" in kwargs:
+        _additional_headers = dict(kwargs.pop("headers"))
+        headers.update(_additional_headers)
+        # guard against content-type overwrite
+        headers["content-type"] = "application/json"
+
+    return dict(auth=auth, headers=headers, **kwargs)
+
+
+def _batch_timeout(calls: List["RPCCall"]) -> dict:
+    # The whole batch shares one request, so use the most generous timeout
+    timeouts: List[Timeout] = [
+        rpc_call.kwargs["timeout"] for rpc_call in calls if "timeout" in rpc_call.kwargs
+    ]
+    if not timeouts:
+        return { }
+    return {
+        "timeout": max(
+            timeouts, key=lambda timeout: float("inf") if timeout.read is None else timeout.read
+        )
+    }
+
+
+class JSONCodec:
+    __slots__ = ()
+
+    name: str = "json"
+    _decoder: json.JSONDecoder = json.JSONDecoder()
+    _separator = re.compile(r"[\s,]*")
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, content: bytes) -> Any:
+        return json.loads(content)
+
+    def loads_batch(self, content: bytes) -> Union[dict, List[Tuple[dict, int]]]:
+        # Responses are decoded one at a time to learn the size of each on the wire
+        text: str = content.decode("utf-8")
+        index: int = self._separator.match(text).end()
+        if not text.startswith("[", index):
+            return json.loads(text)
+        responses: List[Tuple[dict, int]] = [ ]
+        index = self._separator.match(text, index + 1).end()
+        while not text.startswith("]", index):
+            response, end = self._decoder.raw_decode(text, index)
+            responses.append((response, end - index))
+            index = self._separator.match(text, end).end()
+        return responses
+
+
+class OrjsonCodec(JSONCodec):
+    __slots__ = ()
+
+    name: str = "orjson"
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, content: bytes) -> Any:
+        return orjson.loads(content)
+
+    def loads_batch(self, content: bytes) -> Union[dict, List[Tuple[dict, int]]]:
+        # Decoded in one go, so each response is charged an even share of the body instead of its own size
+        responses: Union[dict, list] = orjson.loads(content)
+        if isinstance(responses, dict):
+            return responses
+        size: int = len(content) // max(len(responses), 1)
+        return [(response, size) for response in responses]
+
+
+def json_codec(name: str = Config.JSON_CODEC) -> JSONCodec:
+    # orjson is optional, "auto" uses it whenever it is installed
+    if name == "json":
+        return JSONCodec()
+    if orjson is not None and name in ("auto", "orjson"):
+        return OrjsonCodec()
+    if name == "orjson":
+        logger.warning("JSON_CODEC is 'orjson' but orjson is not installed, falling back to json")
+        return JSONCodec()
+    if name != "auto":
+        raise ValueError(f"Unknown JSON codec '{name}', expected 'auto', 'orjson' or 'json'")
+    return JSONCodec()
+
+
+CODEC: JSONCodec = json_codec()
+
+# Half-open probe, uptime is answered from memory even by a busy node
+_PROBE: bytes = CODEC.dumps({"jsonrpc": "1.0", "id": 0, "method": "uptime", "params": []})
+
+# Cheap lookups answered from memory fail fast, wallet calls get WALLET_TIMEOUT, anything else gets TIMEOUT,
+# METHOD_TIMEOUTS overrides them all
+METHOD_TIMEOUTS: Dict[str, float] = {
+    **{
+        method: Config.FAST_TIMEOUT for method in (
+            "getbestblockhash", "getblockcount", "getblockhash", "getblockheader", "getconnectioncount",
+            "getdifficulty", "getmemoryinfo", "getmempoolentry", "getmempoolinfo", "getnettotals", "getnetworkinfo",
+            "uptime"
+        )
+    },
+    # Wallet calls take the wallet lock and can be slow on large wallets
+    **{
+        method: Config.WALLET_TIMEOUT for method in ("getstakinginfo", "getwalletinfo")
+    },
+    **Config.METHOD_TIMEOUTS
+}
+
+
+def method_timeout(method: str, timeout: Optional[float] = None) -> Timeout:
+    return Timeout(timeout if timeout is not None else METHOD_TIMEOUTS.get(method, Config.TIMEOUT))
+
+
 class RPCError(Exception):
     def __init__(self, code: int, message: str) -> None:
+        super().__init__(f"{message} (code {code})")
         self.code: int = code
         self.message: str = message
 
 
-class RPC:
+class RPCCall:
     __slots__ = (
-        "_url", "_client", "_logger"
+        "_id", "_method", "_params", "_kwargs", "_result", "_error", "_done"
     )
 
     def __init__(
-        self, url: str, rpc_user: str, rpc_password: str, **kwargs: Any
+        self, method: str, params: List[Union[str, int, List[str], None]], **kwargs: Any
     ) -> None:
-        self._url = url
-        self._client = self._configure_client(rpc_user, rpc_password, **kwargs)
+        self._id: int = _next_rpc_id()
+        self._method: str = method
+        self._params: list = params
+        kwargs.setdefault("timeout", method_timeout(method))
+        self._kwargs: dict = kwargs
+        self._result: Any = None
+        self._error: Optional[RPCError] = None
+        self._done: bool = False
 
-    def __enter__(self) -> "RPC":
-        return self
+    @property
+    def id(self) -> int:
+        return self._id
 
-    def __exit__(
-        self, exc_type: Type[BaseException], exc_val: BaseException, exc_tb: TracebackType
-    ) -> None:
-        self.close()
+    @property
+    def method(self) -> str:
+        return self._method
 
-    @staticmethod
-    def _configure_client(
-        rpc_user: str, rpc_password: str, **kwargs: Any
-    ) -> Client:
+    @property
+    def params(self) -> list:
+        return self._params
 
-        auth: tuple = (rpc_user, rpc_password)
-        headers: dict = {
-            "content-type": "application/json"
-        }
+    @property
+    def kwargs(self) -> dict:
+        return self._kwargs
 
-        if not kwargs:
-            return Client(auth=auth, headers=headers)
+    @property
+    def done(self) -> bool:
+        return self._done
 
-        if "auth" in kwargs:
-            del kwargs["auth"]
+    @property
+    def error(self) -> Optional[RPCError]:
+        return self._error
 
-        if "headers" in kwargs:
-            _additional_headers = dict(kwargs.pop("headers"))
-            headers.update(_additional_headers)
-            # guard against content-type overwrite
-            headers["content-type"] = "application/json"
+    def payload(self) -> dict:
+        return {
+            "jsonrpc": "1.0", "id": self.id, "method": self.method, "params": self.params
+        }
 
-        return Client(auth=auth, headers=headers, **kwargs)
+    def set_result(self, result: Any) -> None:
+        self._result, self._done = result, True
 
-    @property
-    def url(self) -> str:
-        return self._url
+    def set_error(self, error: RPCError) -> None:
+        self._error, self._done = error, True
 
-    @property
-    def client(self) -> Client:
-        return self._client
+    def resolve(self, response: Optional[dict]) -> None:
+        if response is None:
+            self.set_error(RPCError(
+                code=-32603, message=f"No response for method '{self.method}' in batch"
+            ))
+        elif response.get("error") is not None:
+            self.set_error(RPCError(
+                code=response["error"]["code"], message=response["error"]["message"]
+            ))
+        else:
+            self.set_result(response["result"])
+
+    def result(self) -> Union[dict, int, float, str, list]:
+        if not self._done:
+            raise RuntimeError(f"Call for method '{self.method}' has not been executed yet")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+def _probed(breaker: CircuitBreaker, url: str, error: Optional[dict]) -> None:
+    breaker.record_response(error)
+    if error is not None and error.get("code") == RPC_IN_WARMUP:
+        raise CircuitOpenError(f"Probe of '{url}' answered: {error.get('message')}")
+
+
+def _batch_failed(node: str, calls: List[RPCCall], contents: List[bytes], seconds: float, responses: dict) -> RPCError:
+    # Node answered the batch with a single error object (e.g. batches not supported)
+    error: dict = responses.get("error") or {
+        "code": -32603, "message": "Unexpected response to batch request"
+    }
+    for rpc_call, content in zip(calls, contents):
+        observe_call(node, rpc_call.method, seconds, len(content), 0, error_code=error["code"])
+    return RPCError(
+        code=error["code"], message=error["message"]
+    )
 
-    @property
-    def logger(self) -> Logger:
-        return self._logger
 
-    def close(self) -> None:
-        self.client.close()
+class RPCMethods:
+    __slots__ = ()
 
     def call(
         self, method: str, params: List[Union[str, int, List[str], None]], **kwargs: Any
-    ) -> Union[dict, int, float, str, list]:
-        logger.debug(f"Call: Method '{method}' | Params '{params}'")
-        request: Any = self.client.post(
-            url=self.url,
-            content=json.dumps({
-                "jsonrpc": "1.0", "id": _next_rpc_id(), "method": method, "params": params
-            }), **kwargs
-        )
-        response: dict = json.loads(
-            request.content
-        )
-
-        if response["error"] is not None:
-            raise RPCError(
-                code=response["error"]["code"], message=response["error"]["message"]
-            )
-        logger.debug(f"Result: {response}")
-        return response["result"]
+    ) -> Any:
+        raise NotImplementedError
 
     def get_memory_info(self) -> dict:
         return self.call("getmemoryinfo", [])
@@ -123,15 +294,30 @@ class RPC:
     def get_mempool_info(self) -> dict:
         return self.call("getmempoolinfo", [])
 
+    def get_raw_mempool(self, verbose: bool = False) -> Union[list, dict]:
+        return self.call("getrawmempool", [verbose])
+
+    def get_mempool_entry(self, txid: str) -> dict:
+        return self.call("getmempoolentry", [txid])
+
     def get_mining_info(self) -> dict:
         return self.call("getmininginfo", [])
 
+    def get_staking_info(self) -> dict:
+        return self.call("getstakinginfo", [])
+
+    def get_wallet_info(self) -> dict:
+        return self.call("getwalletinfo", [])
+
     def get_network_info(self) -> dict:
         return self.call("getnetworkinfo", [])
 
     def get_blockchain_info(self) -> dict:
         return self.call("getblockchaininfo", [])
 
+    def get_peer_info(self) -> list:
+        return self.call("getpeerinfo", [])
+
     def get_connection_count(self) -> dict:
         return self.call("getconnectioncount", [])
 
@@ -161,10 +347,10 @@ class RPC:
         )
 
     def get_block_stats(
-        self, hash_or_height: Union[int, str], *keys: str, timeout: Optional[float] = Config.TIMEOUT
+        self, hash_or_height: Union[int, str], *keys: str, timeout: Optional[float] = None
     ) -> dict:
         return self.call(
-            "getblockstats", [hash_or_height, list(keys) or None], timeout=Timeout(timeout)
+            "getblockstats", [hash_or_height, list(keys) or None], timeout=method_timeout("getblockstats", timeout)
         )
 
     def get_network_totals(self) -> dict:
@@ -174,32 +360,445 @@ class RPC:
         return self.call("listbanned", [])
 
     def get_block(
-        self, block_hash: str, verbosity: int = 1, timeout: Optional[float] = Config.TIMEOUT
+        self, block_hash: str, verbosity: int = 1, timeout: Optional[float] = None, stream: Optional[StreamReducer] = None
     ) -> dict:
+        # With a stream reducer the transactions are handed to it as they arrive and its summary is the result
         return self.call(
-            "getblock", [block_hash, verbosity], timeout=Timeout(timeout)
+            "getblock", [block_hash, verbosity], timeout=method_timeout("getblock", timeout), stream=stream
         )
 
     def estimate_smart_fee(
-        self, num_blocks: int, timeout: Optional[float] = Config.TIMEOUT
+        self, num_blocks: int, timeout: Optional[float] = None
     ) -> dict:
         return self.call(
-            "estimatesmartfee", [num_blocks], timeout=Timeout(timeout)
+            "estimatesmartfee", [num_blocks], timeout=method_timeout("estimatesmartfee", timeout)
         )
 
     def get_raw_transaction(
-        self, txid: str, verbose: bool = True, block_hash: Optional[str] = None, timeout: Optional[float] = Config.TIMEOUT
+        self, txid: str, verbose: bool = True, block_hash: Optional[str] = None, timeout: Optional[float] = None
     ) -> dict:
         return self.call(
-            "getrawtransaction", [txid, verbose, block_hash], timeout=Timeout(timeout)
+            "getrawtransaction", [txid, verbose, block_hash], timeout=method_timeout("getrawtransaction", timeout)
         )
 
     def get_network_hash_ps(
-        self, num_blocks: int = -1, height: Optional[int] = None, timeout: Optional[float] = Config.TIMEOUT
+        self, num_blocks: int = -1, height: Optional[int] = None, timeout: Optional[float] = None
     ) -> int:
         return self.call(
-            "getnetworkhashps", [num_blocks, height], timeout=Timeout(timeout)
+            "getnetworkhashps", [num_blocks, height], timeout=method_timeout("getnetworkhashps", timeout)
         )
 
+    def search_logs(
+        self, from_block: int, to_block: int, addresses: Optional[List[str]] = None, topics: Optional[List[str]] = None,
+        timeout: Optional[float] = None
+    ) -> list:
+        # Receipts with event logs in a height range, needs qtumd running with -logevents
+        params: list = [from_block, to_block]
+        if addresses or topics:
+            params.append({"addresses": addresses or [ ]})
+        if topics:
+            params.append({"topics": topics})
+        return self.call("searchlogs", params, timeout=method_timeout("searchlogs", timeout))
+
+    def get_transaction_receipt(self, txid: str, timeout: Optional[float] = None) -> list:
+        return self.call("gettransactionreceipt", [txid], timeout=method_timeout("gettransactionreceipt", timeout))
+
     def get_uptime(self) -> int:
         return self.call("uptime", [])
+
+
+class CallFactory(RPCMethods):
+    __slots__ = ()
+
+    def call(
+        self, method: str, params: List[Union[str, int, List[str], None]], **kwargs: Any
+    ) -> RPCCall:
+        return RPCCall(method, params, **kwargs)
+
+
+class RPC(RPCMethods):
+    __slots__ = (
+        "_url", "_node", "_client", "_batch", "_codec", "_breaker", "_credentials", "_client_kwargs", "_logger"
+    )
+
+    def __init__(
+        self, url: str, rpc_user: str, rpc_password: str, batch: bool = Config.RPC_BATCH, codec: JSONCodec = CODEC,
+        breaker: Optional[CircuitBreaker] = None, node: Optional[str] = None, **kwargs: Any
+    ) -> None:
+        self._url = url
+        # Labels the RPC and breaker metrics, the url when the client is not tied to a configured node
+        self._node = node or url
+        self._batch = batch
+        self._codec = codec
+        self._breaker = breaker or CircuitBreaker(name=self._node)
+        # Kept so the client can be rebuilt after a transport error
+        self._credentials = (rpc_user, rpc_password)
+        self._client_kwargs = dict(kwargs)
+        self._client = self._configure_client(rpc_user, rpc_password, **kwargs)
+
+    def __enter__(self) -> "RPC":
+        return self
+
+    def __exit__(
+        self, exc_type: Type[BaseException], exc_val: BaseException, exc_tb: TracebackType
+    ) -> None:
+        self.close()
+
+    @staticmethod
+    def _configure_client(
+        rpc_user: str, rpc_password: str, **kwargs: Any
+    ) -> Client:
+        return Client(**_client_options(rpc_user, rpc_password, **kwargs))
+
+    @property
+    def url(self) -> str:
+        return self._url
+
+    @property
+    def node(self) -> str:
+        return self._node
+
+    @property
+    def client(self) -> Client:
+        return self._client
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    @property
+    def logger(self) -> Logger:
+        return self._logger
+
+    def close(self) -> None:
+        self.client.close()
+
+    def reconnect(self) -> None:
+        logger.warning(f"Reconnecting to '{self.url}'")
+        self.close()
+        self._client = self._configure_client(*self._credentials, **self._client_kwargs)
+        EXPORTER_RPC_RECONNECTS.labels(node=self._node).inc()
+
+    def batch(self) -> "Batch":
+        return Batch(rpc=self)
+
+    def _post(
+        self, content: bytes, calls: List[Tuple[str, list]], parser: Optional[StreamingResponse] = None, **kwargs: Any
+    ) -> Tuple[bytes, float]:
+        connected: List[bool] = [False]
+
+        def trace(event_name: str, info: dict) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                connected[0] = True
+
+        start: float = time.perf_counter()
+        try:
+            if parser is None:
+                response_content: bytes = self.client.post(
+                    url=self.url, content=content, extensions={"trace": trace}, **kwargs
+                ).content
+            else:
+                # Parsed as it arrives, the response is never held whole
+                with self.client.stream(
+                    "POST", url=self.url, content=content, extensions={"trace": trace}, **kwargs
+                ) as response:
+                    for chunk in response.iter_bytes():
+                        parser.feed(chunk)
+                response_content = b""
+        except TransportError:
+            observe_transport_error(self._node, [method for method, _ in calls])
+            SLOW_CALLS.record(url=self.url, seconds=time.perf_counter() - start, calls=calls, error="transport")
+            self._breaker.record_failure()
+            # Drop the pool so the next call starts from a fresh connection
+            self.reconnect()
+            raise
+        seconds: float = time.perf_counter() - start
+        EXPORTER_RPC_CONNECTIONS.labels(node=self._node, state="new" if connected[0] else "reused").inc()
+        SLOW_CALLS.record(url=self.url, seconds=seconds, calls=calls)
+        return response_content, seconds
+
+    def _guard(self) -> None:
+        # Nothing reaches the node while the circuit is open, after the backoff one cheap call probes it
+        if not self._breaker.before_request():
+            return
+        try:
+            response_content, _ = self._post(_PROBE, [("uptime", [])], timeout=Timeout(Config.BREAKER_PROBE_TIMEOUT))
+            error: Optional[dict] = self._codec.loads(response_content).get("error")
+        except TransportError as exception:
+            raise CircuitOpenError(f"Probe of '{self.url}' failed: {str(exception)}") from exception
+        except ValueError as exception:
+            self._breaker.record_failure()
+            raise CircuitOpenError(f"Probe of '{self.url}' failed: {str(exception)}") from exception
+        _probed(self._breaker, self.url, error)
+
+    def call(
+        self, method: str, params: List[Union[str, int, List[str], None]], **kwargs: Any
+    ) -> Union[dict, int, float, str, list]:
+        logger.debug(f"Call: Method '{method}' | Params '{params}'")
+        self._guard()
+        kwargs.setdefault("timeout", method_timeout(method))
+        stream: Optional[StreamReducer] = kwargs.pop("stream", None)
+        content: bytes = self._codec.dumps({
+            "jsonrpc": "1.0", "id": _next_rpc_id(), "method": method, "params": params
+        })
+        if stream is None:
+            response_content, seconds = self._post(content, [(method, params)], **kwargs)
+            response: dict = self._codec.loads(response_content)
+            response_size: int = len(response_content)
+        else:
+            parser: StreamingResponse = StreamingResponse(path=("result",) + stream.path, on_item=stream.add)
+            _, seconds = self._post(content, [(method, params)], parser=parser, **kwargs)
+            response, response_size = parser.close(), parser.size
+        self._breaker.record_response(response["error"])
+        observe_call(
+            self._node, method, seconds, len(content), response_size,
+            error_code=response["error"]["code"] if response["error"] is not None else None
+        )
+
+        if response["error"] is not None:
+            raise RPCError(
+                code=response["error"]["code"], message=response["error"]["message"]
+            )
+        logger.debug(f"Result: {response}")
+        return response["result"] if stream is None else stream.finish(response["result"])
+
+    def _execute_calls(self, calls: List[RPCCall]) -> None:
+        for rpc_call in calls:
+            try:
+                rpc_call.set_result(
+                    self.call(rpc_call.method, rpc_call.params, **rpc_call.kwargs)
+                )
+            except RPCError as error:
+                rpc_call.set_error(error)
+
+    def execute(self, calls: List[RPCCall]) -> None:
+        # Streamed calls go out on their own, a batch response is always decoded whole
+        streamed: List[RPCCall] = [rpc_call for rpc_call in calls if rpc_call.kwargs.get("stream") is not None]
+        if streamed:
+            self._execute_calls(streamed)
+            calls = [rpc_call for rpc_call in calls if rpc_call.kwargs.get("stream") is None]
+        if not calls:
+            return
+
+        # Per-call mode for nodes that reject JSON-RPC batches
+        if not self._batch:
+            self._execute_calls(calls)
+            return
+
+        logger.debug(f"Batch: Methods '{[rpc_call.method for rpc_call in calls]}'")
+        self._guard()
+        # Encoded one by one so each call's request size is known
+        contents: List[bytes] = [self._codec.dumps(rpc_call.payload()) for rpc_call in calls]
+        response_content, seconds = self._post(
+            b"[" + b",".join(contents) + b"]", [(rpc_call.method, rpc_call.params) for rpc_call in calls],
+            **_batch_timeout(calls)
+        )
+        responses: Union[dict, List[Tuple[dict, int]]] = self._codec.loads_batch(response_content)
+        if isinstance(responses, dict):
+            self._breaker.record_response(responses.get("error"))
+            raise _batch_failed(self._node, calls, contents, seconds, responses)
+        # A node in warmup answers every call of the batch with the same error
+        self._breaker.record_response(next(
+            (response["error"] for response, _ in responses if response.get("error") is not None), None
+        ))
+
+        responses_by_id: dict = {
+            response.get("id"): (response, size) for response, size in responses
+        }
+        for rpc_call, content in zip(calls, contents):
+            response, size = responses_by_id.get(rpc_call.id, (None, 0))
+            rpc_call.resolve(response)
+            observe_call(
+                self._node, rpc_call.method, seconds, len(content), size,
+                error_code=rpc_call.error.code if rpc_call.error is not None else None
+            )
+        logger.debug(f"Result: {responses}")
+
+
+class Batch(RPCMethods):
+    __slots__ = (
+        "_rpc", "_calls"
+    )
+
+    def __init__(self, rpc: RPC) -> None:
+        self._rpc: RPC = rpc
+        self._calls: List[RPCCall] = [ ]
+
+    def __enter__(self) -> "Batch":
+        return self
+
+    def __exit__(
+        self, exc_type: Type[BaseException], exc_val: BaseException, exc_tb: TracebackType
+    ) -> None:
+        if exc_type is None:
+            self.execute()
+
+    def call(
+        self, method: str, params: List[Union[str, int, List[str], None]], **kwargs: Any
+    ) -> RPCCall:
+        rpc_call: RPCCall = RPCCall(method, params, **kwargs)
+        self._calls.append(rpc_call)
+        return rpc_call
+
+    def extend(self, calls: List[RPCCall]) -> None:
+        self._calls.extend(calls)
+
+    def execute(self) -> None:
+        calls, self._calls = self._calls, [ ]
+        self._rpc.execute(calls)
+
+
+class AsyncRPC(RPCMethods):
+    __slots__ = (
+        "_url", "_node", "_client", "_semaphore", "_codec", "_breaker", "_logger"
+    )
+
+    def __init__(
+        self, url: str, rpc_user: str, rpc_password: str, max_in_flight: int = Config.RPC_MAX_IN_FLIGHT,
+        codec: JSONCodec = CODEC, breaker: Optional[CircuitBreaker] = None, node: Optional[str] = None, **kwargs: Any
+    ) -> None:
+        self._url = url
+        # Labels the RPC and breaker metrics, the url when the client is not tied to a configured node
+        self._node = node or url
+        self._codec = codec
+        self._breaker = breaker or CircuitBreaker(name=self._node)
+        # Caps concurrent requests so a collect cycle cannot flood qtumd
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._client = self._configure_client(rpc_user, rpc_password, **kwargs)
+
+    async def __aenter__(self) -> "AsyncRPC":
+        return self
+
+    async def __aexit__(
+        self, exc_type: Type[BaseException], exc_val: BaseException, exc_tb: TracebackType
+    ) -> None:
+        await self.close()
+
+    @staticmethod
+    def _configure_client(
+        rpc_user: str, rpc_password: str, **kwargs: Any
+    ) -> AsyncClient:
+        return AsyncClient(**_client_options(rpc_user, rpc_password, **kwargs))
+
+    @property
+    def url(self) -> str:
+        return self._url
+
+    @property
+    def node(self) -> str:
+        return self._node
+
+    @property
+    def client(self) -> AsyncClient:
+        return self._client
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    @property
+    def logger(self) -> Logger:
+        return self._logger
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def _post(
+        self, content: bytes, calls: List[Tuple[str, list]], parser: Optional[StreamingResponse] = None, **kwargs: Any
+    ) -> Tuple[bytes, float]:
+        connected: List[bool] = [False]
+
+        async def trace(event_name: str, info: dict) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                connected[0] = True
+
+        async with self._semaphore:
+            # Timed inside the semaphore, waiting for a slot is not the node's latency
+            start: float = time.perf_counter()
+            try:
+                if parser is None:
+                    response_content: bytes = (await self.client.post(
+                        url=self.url, content=content, extensions={"trace": trace}, **kwargs
+                    )).content
+                else:
+                    # Parsed as it arrives, the response is never held whole
+                    async with self.client.stream(
+                        "POST", url=self.url, content=content, extensions={"trace": trace}, **kwargs
+                    ) as response:
+                        async for chunk in response.aiter_bytes():
+                            parser.feed(chunk)
+                    response_content = b""
+            except TransportError:
+                observe_transport_error(self._node, [method for method, _ in calls])
+                SLOW_CALLS.record(url=self.url, seconds=time.perf_counter() - start, calls=calls, error="transport")
+                self._breaker.record_failure()
+                raise
+            seconds: float = time.perf_counter() - start
+        EXPORTER_RPC_CONNECTIONS.labels(node=self._node, state="new" if connected[0] else "reused").inc()
+        SLOW_CALLS.record(url=self.url, seconds=seconds, calls=calls)
+        return response_content, seconds
+
+    async def _guard(self) -> None:
+        # Nothing reaches the node while the circuit is open, after the backoff one cheap call probes it
+        if not self._breaker.before_request():
+            return
+        try:
+            response_content, _ = await self._post(
+                _PROBE, [("uptime", [])], timeout=Timeout(Config.BREAKER_PROBE_TIMEOUT)
+            )
+            error: Optional[dict] = self._codec.loads(response_content).get("error")
+        except TransportError as exception:
+            raise CircuitOpenError(f"Probe of '{self.url}' failed: {str(exception)}") from exception
+        except ValueError as exception:
+            self._breaker.record_failure()
+            raise CircuitOpenError(f"Probe of '{self.url}' failed: {str(exception)}") from exception
+        _probed(self._breaker, self.url, error)
+
+    async def call(
+        self, method: str, params: List[Union[str, int, List[str], None]], **kwargs: Any
+    ) -> Union[dict, int, float, str, list]:
+        logger.debug(f"Call: Method '{method}' | Params '{params}'")
+        await self._guard()
+        kwargs.setdefault("timeout", method_timeout(method))
+        stream: Optional[StreamReducer] = kwargs.pop("stream", None)
+        content: bytes = self._codec.dumps({
+            "jsonrpc": "1.0", "id": _next_rpc_id(), "method": method, "params": params
+        })
+        if stream is None:
+            response_content, seconds = await self._post(content, [(method, params)], **kwargs)
+            response: dict = self._codec.loads(response_content)
+            response_size: int = len(response_content)
+        else:
+            parser: StreamingResponse = StreamingResponse(path=("result",) + stream.path, on_item=stream.add)
+            _, seconds = await self._post(content, [(method, params)], parser=parser, **kwargs)
+            response, response_size = parser.close(), parser.size
+        self._breaker.record_response(response["error"])
+        observe_call(
+            self._node, method, seconds, len(content), response_size,
+            error_code=response["error"]["code"] if response["error"] is not None else None
+        )
+
+        if response["error"] is not None:
+            raise RPCError(
+                code=response["error"]["code"], message=response["error"]["message"]
+            )
+        logger.debug(f"Result: {response}")
+        return response["result"] if stream is None else stream.finish(response["result"])
+
+    async def _execute_call(self, rpc_call: RPCCall) -> None:
+        try:
+            rpc_call.set_result(
+                await self.call(rpc_call.method, rpc_call.params, **rpc_call.kwargs)
+            )
+        except RPCError as error:
+            rpc_call.set_error(error)
+
+    async def execute(self, calls: List[RPCCall]) -> None:
+        if not calls:
+            return
+        # Fails the whole batch at once while the circuit is open instead of every call separately
+        await self._guard()
+        # Calls run concurrently, bounded by the in-flight semaphore
+        await asyncio.gather(*(
+            self._execute_call(rpc_call) for rpc_call in calls
+        ))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+from threading import Event
+from typing import (
+    Callable, List, Optional
+)
+
+import math
+import time
+
+from .metrics import (
+    EXPORTER_SCHEDULING_LAG, EXPORTER_OVERRUNS
+)
+
+
+class Job:
+    __slots__ = (
+        "_name", "_interval", "_function", "_deadline"
+    )
+
+    def __init__(
+        self, name: str, interval: float, function: Callable[[], None]
+    ) -> None:
+        self._name: str = name
+        self._interval: float = interval
+        self._function: Callable[[], None] = function
+        self._deadline: float = 0.0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    @property
+    def deadline(self) -> float:
+        return self._deadline
+
+    def start(self, now: float) -> None:
+        self._deadline = now
+
+    def run(self) -> None:
+        self._function()
+
+    def advance(self, now: float) -> int:
+        # Deadlines are multiples of the interval from the start, so a slow run never shifts the cadence
+        self._deadline += self._interval
+        if self._deadline > now:
+            return 0
+        # The run overran one or more ticks: coalesce them into the next deadline
+        missed: int = math.floor((now - self._deadline) / self._interval) + 1
+        self._deadline += missed * self._interval
+        return missed
+
+
+class Scheduler:
+    __slots__ = (
+        "_jobs", "_stop_event"
+    )
+
+    def __init__(self, stop_event: Optional[Event] = None) -> None:
+        self._jobs: List[Job] = [ ]
+        self._stop_event: Event = stop_event or Event()
+
+    @property
+    def jobs(self) -> List[Job]:
+        return self._jobs
+
+    @property
+    def stop_event(self) -> Event:
+        return self._stop_event
+
+    def add_job(
+        self, name: str, interval: float, function: Callable[[], None]
+    ) -> Job:
+        if interval <= 0:
+            raise ValueError(f"Interval for job '{name}' must be positive, not {interval}")
+        job: Job = Job(name=name, interval=interval, function=function)
+        self._jobs.append(job)
+        return job
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        start: float = time.monotonic()
+        for job in self._jobs:
+            job.start(now=start)
+
+        while self._jobs and not self._stop_event.is_set():
+            job: Job = min(self._jobs, key=lambda _job: _job.deadline)
+            # Sleep until the next deadline, waking early on stop
+            if self._stop_event.wait(timeout=max(job.deadline - time.monotonic(), 0.0)):
+                break
+
+            EXPORTER_SCHEDULING_LAG.labels(job=job.name).set(time.monotonic() - job.deadline)
+            job.run()
+
+            missed: int = job.advance(now=time.monotonic())
+            if missed:
+                EXPORTER_OVERRUNS.labels(job=job.name).inc(missed)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+from prometheus_client.core import (
+    CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+)
+from prometheus_client.metrics_core import Metric
+from prometheus_client.registry import Collector
+from threading import Lock
+from typing import (
+    Any, Dict, Iterable, List, Sequence, Tuple, Union
+)
+
+import decimal
+import math
+
+
+class SnapshotGauge:
+    __slots__ = (
+        "_name", "_documentation", "_labelnames"
+    )
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ("node",)
+    ) -> None:
+        self._name: str = name
+        self._documentation: str = documentation
+        self._labelnames: Tuple[str, ...] = tuple(labelnames)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def documentation(self) -> str:
+        return self._documentation
+
+    @property
+    def labelnames(self) -> Tuple[str, ...]:
+        return self._labelnames
+
+    def family(self) -> Metric:
+        return GaugeMetricFamily(self._name, self._documentation, labels=self._labelnames)
+
+    @staticmethod
+    def add(family: Metric, labelvalues: Tuple[str, ...], value: Any) -> None:
+        family.add_metric(labelvalues, value)
+
+
+class SnapshotCounter(SnapshotGauge):
+    __slots__ = ()
+
+    def family(self) -> Metric:
+        # Values are running totals kept by the collector, rendered with the _total suffix
+        return CounterMetricFamily(self._name, self._documentation, labels=self._labelnames)
+
+
+class SnapshotHistogram(SnapshotGauge):
+    __slots__ = (
+        "_buckets",
+    )
+
+    def __init__(
+        self, name: str, documentation: str, buckets: Sequence[float], labelnames: Sequence[str] = ("node",)
+    ) -> None:
+        super().__init__(name=name, documentation=documentation, labelnames=labelnames)
+        # Upper bounds, the implicit +Inf bucket is always last
+        self._buckets: Tuple[float, ...] = tuple(sorted(buckets)) + (math.inf,)
+
+    @property
+    def buckets(self) -> Tuple[float, ...]:
+        return self._buckets
+
+    def family(self) -> Metric:
+        return HistogramMetricFamily(self._name, self._documentation, labels=self._labelnames)
+
+    @staticmethod
+    def add(family: Metric, labelvalues: Tuple[str, ...], value: Any) -> None:
+        buckets, sum_value = value
+        family.add_metric(labelvalues, buckets, sum_value)
+
+
+Sample = Tuple[SnapshotGauge, Tuple[str, ...], Any]
+
+
+class Samples:
+    __slots__ = (
+        "_node", "_samples", "_series"
+    )
+
+    def __init__(self, node: str) -> None:
+        self._node: str = node
+        self._samples: List[Sample] = [ ]
+        # Exposed series, a histogram renders one per bucket plus _sum and _count
+        self._series: int = 0
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    @property
+    def node(self) -> str:
+        return self._node
+
+    @property
+    def series(self) -> int:
+        return self._series
+
+    def set(
+        self, gauge: SnapshotGauge, value: Union[int, float, decimal.Decimal], **labels: str
+    ) -> None:
+        labels["node"] = self._node
+        self._samples.append((
+            gauge, tuple(str(labels[labelname]) for labelname in gauge.labelnames), float(value)
+        ))
+        self._series += 1
+
+    def histogram(
+        self, histogram: SnapshotHistogram, counts: Sequence[int], sum_value: float, **labels: str
+    ) -> None:
+        # Counts are per bucket, including +Inf, and rendered cumulatively
+        labels["node"] = self._node
+        cumulative: List[Tuple[str, float]] = [ ]
+        total: int = 0
+        for upper_bound, count in zip(histogram.buckets, counts):
+            total += count
+            cumulative.append(("+Inf" if upper_bound == math.inf else repr(float(upper_bound)), total))
+        self._samples.append((
+            histogram, tuple(str(labels[labelname]) for labelname in histogram.labelnames), (cumulative, float(sum_value))
+        ))
+        self._series += len(histogram.buckets) + 2
+
+    def freeze(self) -> Tuple[Sample, ...]:
+        return tuple(self._samples)
+
+
+class SnapshotCollector(Collector):
+
+    def __init__(self) -> None:
+        # Replaced wholesale on publish and never mutated, so scrapes read it without locking
+        self._snapshot: Dict[Tuple[str, str], Tuple[Sample, ...]] = { }
+        self._generation: int = 0
+        self._lock: Lock = Lock()
+
+    @property
+    def generation(self) -> int:
+        # Bumped on every publish, lets renderers tell when their output is stale
+        return self._generation
+
+    def publish(self, node: str, groups: Dict[str, Samples]) -> None:
+        # A group's samples replace its previous ones, so vanished series (e.g. expired bans) drop out
+        with self._lock:
+            snapshot: Dict[Tuple[str, str], Tuple[Sample, ...]] = dict(self._snapshot)
+            for group, samples in groups.items():
+                snapshot[(node, group)] = samples.freeze()
+            self._snapshot = snapshot
+            self._generation += 1
+
+    def describe(self) -> Iterable[Metric]:
+        return [ ]
+
+    def collect(self) -> Iterable[Metric]:
+        snapshot: Dict[Tuple[str, str], Tuple[Sample, ...]] = self._snapshot
+        families: Dict[SnapshotGauge, Metric] = { }
+        for samples in snapshot.values():
+            for metric, labelvalues, value in samples:
+                family: Metric = families.get(metric)
+                if family is None:
+                    family = families[metric] = metric.family()
+                metric.add(family, labelvalues, value)
+        return list(families.values())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+from typing import (
+    Any, Callable, Generator, Tuple
+)
+
+import codecs
+import json
+import re
+
+_DECODER: json.JSONDecoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"\s*")
+
+# Suspends parsing until the next chunk arrives
+Parse = Generator[None, None, Any]
+
+
+class StreamReducer:
+    __slots__ = ()
+
+    # Members leading to the streamed array within the result, e.g. ("tx",) for getblock
+    path: Tuple[str, ...] = ()
+
+    def add(self, item: Any) -> None:
+        raise NotImplementedError
+
+    def finish(self, result: Any) -> Any:
+        # Called with the result, the streamed array replaced by its length, returns the call's result
+        raise NotImplementedError
+
+
+class StreamingResponse:
+    __slots__ = (
+        "_path", "_on_item", "_text", "_decoder", "_index", "_size", "_closed", "_parse", "_response"
+    )
+
+    def __init__(self, path: Tuple[str, ...], on_item: Callable[[Any], None]) -> None:
+        # Items of the array at path are handed to on_item one at a time and never kept,
+        # everything else in the response is small and decoded as a whole
+        self._path: Tuple[str, ...] = path
+        self._on_item: Callable[[Any], None] = on_item
+        self._text: str = ""
+        self._decoder: codecs.IncrementalDecoder = codecs.getincrementaldecoder("utf-8")()
+        self._index: int = 0
+        self._size: int = 0
+        self._closed: bool = False
+        self._parse: Parse = self._value(path)
+        self._response: Any = None
+
+    @property
+    def size(self) -> int:
+        # Bytes fed so far
+        return self._size
+
+    def feed(self, chunk: bytes) -> None:
+        self._size += len(chunk)
+        # Only the unparsed tail is kept, so memory stays at about one chunk plus one item
+        self._text = self._text[self._index:] + self._decoder.decode(chunk)
+        self._index = 0
+        self._resume()
+
+    def close(self) -> Any:
+        self._text = self._text[self._index:] + self._decoder.decode(b"", final=True)
+        self._index = 0
+        self._closed = True
+        self._resume()
+        if self._parse is not None:
+            raise ValueError("Truncated JSON response")
+        return self._response
+
+    def _resume(self) -> None:
+        if self._parse is None:
+            return
+        try:
+            next(self._parse)
+        except StopIteration as stop:
+            self._parse = None
+            self._response = stop.value
+
+    def _peek(self) -> Parse:
+        while True:
+            self._index = _WHITESPACE.match(self._text, self._index).end()
+            if self._index < len(self._text):
+                return self._text[self._index]
+            if self._closed:
+                raise ValueError("Truncated JSON response")
+            yield
+
+    def _expect(self, characters: str) -> Parse:
+        character: str = yield from self._peek()
+        if character not in characters:
+            raise ValueError(f"Expected one of '{characters}' at offset {self._index}, got '{character}'")
+        self._index += 1
+        return character
+
+    def _decode(self) -> Parse:
+        # One complete value, retried once the buffer has doubled so a large value is not rescanned per chunk
+        yield from self._peek()
+        retry_at: int = 0
+        while True:
+            available: int = len(self._text) - self._index
+            if available >= retry_at or self._closed:
+                try:
+                    value, end = _DECODER.raw_decode(self._text, self._index)
+                    # A number ending the buffer may go on in the next chunk
+                    if end < len(self._text) or self._closed:
+                        self._index = end
+                        return value
+                except json.JSONDecodeError:
+                    if self._closed:
+                        raise
+                retry_at = available * 2
+            yield
+
+    def _value(self, path: Tuple[str, ...]) -> Parse:
+        character: str = yield from self._peek()
+        if not path:
+            return (yield from self._array() if character == "[" else self._decode())
+        if character != "{":
+            # e.g. a null result next to an error
+            return (yield from self._decode())
+
+        self._index += 1
+        members: dict = { }
+        if (yield from self._peek()) == "}":
+            self._index += 1
+            return members
+        while True:
+            key: str = yield from self._decode()
+            yield from self._expect(":")
+            members[key] = yield from self._value(path[1:]) if key == path[0] else self._decode()
+            if (yield from self._expect(",}")) == "}":
+                return members
+
+    def _array(self) -> Parse:
+        # Returns the number of items streamed
+        self._index += 1
+        count: int = 0
+        if (yield from self._peek()) == "]":
+            self._index += 1
+            return count
+        while True:
+            self._on_item((yield from self._decode()))
+            count += 1
+            if (yield from self._expect(",]")) == "]":
+                return count
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+from typing import (
+    Any, Dict, List, Tuple
+)
+
+from .amounts import to_satoshis
+from .stream import StreamReducer
+
+# Output script types with their own label, anything else is "other" so the label set stays fixed
+SCRIPT_TYPES: Tuple[str, ...] = (
+    "pubkeyhash", "pubkey", "scripthash", "multisig", "nulldata", "witness_v0_keyhash", "witness_v0_scripthash",
+    "witness_v1_taproot"
+)
+CONTRACT_CREATE_TYPES: Tuple[str, ...] = ("create", "create_sender")
+CONTRACT_CALL_TYPES: Tuple[str, ...] = ("call", "call_sender")
+TX_TYPES: Tuple[str, ...] = (
+    "coinbase", "coinstake", "contract_create", "contract_call", *SCRIPT_TYPES, "other"
+)
+
+
+def classify(tx: dict) -> str:
+    vin: List[dict] = tx.get("vin", [ ])
+    vout: List[dict] = tx.get("vout", [ ])
+    if vin and "coinbase" in vin[0]:
+        return "coinbase"
+    script_types: List[str] = [output.get("scriptPubKey", { }).get("type", "") for output in vout]
+    # A proof-of-stake block pays its staker in a transaction whose first output is empty
+    if len(vout) > 1 and not vout[0].get("value") and not vout[0].get("scriptPubKey", { }).get("hex"):
+        return "coinstake"
+    if any(script_type in CONTRACT_CREATE_TYPES for script_type in script_types):
+        return "contract_create"
+    if any(script_type in CONTRACT_CALL_TYPES for script_type in script_types):
+        return "contract_call"
+    # Otherwise by its first output that is not an OP_RETURN, e.g. the payment before a change output
+    payments: List[str] = [script_type for script_type in script_types if script_type != "nulldata"] or script_types
+    if payments and payments[0] in SCRIPT_TYPES:
+        return payments[0]
+    return "other"
+
+
+class TxClassifier(StreamReducer):
+    __slots__ = (
+        "_counts", "_values", "_fees"
+    )
+
+    path: Tuple[str, ...] = ("tx",)
+
+    def __init__(self) -> None:
+        # Per transaction type, in satoshis
+        self._counts: Dict[str, int] = { }
+        self._values: Dict[str, int] = { }
+        self._fees: Dict[str, int] = { }
+
+    def add(self, item: Any) -> None:
+        # Each decoded transaction is dropped as soon as it is counted
+        tx_type: str = classify(item)
+        self._counts[tx_type] = self._counts.get(tx_type, 0) + 1
+        self._values[tx_type] = self._values.get(tx_type, 0) + sum(
+            to_satoshis(output.get("value", 0)) for output in item.get("vout", [ ])
+        )
+        if item.get("fee") is not None:
+            self._fees[tx_type] = self._fees.get(tx_type, 0) + to_satoshis(item["fee"])
+
+    def finish(self, result: Any) -> dict:
+        # The block header fields with the transactions replaced by their per-type sums
+        return {
+            "hash": result.get("hash"), "height": result.get("height"), "txs": result.get("tx"),
+            "counts": self._counts, "values": self._values, "fees": self._fees
+        }
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+from logging import (
+    Logger, Formatter, StreamHandler
+)
+from typing import (
+    Optional, Tuple
+)
+
+import logging
+import time
+
+from .config import Config
+from .rpc import RPCError
+
+logger: Logger = logging.getLogger("qtum-exporter-wallet")
+logger.setLevel(level=Config.LOGGING_LEVEL)
+formatter: Formatter = logging.Formatter(
+    fmt="%(asctime)s %(name)s %(levelname)s %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+)
+stream_handler: StreamHandler = logging.StreamHandler()
+stream_handler.setFormatter(fmt=formatter)
+logger.addHandler(stream_handler)
+
+# Method not found (-disablewallet), no wallet loaded, several wallets loaded and none chosen
+WALLET_UNAVAILABLE_CODES: Tuple[int, ...] = (-32601, -18, -19)
+
+
+class WalletStatus:
+    __slots__ = (
+        "_node", "_unavailable_until"
+    )
+
+    def __init__(self, node: str) -> None:
+        self._node: str = node
+        # Monotonic time until which wallet calls are skipped, None while the wallet answers
+        self._unavailable_until: Optional[float] = None
+
+    @property
+    def available(self) -> bool:
+        # Unknown counts as available, so the first collection finds out
+        return self._unavailable_until is None or time.monotonic() >= self._unavailable_until
+
+    def unavailable(self, error: RPCError) -> bool:
+        # Returns whether the error only means there is no wallet to ask, which is not a failure.
+        # A wallet can be loaded later, so it is asked again every WALLET_RECHECK_SECONDS.
+        if error.code not in WALLET_UNAVAILABLE_CODES:
+            return False
+        if self._unavailable_until is None:
+            logger.info(f"Node '{self._node}' has no wallet to query ({error.message}), skipping wallet calls")
+        self._unavailable_until = time.monotonic() + Config.WALLET_RECHECK_SECONDS
+        return True
+
+    def answered(self) -> None:
+        if self._unavailable_until is not None:
+            logger.info(f"Node '{self._node}' wallet answers again")
+        self._unavailable_until = None